@@ -0,0 +1,450 @@
+"""
+Aircraft Catalog Service for Jet Finder
+The one in-memory form of the aircraft sheet (an AircraftStore, hot-reloaded behind a DatasetRegistry)
+and the query API every caller shares: filter, sort, page and facet over catalog rows or over any list
+of aircraft dicts. The app, EnhancedAircraftDataManager and AircraftDataManager are adapters over it.
+"""
+
+import os
+import logging
+import numpy as np
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Sequence
+
+from aircraft_store import AircraftStore
+from dataset_registry import DatasetRegistry
+from dataset_snapshot import open_csv_snapshot, builder_fingerprint
+from scoring_engine import AircraftFleet, ScoringContext
+from csv_ingest import AIRCRAFT_SHEET_SCHEMA, PERFORMANCE_PROFILE_METRICS, ingest_aircraft_sheet, schema_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Aircraft spreadsheet export behind the catalog (see AIRCRAFT_CATALOGS)
+AIRCRAFT_CSV_PATH = 'Aircraft Data - Aircraft Data (1).csv'
+
+
+# ===== Loading =====
+
+def generate_performance_profile(aircraft):
+    """
+    Generate a mandatory performance profile for an aircraft, including all key metrics.
+    Returns a dict with all required fields, raising ValueError if any are missing or invalid.
+    """
+    profile = {}
+    for metric in PERFORMANCE_PROFILE_METRICS:
+        value = aircraft.get(metric)
+        if value is None or value == '' or (isinstance(value, (int, float)) and value == 0):
+            raise ValueError(f"Missing or invalid value for required metric: {metric}")
+        profile[metric] = value
+    return profile
+
+
+def build_aircraft_records(df):
+    """
+    Map the aircraft sheet to flat aircraft records (see csv_ingest.AIRCRAFT_SHEET_SCHEMA), skipping
+    aircraft with an incomplete performance profile. Runs once per CSV content; load_aircraft_store
+    serves the compiled result.
+    """
+    ingest = ingest_aircraft_sheet(df)
+    for skipped in ingest.skipped:
+        logger.warning(f"Skipping aircraft due to incomplete performance profile: {skipped['reason']}")
+    return ingest.records()
+
+
+def load_aircraft_store(csv_path: str = AIRCRAFT_CSV_PATH) -> AircraftStore:
+    """Load the aircraft sheet into an AircraftStore (raises if the sheet cannot be loaded)"""
+    # Served from the compiled snapshot; the CSV is only parsed when its content changes
+    columns = open_csv_snapshot(csv_path).record_columns(
+        'aircraft', build_aircraft_records,
+        version=builder_fingerprint(generate_performance_profile) + schema_fingerprint(AIRCRAFT_SHEET_SCHEMA)
+    )
+    if not columns:
+        raise ValueError(f"No aircraft with a complete performance profile in {csv_path}")
+    # performance_profile is derived from each row when read rather than stored per aircraft
+    store = AircraftStore(columns, derived={'performance_profile': generate_performance_profile})
+    logger.info(f"Loaded {len(store)} aircraft from {csv_path} with complete performance profiles")
+    return store
+
+
+# ===== Queries =====
+
+def as_numbers(values: Sequence[Any]) -> np.ndarray:
+    """Numeric view of a column; None and non-numeric values become NaN (and fail every bound)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+        return values
+    return np.array([float(value) if isinstance(value, (int, float)) and not isinstance(value, bool)
+                     else np.nan for value in values], dtype=np.float64)
+
+
+def _take(values: Sequence[Any], rows: Optional[np.ndarray]) -> Sequence[Any]:
+    """values at rows (every value when rows is None)"""
+    if rows is None:
+        return values
+    if isinstance(values, np.ndarray):
+        return values[rows]
+    return [values[row] for row in rows.tolist()]
+
+
+@dataclass(frozen=True)
+class EncodedColumn:
+    """
+    Dictionary encoding of a column: codes[i] indexes categories (-1 for a missing value) and
+    categories are the distinct values in string order, so codes double as sort ranks
+    """
+    codes: np.ndarray
+    categories: List[Any]
+
+    def lookup(self, wanted: Callable[[Any], bool]) -> np.ndarray:
+        """Boolean table over codes (plus a trailing False slot that code -1 reads)"""
+        table = np.zeros(len(self.categories) + 1, dtype=bool)
+        table[:-1] = [bool(wanted(category)) for category in self.categories]
+        return table
+
+
+def encode_column(values: Sequence[Any]) -> EncodedColumn:
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    present = [value for value in values
+               if value is not None and not (isinstance(value, float) and np.isnan(value))]
+    categories = sorted(set(present), key=str)
+    positions = {category: code for code, category in enumerate(categories)}
+    codes = np.fromiter((positions.get(value, -1) if value is not None else -1 for value in values),
+                        dtype=np.int32, count=len(values))
+    return EncodedColumn(codes=codes, categories=categories)
+
+
+class ColumnSource(ABC):
+    """
+    Rows read column-wise through column(key); encoded(key) caches a column's dictionary encoding
+    so repeated queries match, rank and count categories without rescanning every value
+    """
+
+    def __init__(self):
+        self._encoded: Dict[str, EncodedColumn] = {}
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of rows"""
+
+    @abstractmethod
+    def column(self, key: str) -> Sequence[Any]:
+        """Values of key for every row, in row order"""
+
+    def encoded(self, key: str) -> EncodedColumn:
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = encode_column(self.column(key))
+        return encoded
+
+
+@dataclass(frozen=True)
+class Between:
+    """key within [low, high] (either bound optional)"""
+    key: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    # Planner cost rank: vectorized comparisons over the stored array
+    cost = 0
+
+    def mask(self, source: ColumnSource, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        values = as_numbers(_take(source.column(self.key), rows))
+        if self.low is not None and self.high is not None:
+            return (values >= self.low) & (values <= self.high)
+        if self.low is not None:
+            return values >= self.low
+        if self.high is not None:
+            return values <= self.high
+        return np.ones(len(values), dtype=bool)
+
+
+@dataclass(frozen=True)
+class OneOf:
+    """key equal to one of values (optionally ignoring case)"""
+    key: str
+    values: tuple
+    ignore_case: bool = False
+
+    # Planner cost rank: one table lookup per row over the encoded column
+    cost = 1
+
+    def mask(self, source: ColumnSource, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        encoded = source.encoded(self.key)
+        if self.ignore_case:
+            wanted = {str(value).lower() for value in self.values}
+            table = encoded.lookup(lambda category: str(category).lower() in wanted)
+        else:
+            wanted = set(self.values)
+            table = encoded.lookup(lambda category: category in wanted)
+        return table[_take(encoded.codes, rows)]
+
+
+@dataclass(frozen=True)
+class Contains:
+    """Case-insensitive substring match against any of keys"""
+    keys: tuple
+    text: str
+
+    # Planner cost rank: a substring scan of each key's distinct values
+    cost = 2
+
+    def mask(self, source: ColumnSource, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        needle = self.text.lower()
+        keep = None
+        for key in self.keys:
+            encoded = source.encoded(key)
+            table = encoded.lookup(lambda category: isinstance(category, str) and needle in category.lower())
+            found = table[_take(encoded.codes, rows)]
+            keep = found if keep is None else keep | found
+        return keep
+
+
+@dataclass(frozen=True)
+class Order:
+    """One sort key; NaN/None sort last in either direction and ties keep their current order"""
+    key: str
+    descending: bool = False
+
+
+@dataclass
+class CatalogQuery:
+    filters: Sequence[Any] = ()
+    order: Sequence[Order] = ()
+    page: int = 1
+    per_page: Optional[int] = None
+    facets: Sequence[str] = ()
+
+
+@dataclass
+class CatalogPage:
+    """Matching rows of one query page (indexes into the queried source) plus totals and facets"""
+    rows: np.ndarray
+    total: int
+    page: int
+    per_page: Optional[int]
+    facets: Dict[str, Dict[Any, int]] = field(default_factory=dict)
+
+    @property
+    def total_pages(self) -> int:
+        if not self.per_page:
+            return 1 if self.total else 0
+        return (self.total + self.per_page - 1) // self.per_page
+
+
+def plan_filters(filters: Sequence[Any]) -> List[Any]:
+    """Filters in evaluation order: cheapest first, so costlier conditions only see surviving rows"""
+    return sorted(filters, key=lambda condition: getattr(condition, 'cost', 3))
+
+
+def matching_rows(source: ColumnSource, filters: Sequence[Any]) -> np.ndarray:
+    """
+    Rows matching every filter. The first condition masks the whole source; each later one is
+    evaluated only on the rows still matching, so no per-condition mask of the full source is kept.
+    """
+    rows = None
+    for condition in plan_filters(filters):
+        keep = condition.mask(source, rows)
+        rows = np.flatnonzero(keep) if rows is None else rows[keep]
+        if not len(rows):
+            break
+    return np.arange(len(source)) if rows is None else rows
+
+
+def _sort_keys(source: ColumnSource, key: str, rows: np.ndarray):
+    """Numeric sort keys of the key column at rows (text is ranked in string order) and their missing mask"""
+    values = source.column(key)
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+        keys = values[rows].astype(np.float64)
+        return keys, np.isnan(keys)
+    picked = _take(values, rows)
+    if all(value is None or isinstance(value, (int, float)) for value in picked):
+        keys = as_numbers(picked)
+        return keys, np.isnan(keys)
+    codes = source.encoded(key).codes[rows]
+    return codes.astype(np.float64), codes < 0
+
+
+def _sorted_rows(source: ColumnSource, rows: np.ndarray, order: Order) -> np.ndarray:
+    """rows stably reordered by the order key, missing values last"""
+    if not len(rows):
+        return rows
+    keys, missing = _sort_keys(source, order.key, rows)
+    keys = np.where(missing, 0.0, -keys if order.descending else keys)
+    # lexsort is stable: by missing-ness first, then by key
+    return rows[np.lexsort((keys, missing))]
+
+
+def facet_counts(source: ColumnSource, key: str, rows: np.ndarray) -> Dict[Any, int]:
+    """Value counts over rows, most common first (ties in first-seen order); missing values are not counted"""
+    encoded = source.encoded(key)
+    codes = encoded.codes[rows]
+    codes = codes[codes >= 0]
+    if not len(codes):
+        return {}
+    present, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+    ranked = np.lexsort((first_seen, -counts))
+    return {encoded.categories[code]: int(count)
+            for code, count in zip(present[ranked].tolist(), counts[ranked].tolist())}
+
+
+def numeric_stats(values: Sequence[Any], rows: np.ndarray) -> Dict[str, float]:
+    """min/max/avg/median of a numeric column over rows (NaN ignored; zeros when nothing is left)"""
+    numbers = as_numbers(_take(values, rows)).astype(np.float64, copy=False)
+    numbers = numbers[~np.isnan(numbers)]
+    if not len(numbers):
+        return {'min': 0.0, 'max': 0.0, 'avg': 0.0, 'median': 0.0}
+    return {'min': float(numbers.min()), 'max': float(numbers.max()),
+            'avg': float(numbers.mean()), 'median': float(np.median(numbers))}
+
+
+def run_query(source: ColumnSource, query: CatalogQuery) -> CatalogPage:
+    """Filter, facet, sort and page the rows of source"""
+    rows = matching_rows(source, query.filters)
+
+    facets = {key: facet_counts(source, key, rows) for key in query.facets}
+
+    # Stable sorts from the least to the most significant key
+    for order in reversed(list(query.order)):
+        rows = _sorted_rows(source, rows, order)
+
+    total = len(rows)
+    page = max(1, int(query.page or 1))
+    if query.per_page:
+        start = (page - 1) * query.per_page
+        rows = rows[start:start + query.per_page]
+    return CatalogPage(rows=rows, total=total, page=page, per_page=query.per_page, facets=facets)
+
+
+class RecordColumns(ColumnSource):
+    """
+    Column-wise access to a list of aircraft dicts, so run_query serves callers that hold records
+    (with extra per-request fields) rather than catalog rows. computed adds named per-record keys.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]],
+                 defaults: Optional[Dict[str, Any]] = None,
+                 computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None):
+        super().__init__()
+        self.records = list(records)
+        self._defaults = dict(defaults or {})
+        self._computed = dict(computed or {})
+        self._columns: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, key: str) -> List[Any]:
+        values = self._columns.get(key)
+        if values is None:
+            compute = self._computed.get(key)
+            if compute is not None:
+                values = [compute(record) for record in self.records]
+            else:
+                default = self._defaults.get(key)
+                values = [record.get(key, default) for record in self.records]
+            self._columns[key] = values
+        return values
+
+    def query(self, query: CatalogQuery) -> List[Dict[str, Any]]:
+        """The records of one query page, in order"""
+        page = run_query(self, query)
+        return [self.records[row] for row in page.rows.tolist()]
+
+
+class AircraftCatalog(ColumnSource):
+    """One load of the aircraft sheet and everything derived from it, swapped in as a unit"""
+
+    def __init__(self, store: AircraftStore):
+        super().__init__()
+        self.store = store
+        # Read-only aircraft record views (one per store row)
+        self.aircraft = store.views
+        # Columnar view of the fleet for batched scoring
+        self.fleet = AircraftFleet(self.aircraft, column_source=store.column)
+        # Default normalization context: every aircraft in the fleet
+        self.scoring_context = ScoringContext.from_fleet(self.fleet)
+        # Content fingerprint of the fleet; stamps materialized listing scores and cache keys
+        self.version = store.fingerprint()[:16]
+        # Derived columns (define/column) and other derived values (derived), each built once
+        self._columns_built: Dict[str, Sequence[Any]] = {}
+        self._builders: Dict[str, Callable[['AircraftCatalog'], Sequence[Any]]] = {}
+        self._derived: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def derived(self, name: str, build: Callable[['AircraftCatalog'], Any]) -> Any:
+        """Any other value built from the catalog (indexes, aggregates, ...), built once and kept with it"""
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived[name] = build(self)
+        return value
+
+    def define(self, name: str, build: Callable[['AircraftCatalog'], Sequence[Any]]):
+        """Register a derived column (built from the catalog on first read, then kept with it)"""
+        self._builders.setdefault(name, build)
+
+    def column(self, key: str) -> Sequence[Any]:
+        """A stored field as stored (numeric arrays are zero-copy) or a defined derived column"""
+        values = self._columns_built.get(key)
+        if values is not None:
+            return values
+        build = self._builders.get(key)
+        if build is None:
+            return self.store.values(key)
+        values = self._columns_built[key] = build(self)
+        return values
+
+    def query(self, query: CatalogQuery) -> CatalogPage:
+        return run_query(self, query)
+
+    def rows(self, query: CatalogQuery) -> List[Any]:
+        """Aircraft views of one query page, in order"""
+        return [self.aircraft[row] for row in self.query(query).rows.tolist()]
+
+    def stats(self, key: str, rows: Optional[np.ndarray] = None) -> Dict[str, float]:
+        return numeric_stats(self.column(key), np.arange(len(self.store)) if rows is None else rows)
+
+    def facet(self, key: str, rows: Optional[np.ndarray] = None) -> Dict[Any, int]:
+        return facet_counts(self, key, np.arange(len(self.store)) if rows is None else rows)
+
+
+def build_aircraft_catalog(csv_path: str = AIRCRAFT_CSV_PATH) -> AircraftCatalog:
+    return AircraftCatalog(load_aircraft_store(csv_path))
+
+
+# The live aircraft catalog; rebuilt off the request path when the CSV changes (or on admin upload)
+AIRCRAFT_CATALOGS = DatasetRegistry(
+    'aircraft', build_aircraft_catalog, lambda catalog: catalog.version,
+    source_path=AIRCRAFT_CSV_PATH,
+    poll_interval=float(os.environ.get('AIRCRAFT_DATA_POLL_INTERVAL', 5)),
+    # An unreadable sheet serves an empty fleet until the CSV is fixed
+    fallback=lambda: AircraftCatalog(AircraftStore({}))
+)
+
+
+class CatalogHandle:
+    """
+    A caller's reference to the catalog of one sheet: the live registry catalog for the app's sheet
+    (following hot reloads), otherwise a catalog of its own loaded on first use and by reload()
+    """
+
+    def __init__(self, csv_path: str = AIRCRAFT_CSV_PATH):
+        self.csv_path = csv_path
+        self.live = os.path.abspath(csv_path) == os.path.abspath(AIRCRAFT_CSV_PATH)
+        self._catalog: Optional[AircraftCatalog] = None
+
+    def current(self) -> AircraftCatalog:
+        if self.live:
+            return AIRCRAFT_CATALOGS.current().data
+        if self._catalog is None:
+            return self.reload()
+        return self._catalog
+
+    def reload(self) -> AircraftCatalog:
+        """Re-read the sheet now (the live catalog swaps in a new version only if the content changed)"""
+        if self.live:
+            return AIRCRAFT_CATALOGS.reload().data
+        self._catalog = build_aircraft_catalog(self.csv_path)
+        return self._catalog
@@ -0,0 +1,222 @@
+"""
+Compact Aircraft Store for Jet Finder
+Keeps the aircraft dataset as one typed array (numbers) or interned string list (text) per field and
+hands out read-only row views, so workers hold a single compact copy of the fleet and no request can
+mutate another request's aircraft. Per-request fields (scores, deal info) go on annotated views.
+"""
+
+import sys
+import hashlib
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Sequence
+
+
+def _compact_column(values: Sequence[Any]):
+    """
+    Storage for one field: a read-only int64/float64 array when every value is an int (or every value
+    a float), an interned list for all-text fields, otherwise the values as a plain list.
+    """
+    if isinstance(values, np.ndarray):
+        if values.dtype.kind in 'iu':
+            column = values.astype(np.int64, copy=False)
+        elif values.dtype.kind == 'f':
+            column = values.astype(np.float64, copy=False)
+        elif values.dtype.kind == 'U':
+            return [sys.intern(value) for value in values.tolist()]
+        else:
+            return values.tolist()
+        if column.flags.writeable:
+            column.setflags(write=False)
+        return column
+
+    values = list(values)
+    kinds = {type(value) for value in values}
+    if kinds == {int}:
+        return _compact_column(np.array(values, dtype=np.int64))
+    if kinds == {float}:
+        return _compact_column(np.array(values, dtype=np.float64))
+    if kinds == {str}:
+        return [sys.intern(value) for value in values]
+    return values
+
+
+class AircraftView(Mapping):
+    """
+    Read-only aircraft record backed by a row of an AircraftStore.
+    Behaves like the record dict for reads (get, [], in, items, dict(view)); copy() returns a plain dict.
+    """
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'AircraftStore', row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        """Row of this aircraft in its store (and in an AircraftFleet built from it)"""
+        return self._row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.value(self._row, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._store.key_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.keys)
+
+    def __len__(self) -> int:
+        return len(self._store.keys)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._store.key_set:
+            return default
+        return self._store.value(self._row, key)
+
+    def copy(self) -> Dict[str, Any]:
+        """Mutable dict snapshot of the record"""
+        return dict(self)
+
+    def annotate(self, **fields: Any) -> 'AnnotatedAircraft':
+        """This aircraft plus per-request fields, without touching the shared record"""
+        return AnnotatedAircraft(self, fields)
+
+    def __repr__(self) -> str:
+        return f"AircraftView({dict(self)!r})"
+
+
+class AnnotatedAircraft(Mapping):
+    """An aircraft view overlaid with per-request fields (the fields win on key clashes)"""
+
+    __slots__ = ('_view', '_fields')
+
+    def __init__(self, view: Mapping, fields: Dict[str, Any]):
+        self._view = view
+        self._fields = fields
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """The per-request fields, mutable for the owner of this annotation"""
+        return self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            return self._fields[key]
+        return self._view[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields or key in self._view
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._view
+        for key in self._fields:
+            if key not in self._view:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._view) + sum(1 for key in self._fields if key not in self._view)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._fields:
+            return self._fields[key]
+        return self._view.get(key, default)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def annotate(self, **fields: Any) -> 'AnnotatedAircraft':
+        return AnnotatedAircraft(self._view, {**self._fields, **fields})
+
+    def __repr__(self) -> str:
+        return f"AnnotatedAircraft({dict(self)!r})"
+
+
+class AircraftStore:
+    """
+    Struct-of-arrays aircraft dataset.
+    Fields are stored column-wise in record key order; derived fields (e.g. performance_profile) are
+    computed from the row view when read instead of being stored per aircraft.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[Any]],
+                 derived: Optional[Dict[str, Callable[[AircraftView], Any]]] = None):
+        self._columns = {key: _compact_column(values) for key, values in columns.items()}
+        self._derived = dict(derived or {})
+        self.keys = tuple(self._columns) + tuple(key for key in self._derived if key not in self._columns)
+        self.key_set = frozenset(self.keys)
+        self.size = len(next(iter(self._columns.values()))) if self._columns else 0
+        self.views: List[AircraftView] = [AircraftView(self, row) for row in range(self.size)]
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]],
+                     derived: Optional[Dict[str, Callable[[AircraftView], Any]]] = None) -> 'AircraftStore':
+        """Store built from flat record dicts (keys missing from a record read as None)"""
+        records = list(records)
+        keys = dict.fromkeys(key for record in records for key in record)
+        return cls({key: [record.get(key) for record in records] for key in keys}, derived)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, row: int) -> AircraftView:
+        return self.views[row]
+
+    def __iter__(self) -> Iterator[AircraftView]:
+        return iter(self.views)
+
+    def value(self, row: int, key: str) -> Any:
+        """One field of one aircraft as a plain Python value"""
+        column = self._columns.get(key)
+        if column is None:
+            derive = self._derived.get(key)
+            if derive is None:
+                raise KeyError(key)
+            return derive(self.views[row])
+        if isinstance(column, np.ndarray):
+            return column.item(row)
+        return column[row]
+
+    def values(self, key: str) -> Sequence[Any]:
+        """
+        A field for every aircraft as stored: the read-only int64/float64 array of a numeric field, the
+        value list of any other field (derived fields are computed per row; missing fields read None)
+        """
+        column = self._columns.get(key)
+        if column is not None:
+            return column
+        derive = self._derived.get(key)
+        if derive is None:
+            return [None] * self.size
+        return [derive(view) for view in self.views]
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        A field as float64 for every aircraft (AircraftFleet column semantics: None becomes NaN,
+        non-numeric values and missing fields become 0)
+        """
+        column = self._columns.get(key)
+        if isinstance(column, np.ndarray):
+            # float64 columns are returned as stored (zero-copy over a memory-mapped snapshot)
+            return column.astype(np.float64, copy=False)
+        if column is None:
+            return np.zeros(self.size)
+        return np.array([np.nan if value is None else float(value) if isinstance(value, (int, float)) else 0.0
+                         for value in column], dtype=np.float64)
+
+    def fingerprint(self) -> str:
+        """Content hash of the stored fields (identifies a dataset version)"""
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for key, column in self._columns.items():
+                digest.update(key.encode('utf-8'))
+                if isinstance(column, np.ndarray):
+                    digest.update(column.dtype.str.encode('ascii'))
+                    digest.update(np.ascontiguousarray(column).tobytes())
+                else:
+                    digest.update(repr(column).encode('utf-8'))
+            digest.update(repr(sorted(self._derived)).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
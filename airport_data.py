@@ -0,0 +1,303 @@
+"""
+Airport Table for Jet Finder
+Loads the airports JSON once into a compiled, memory-mapped column table (coordinates as float64
+arrays, codes and names as interned strings) shared by the airport search and distance features,
+plus the prefix / n-gram search index behind the airport autocomplete and the latitude-band spatial
+index behind nearest-airport and radius queries.
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+import numpy as np
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from dataset_snapshot import open_csv_snapshot
+
+logger = logging.getLogger(__name__)
+
+AIRPORTS_PATH = os.path.join('static', 'data', 'airports.json')
+FALLBACK_AIRPORTS_PATH = 'airports.json'
+
+AIRPORT_TEXT_FIELDS = ('iata', 'icao', 'name', 'city', 'country', 'size')
+
+
+def build_airport_records(airports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flat airport records with every field present (text as str, coordinates as float)"""
+    records = []
+    for airport in airports:
+        record = {field: str(airport.get(field) or '') for field in AIRPORT_TEXT_FIELDS}
+        record['lat'] = float(airport.get('lat') or 0)
+        record['lon'] = float(airport.get('lon') or 0)
+        records.append(record)
+    return records
+
+
+class AirportTable:
+    """Column-wise airport list; lat/lon are read-only float64 arrays, row i is airport i of the file"""
+
+    def __init__(self, columns: Dict[str, Any], source_path: Optional[str] = None):
+        self.source_path = source_path
+        self.size = len(columns['lat']) if columns else 0
+        self.text = {field: [sys.intern(str(value)) for value in columns.get(field, [''] * self.size)]
+                     for field in AIRPORT_TEXT_FIELDS}
+        self.lat = self._coordinates(columns.get('lat', []))
+        self.lon = self._coordinates(columns.get('lon', []))
+        self._search_index: Optional['AirportSearchIndex'] = None
+        self._spatial_index: Optional['AirportSpatialIndex'] = None
+
+    @staticmethod
+    def _coordinates(values) -> np.ndarray:
+        column = np.asarray(values, dtype=np.float64)
+        if column.flags.writeable:
+            column.setflags(write=False)
+        return column
+
+    def __len__(self) -> int:
+        return self.size
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Airport row as the dict shape of airports.json"""
+        record = {field: self.text[field][row] for field in AIRPORT_TEXT_FIELDS}
+        record['lat'] = self.lat.item(row)
+        record['lon'] = self.lon.item(row)
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.record(row) for row in range(self.size))
+
+    @property
+    def search_index(self) -> 'AirportSearchIndex':
+        """Autocomplete index over this table, built on first use"""
+        if self._search_index is None:
+            self._search_index = AirportSearchIndex(self)
+        return self._search_index
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, str]]:
+        return self.search_index.search(query, limit)
+
+    @property
+    def spatial_index(self) -> 'AirportSpatialIndex':
+        """Nearest / radius index over this table's coordinates, built on first use"""
+        if self._spatial_index is None:
+            self._spatial_index = AirportSpatialIndex(self)
+        return self._spatial_index
+
+
+MIN_SEARCH_LENGTH = 2
+SEARCH_GRAM_SIZES = (2, 3)
+SEARCH_CHUNK = 64
+EMPTY_POSTINGS = np.zeros(0, dtype=np.int32)
+
+
+def _grams(text: str, size: int) -> set:
+    return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+
+class AirportSearchIndex:
+    """
+    Airport autocomplete (case-insensitive): IATA code prefix, then ICAO code prefix, then name or
+    city substring, each match type in name order. Every airport lives in the index by its position
+    in name order, so a posting list read front to back is already ranked. Code prefixes (codes are at
+    most 4 characters) map straight to their postings; name/city substrings start from the rarest of
+    the query's n-grams and verify candidates until the page is full.
+    """
+
+    def __init__(self, table: AirportTable):
+        self.table = table
+        names = table.text['name']
+        # Equal match types rank by name, ties in file order
+        self.by_name = np.array(sorted(range(len(table)), key=names.__getitem__), dtype=np.int32)
+        self._upper = {field: [value.upper() for value in table.text[field]]
+                       for field in ('iata', 'icao', 'name', 'city')}
+
+        prefixes: Dict[str, Dict[str, List[int]]] = {'iata': {}, 'icao': {}}
+        grams: Dict[int, Dict[str, List[int]]] = {size: {} for size in SEARCH_GRAM_SIZES}
+        for position, row in enumerate(self.by_name.tolist()):
+            for field, index in prefixes.items():
+                code = self._upper[field][row]
+                for end in range(1, len(code) + 1):
+                    index.setdefault(code[:end], []).append(position)
+            name, city = self._upper['name'][row], self._upper['city'][row]
+            for size, index in grams.items():
+                for gram in _grams(name, size) | _grams(city, size):
+                    index.setdefault(gram, []).append(position)
+
+        self._prefixes = {field: self._compile(index) for field, index in prefixes.items()}
+        self._grams = {size: self._compile(index) for size, index in grams.items()}
+        # Exact codes (IATA, then ICAO; the first airport in the file wins a shared code)
+        self._rows_by_code: Dict[str, int] = {}
+        for field in ('iata', 'icao'):
+            for row, code in enumerate(self._upper[field]):
+                if code:
+                    self._rows_by_code.setdefault(code, row)
+
+    def row_for_code(self, code: str) -> Optional[int]:
+        """Row of the airport with this IATA or ICAO code (any case), or None"""
+        return self._rows_by_code.get((code or '').strip().upper())
+
+    @staticmethod
+    def _compile(index: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+        return {key: np.array(positions, dtype=np.int32) for key, positions in index.items()}
+
+    def match_type(self, row: int, query: str) -> Optional[str]:
+        """How airport row matches an upper-case query ('iata', 'icao', 'name_city' or None)"""
+        if self._upper['iata'][row].startswith(query):
+            return 'iata'
+        if self._upper['icao'][row].startswith(query):
+            return 'icao'
+        if query in self._upper['name'][row] or query in self._upper['city'][row]:
+            return 'name_city'
+        return None
+
+    @staticmethod
+    def _chunks(positions: np.ndarray) -> Iterator[np.ndarray]:
+        return (positions[start:start + SEARCH_CHUNK] for start in range(0, len(positions), SEARCH_CHUNK))
+
+    def _name_city_candidates(self, query: str) -> Iterator[np.ndarray]:
+        """
+        Chunks of name-order positions that may contain query (a superset of the name/city matches):
+        the rarest n-gram's postings, each chunk narrowed to the positions in every other n-gram's postings
+        """
+        size = min(len(query), max(SEARCH_GRAM_SIZES))
+        postings = sorted((self._grams[size].get(gram, EMPTY_POSTINGS) for gram in _grams(query, size)), key=len)
+        others = postings[1:]
+        for chunk in self._chunks(postings[0]):
+            for other in others:
+                found = np.minimum(np.searchsorted(other, chunk), len(other) - 1)
+                chunk = chunk[other[found] == chunk]
+            yield chunk
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, str]]:
+        """Up to limit (row, match_type) results for query, best first"""
+        query = query.strip().upper()
+        if len(query) < MIN_SEARCH_LENGTH or limit <= 0:
+            return []
+        results = []
+        for match_type, chunks in (('iata', self._chunks(self._prefixes['iata'].get(query, EMPTY_POSTINGS))),
+                                   ('icao', self._chunks(self._prefixes['icao'].get(query, EMPTY_POSTINGS))),
+                                   ('name_city', self._name_city_candidates(query))):
+            # Postings are read a chunk at a time: usually only the front of a long list is needed
+            for chunk in chunks:
+                for row in self.by_name[chunk].tolist():
+                    # Skip airports already listed under a better match type (or false n-gram candidates)
+                    if self.match_type(row, query) == match_type:
+                        results.append((row, match_type))
+                        if len(results) == limit:
+                            return results
+        return results
+
+
+EARTH_RADIUS_NM = 3440.065
+# Angular distance (degrees) beyond which every airport is in range
+HALF_CIRCUMFERENCE_DEGREES = 180.0
+SPATIAL_BAND_DEGREES = 1.0
+NEAREST_START_RADIUS_NM = 50.0
+
+
+def haversine_nm(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distances in NM between coordinate arrays (degrees), element-wise"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype=np.float64)) for values in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class AirportSpatialIndex:
+    """
+    Airports bucketed into 1-degree latitude bands, each band sorted by longitude. A radius query
+    visits only the bands the search circle spans and binary-searches each band for the circle's
+    longitude extent, then measures the exact great-circle distance of those candidates alone.
+    """
+
+    def __init__(self, table: AirportTable):
+        self.table = table
+        self.bands = int(180 / SPATIAL_BAND_DEGREES)
+        band = np.clip(((table.lat + 90) // SPATIAL_BAND_DEGREES).astype(np.intp), 0, self.bands - 1)
+        # Rows by band, then longitude
+        self.order = np.lexsort((table.lon, band))
+        self.sorted_lon = table.lon[self.order]
+        self.band_starts = np.searchsorted(band[self.order], np.arange(self.bands + 1))
+
+    def _candidates(self, lat: float, lon: float, radius_degrees: float) -> np.ndarray:
+        """Rows inside the bounding box of the search circle (a superset of the rows within it)"""
+        if radius_degrees >= HALF_CIRCUMFERENCE_DEGREES:
+            return self.order
+        first = max(0, int((lat - radius_degrees + 90) // SPATIAL_BAND_DEGREES))
+        last = min(self.bands - 1, int((lat + radius_degrees + 90) // SPATIAL_BAND_DEGREES))
+        if abs(lat) + radius_degrees >= 90:
+            # The circle covers a pole: every longitude
+            return self.order[self.band_starts[first]:self.band_starts[last + 1]]
+
+        # Widest longitude extent of a spherical cap centred at lat
+        half_width = np.degrees(np.arcsin(np.sin(np.radians(radius_degrees)) / np.cos(np.radians(lat))))
+        low, high = lon - half_width, lon + half_width
+        spans = [(low, high)]
+        if low < -180:
+            spans = [(low + 360, 180.0), (-180.0, high)]
+        elif high > 180:
+            spans = [(low, 180.0), (-180.0, high - 360)]
+
+        chunks = []
+        for band in range(first, last + 1):
+            start, end = self.band_starts[band], self.band_starts[band + 1]
+            longitudes = self.sorted_lon[start:end]
+            for span_low, span_high in spans:
+                left = start + np.searchsorted(longitudes, span_low, side='left')
+                right = start + np.searchsorted(longitudes, span_high, side='right')
+                if right > left:
+                    chunks.append(self.order[left:right])
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.intp)
+
+    def within(self, lat: float, lon: float, radius_nm: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of the airports within radius_nm of (lat, lon) and their distances, nearest first"""
+        radius_degrees = np.degrees(max(radius_nm, 0.0) / EARTH_RADIUS_NM)
+        # A hair of slack so rounding never drops an airport right on the circle from the candidates
+        rows = self._candidates(lat, lon, radius_degrees + 1e-6)
+        distances = haversine_nm(lat, lon, self.table.lat[rows], self.table.lon[rows])
+        keep = distances <= radius_nm
+        rows, distances = rows[keep], distances[keep]
+        # Nearest first, ties in file order
+        order = np.lexsort((rows, distances))
+        return rows[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of the k airports nearest to (lat, lon) and their distances, nearest first"""
+        k = min(max(k, 0), len(self.table))
+        radius_nm = NEAREST_START_RADIUS_NM
+        while True:
+            rows, distances = self.within(lat, lon, radius_nm)
+            # Exact once the circle holds k airports: nothing outside it is nearer
+            if len(rows) >= k or np.degrees(radius_nm / EARTH_RADIUS_NM) >= HALF_CIRCUMFERENCE_DEGREES:
+                return rows[:k], distances[:k]
+            radius_nm *= 4
+
+
+def load_airport_table(path: Optional[str] = None) -> AirportTable:
+    """Airport table compiled from path (default: static/data/airports.json, falling back to ./airports.json)"""
+    if path is None:
+        path = AIRPORTS_PATH if os.path.exists(AIRPORTS_PATH) else FALLBACK_AIRPORTS_PATH
+
+    def read_airports():
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    columns = open_csv_snapshot(path).record_columns('airports', build_airport_records, source=read_airports)
+    table = AirportTable(columns or {}, path)
+    logger.info(f"Loaded {len(table)} airports from {path}")
+    return table
+
+
+_AIRPORT_TABLE: Optional[AirportTable] = None
+_AIRPORT_TABLE_LOCK = threading.Lock()
+
+
+def get_airport_table() -> AirportTable:
+    """Process-wide airport table, loaded on first use (or by the preloading gunicorn master)"""
+    global _AIRPORT_TABLE
+    if _AIRPORT_TABLE is None:
+        with _AIRPORT_TABLE_LOCK:
+            if _AIRPORT_TABLE is None:
+                _AIRPORT_TABLE = load_airport_table()
+    return _AIRPORT_TABLE
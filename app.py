@@ -1,44 +1,69 @@
-from flask import Flask, render_template, request, jsonify, url_for, redirect, flash, session
+from lazy_init import STARTUP_PROFILE, LazySubsystem, optional_import
+STARTUP_PROFILE.start_imports()
+
+from flask import Flask, render_template, request, jsonify, url_for, redirect, flash, session, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from collections.abc import Mapping
 import os
 import json
-import pandas as pd
+import numpy as np
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 from marketplace import marketplace, load_listings, recommend_aircraft, get_current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import sqlite3
 from functools import wraps
-import stripe
 import logging
+from scoring_engine import ScoringContext, score_batch, top_k
+from formula_engine import load_spreadsheet_model
+from filter_engine import compile_filters
+from score_cache import ScoreCache, query_fingerprint
+from listing_scoring import score_listing_group, engine_tbo, resale_value_weights, data_score_details
+from listing_score_store import ListingScoreStore, USER_LISTING_TYPE, create_listing_score_indexes
+from match_engine import ListingMatchFeatures, BuyerPreferences, MatchScores
+from dataset_registry import replace_source_file
+from csv_ingest import AIRCRAFT_SHEET_SCHEMA, PERFORMANCE_PROFILE_METRICS
+from airport_data import get_airport_table
+from market_cube import MarketCube
+from distance_service import DISTANCE_SERVICE
+from route_feasibility import RouteFeasibility, RANGE_RESERVE
+from mission_planner import MISSION_PLANNER, OBJECTIVES
+from aircraft_catalog import AIRCRAFT_CATALOGS, AIRCRAFT_CSV_PATH, CatalogQuery, Contains, RecordColumns
+
+STARTUP_PROFILE.stop_imports()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import the enhanced data manager
-try:
-    from enhanced_data_manager import enhanced_data_manager
-except ImportError:
-    # Fallback if enhanced data manager isn't available
-    enhanced_data_manager = None
+# The pandas-based data manager and the Avinode client (requests) load on first use
+ENHANCED_DATA_MANAGER = LazySubsystem(
+    'enhanced data manager', optional_import('enhanced_data_manager', 'enhanced_data_manager'))
+AVINODE_CLIENT = LazySubsystem('avinode client', optional_import('avinode_integration', 'avinode_client'))
+
+class JetFinderJSONProvider(DefaultJSONProvider):
+    """Serializes read-only aircraft views (and other mappings) like the record dicts they stand for"""
 
-# Import Avinode integration
-try:
-    from avinode_integration import avinode_client
-except ImportError:
-    avinode_client = None
+    @staticmethod
+    def default(o):
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
+app.json = JetFinderJSONProvider(app)
 app.secret_key = 'your-secret-key-change-this'
 
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
 
-# Global scoring dataset (set per-request to ensure normalization uses the current filtered set)
-SCORING_DATASET = None
+# Stripe configuration (the SDK is imported and keyed on first use)
+def load_stripe():
+    import stripe
+    stripe.api_key = os.environ.get('STRIPE_SECRET_KEY', 'sk_test_...')  # Replace with your actual test key
+    return stripe
 
-# Stripe configuration
-stripe.api_key = os.environ.get('STRIPE_SECRET_KEY', 'sk_test_...')  # Replace with your actual test key
+STRIPE = LazySubsystem('stripe', load_stripe)
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', 'pk_test_...')  # Replace with your actual test key
 
 # Individual subscription price IDs
@@ -530,6 +555,7 @@ def init_db():
             UNIQUE(listing_id, listing_type)
         )
     ''')
+    create_listing_score_indexes(cursor)
     
     # Buyer preferences table for match scoring
     cursor.execute('''
@@ -587,8 +613,13 @@ def init_db():
     conn.commit()
     conn.close()
 
-# Initialize database on startup
-init_db()
+# Schema setup runs once per deploy (Procfile release phase), not on every import or worker start
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or migrate the database schema"""
+    with STARTUP_PROFILE.stage('init_db'):
+        init_db()
+    print("Database schema is up to date")
 
 # User management functions
 def get_user_by_id(user_id):
@@ -760,6 +791,17 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Accounts allowed to run site-wide admin operations (comma-separated emails)
+ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+
+def is_admin_user():
+    """True when the logged-in user's email is in ADMIN_EMAILS"""
+    user_id = session.get('user_id')
+    if not user_id or not ADMIN_EMAILS:
+        return False
+    user = get_user_by_id(user_id)
+    return bool(user) and (user.get('email') or '').strip().lower() in ADMIN_EMAILS
+
 def subscription_required(subscription_type, price_per_month=None):
     """Decorator factory to require specific subscription type"""
     def decorator(f):
@@ -1097,174 +1139,159 @@ def get_service_categories():
         'Consulting'
     ]
 
-def load_aircraft_data():
+def current_dataset_version():
+    """
+    Registry version of the aircraft dataset pinned to the current request (the live version outside
+    requests), so one request never mixes two datasets even if a reload lands mid-request
+    """
+    if has_request_context():
+        version = getattr(g, 'aircraft_dataset', None)
+        if version is None:
+            version = g.aircraft_dataset = AIRCRAFT_CATALOGS.current()
+        return version
+    return AIRCRAFT_CATALOGS.current()
+
+def current_dataset():
+    """The aircraft dataset pinned to the current request (see current_dataset_version)"""
+    return current_dataset_version().data
+
+@app.before_request
+def pin_aircraft_dataset():
+    """Notice CSV changes (reloaded in the background) and pin the live dataset for this request"""
+    AIRCRAFT_CATALOGS.poll()
+    current_dataset_version()
+
+def fleet_categories(fleet):
+    """Aircraft category of each fleet row (the spreadsheet model picks fuel and pilot pay inputs by it)"""
+    return [record.get('category') for record in fleet.records]
+
+def load_checked_spreadsheet_model():
+    """Spreadsheet model, checked once against the live dataset: at the default inputs it must reproduce the sheet"""
+    model = load_spreadsheet_model()
+    if model is not None:
+        fleet = AIRCRAFT_CATALOGS.current().data.fleet
+        mismatches = model.check_records(fleet.column, fleet_categories(fleet))
+        if mismatches:
+            logger.warning(f"Spreadsheet model does not reproduce the sheet at the default inputs: {mismatches}")
+    return model
+
+# Compiled spreadsheet formulas for recomputing derived cost metrics from user inputs
+SPREADSHEET_MODEL = LazySubsystem('spreadsheet model', load_checked_spreadsheet_model)
+
+# Ranked Jet Finder results keyed by query fingerprint (size/TTL configurable via environment)
+SCORE_CACHE = ScoreCache(
+    max_entries=int(os.environ.get('SCORE_CACHE_SIZE', 256)),
+    ttl_seconds=float(os.environ['SCORE_CACHE_TTL']) if os.environ.get('SCORE_CACHE_TTL') else None
+)
+
+# Priority/Data scores materialized into listing_scores, refreshed per aircraft-type group
+LISTING_SCORES = ListingScoreStore('instance/jet_finder.db')
+# User listings are scored against each other under their own listing_type; pending ones too, so a
+# new listing has its scores by the time it is reviewed
+USER_LISTING_SCORES = ListingScoreStore('instance/jet_finder.db', USER_LISTING_TYPE)
+SCORED_USER_LISTING_STATUSES = ('pending', 'active')
+# Statuses that take a listing out of its group
+UNSCORED_USER_LISTING_STATUSES = ('rejected', 'deleted')
+
+def reload_aircraft_data(background=False):
+    """
+    Rebuild the aircraft dataset from the CSV and swap it in once fully built; requests in flight
+    finish on the version they pinned. With background=True the build runs on a worker thread.
+    """
+    if background:
+        return AIRCRAFT_CATALOGS.reload_in_background()
+    return AIRCRAFT_CATALOGS.reload()
+
+def on_aircraft_dataset_swap(new, old):
+    """Caches keyed by query alone must not outlive the dataset they were scored against"""
+    SCORE_CACHE.invalidate()
+
+AIRCRAFT_CATALOGS.on_swap(on_aircraft_dataset_swap)
+
+def preload_shared_data():
+    """
+    Load every read-only dataset before gunicorn forks its workers (see gunicorn.conf.py), so the
+    workers share the master's memory-mapped snapshot pages instead of each building its own copy
+    """
+    with STARTUP_PROFILE.stage('aircraft dataset'):
+        AIRCRAFT_CATALOGS.current()
+    with STARTUP_PROFILE.stage('airport table'):
+        airports = get_airport_table()
+        airports.search_index, airports.spatial_index
+    SPREADSHEET_MODEL.get()
+    ENHANCED_DATA_MANAGER.get()
+
+def get_match_features():
+    """Buyer match features of the pinned fleet, extracted once per dataset version"""
+    dataset = current_dataset_version()
+    return dataset.derived('match_features', lambda: ListingMatchFeatures(dataset.data.fleet.records))
+
+def get_match_scores(preferences):
+    """
+    Cached batch match scores of the fleet for one buyer_preferences row.
+    Keyed by the dataset, the parsed preferences and the current date (maintenance recency counts
+    whole days).
+    """
+    features = get_match_features()
+    parsed = BuyerPreferences(preferences)
+    now = datetime.now()
+    match_key = query_fingerprint(kind='match', dataset=current_dataset().version,
+                                  preferences=parsed.fingerprint_parts(), day=now.date())
+    scores = SCORE_CACHE.get(match_key)
+    if scores is None or scores.features is not features:
+        scores = MatchScores(features, parsed, now)
+        SCORE_CACHE.put(match_key, scores)
+    return scores
+
+def get_route_feasibility(codes, reserve=RANGE_RESERVE):
+    """
+    Route feasibility matrix of the pinned fleet over a set of airports, cached by airport set
+    (order-insensitive) so repeat network queries are bitset ANDs
+    """
+    dataset = current_dataset()
+    airports = sorted({str(code).strip().upper() for code in codes})
+    key = query_fingerprint(kind='route_feasibility', dataset=dataset.version, airports=airports, reserve=reserve)
+    return SCORE_CACHE.get_or_compute(
+        key, lambda: RouteFeasibility(dataset.fleet, get_airport_table(), airports, reserve=reserve))
+
+def get_listing_scores():
+    """Materialized listing score store, rebuilt first if it predates the loaded fleet or scoring rules"""
+    dataset = current_dataset()
+    LISTING_SCORES.ensure_current(dataset.aircraft, dataset.version)
+    return LISTING_SCORES
+
+def user_listing_scores(scores):
+    """Client view of a user listing's materialized listing_scores row (None when it has none yet)"""
+    if not scores:
+        return None
+    return {
+        'priority_score': round(scores['priority_score'], 1),
+        'data_score': round(scores['data_score'], 1),
+        'category_comparison': {
+            'aircraft_type': scores['aircraft_type'],
+            'position': scores['category_position'],
+            'total_in_category': scores['total_in_category'],
+            'best_in_category': round(scores['category_best_score'], 1),
+            'percentile': round(scores['percentile_rank'], 1)
+        },
+        'last_calculated': scores['last_calculated']
+    }
+
+def refresh_user_listing_scores(listing_ids):
+    """
+    Rescore only the aircraft-type groups of the user listings that were created, approved, rejected
+    or deleted (rejected and deleted listings leave their group); the whole table is rebuilt if it
+    is stale
+    """
     try:
-        df = pd.read_csv('Aircraft Data - Aircraft Data (1).csv')
-        aircraft_data = []
-        
-        def safe_int_convert(value, default=0):
-            """Safely convert a value to int, handling commas and NaN"""
-            if pd.isna(value):
-                return default
-            if isinstance(value, (int, float)):
-                return int(value)
-            if isinstance(value, str):
-                # Remove commas, dollar signs, percentages, and other characters
-                cleaned = value.replace(',', '').replace('$', '').replace('%', '').strip()
-                try:
-                    return int(float(cleaned))
-                except (ValueError, TypeError):
-                    return default
-            return default
-        
-        def safe_float_convert(value, default=0.0):
-            """Safely convert a value to float, handling commas and NaN"""
-            if pd.isna(value):
-                return default
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                # Remove commas, dollar signs, percentages, and other characters
-                cleaned = value.replace(',', '').replace('$', '').replace('%', '').strip()
-                try:
-                    return float(cleaned)
-                except (ValueError, TypeError):
-                    return default
-            return default
-        
-        # --- Performance Profile Enforcement ---
-        def generate_performance_profile(aircraft):
-            """
-            Generate a mandatory performance profile for an aircraft, including all key metrics.
-            Returns a dict with all required fields, raising ValueError if any are missing or invalid.
-            """
-            required_metrics = [
-                'price', 'range', 'speed', 'passengers', 'year',
-                'total_hourly_cost', 'runway_length', 'max_altitude',
-                'cabin_volume', 'baggage_volume', 'depreciation_rate',
-                'best_speed_dollar', 'best_range_dollar', 'best_performance_dollar',
-                'best_efficiency_dollar', 'best_all_around_dollar'
-            ]
-            profile = {}
-            for metric in required_metrics:
-                value = aircraft.get(metric)
-                if value is None or value == '' or (isinstance(value, (int, float)) and value == 0):
-                    raise ValueError(f"Missing or invalid value for required metric: {metric}")
-                profile[metric] = value
-            return profile
-        
-        for _, row in df.iterrows():
-            # Map CSV columns to aircraft listing format using correct column names
-            aircraft = {
-                'id': len(aircraft_data) + 1,
-                'aircraft_name': str(row.get('316', 'Unknown')),  # Use first column (316) which contains aircraft names
-                'manufacturer': str(row.get('Manufacturer', 'Unknown')),
-                'model': str(row.get('316', 'Unknown')),  # Use column A (316) for the model name too
-                'year': safe_int_convert(row.get('Highest Year'), 2020),
-                'price': safe_int_convert(row.get('Average Price')),
-                'range': safe_int_convert(row.get('Range(NM)')),
-                'speed': safe_int_convert(row.get('Speed(KTS)')),
-                'passengers': safe_int_convert(row.get('Passengers')),
-                'category': str(row.get('Type', 'Unknown')),  # Use 'Type' column (e.g., 'Business Jet', 'Turboprop')
-                'location': 'Various Locations',  # Default location
-                'description': f"{row.get('Manufacturer', 'Unknown')} {row.get('Type', 'Unknown')} - {row.get('Date Range', 'Unknown years')}",
-                'image': '/static/images/aircraft_placeholder.jpg',  # Default image
-                
-                # Raw data for calculations
-                'date_range': str(row.get('Date Range', '')),
-                'lowest_year': safe_int_convert(row.get('Lowest Year')),
-                'highest_year': safe_int_convert(row.get('Highest Year')),
-                
-                # Physical specifications
-                'max_altitude': safe_int_convert(row.get('Max Operating Altitude (ft)')),
-                'runway_length': safe_int_convert(row.get('Balanced Field Length (ft)')),
-                'aircraft_height': safe_float_convert(row.get('Aircraft Height (ft)')),
-                'wingspan': safe_float_convert(row.get('Wingspan (ft)')),
-                'aircraft_length': safe_float_convert(row.get('Aircraft Length (ft)')),
-                'aircraft_volume': safe_int_convert(row.get('Aircraft Volume (cubic ft)')),
-                'cabin_height': safe_float_convert(row.get('Cabin Height (ft)')),
-                'cabin_width': safe_float_convert(row.get('Cabin Width (ft)')),
-                'cabin_length': safe_float_convert(row.get('Cabin Length (ft)')),
-                'cabin_volume': safe_float_convert(row.get('Cabin Volume (cubic ft)')),
-                'baggage_volume': safe_int_convert(row.get('Baggage Volume (cubic ft)')),
-                
-                # Operational data
-                'charter_rate': safe_float_convert(row.get('Hourly Charter Rate')),
-                'total_hourly_cost': safe_float_convert(row.get('Total Hourly Cost')),
-                'years_range': str(row.get('Date Range', 'Unknown')),
-                'multi_engine': str(row.get('Multi Engine', 'Unknown')),
-                'min_crew': safe_int_convert(row.get('Min Crew Required'), 1),
-                'depreciation_rate': safe_float_convert(row.get('Depreciation Rate')),
-                
-                # Trip time data from CSV columns
-                'average_trip_time': safe_float_convert(row.get('Average Trip Time')),
-                'total_trip_time': safe_float_convert(row.get('# of Hours')),
-                
-                # Base Financial Performance Metrics (will be recalculated based on user inputs)
-                'annual_budget': safe_float_convert(row.get('Annual Budget')),
-                'adjusted_annual_budget': safe_float_convert(row.get('Adjusted Annual Budget')),
-                'multi_year_total_cost': safe_float_convert(row.get('Multi-Year Total Cost')),
-                'mytc_with_aircraft_sale': safe_float_convert(row.get('MYTC w/ Aircraft Sale')),
-                'cost_to_charter': safe_float_convert(row.get('Cost To Charter')),
-                'total_fixed_cost': safe_float_convert(row.get('Total Fixed Cost')),
-                'total_variable_cost': safe_float_convert(row.get('Total Variable Cost')),
-                'adjusted_variable_cost': safe_float_convert(row.get('Adjusted Variable Cost')),
-                
-                # Ownership Metrics
-                'own_charter_ratio': safe_float_convert(row.get('Own/Charter Ratio')),
-                'own_charter_savings': safe_float_convert(row.get('Own/Charter Savings')),
-                
-                # Value Performance Metrics (from spreadsheet)
-                'best_speed_dollar': safe_float_convert(row.get('Best Speed/$')),
-                'normalized_speed_dollar': safe_float_convert(row.get('Normalized Speed/$')),
-                'best_seat_speed_dollar': safe_float_convert(row.get('Best Seat Speed/$')),
-                'best_range_dollar': safe_float_convert(row.get('Best Range/$')),
-                'normalized_range_dollar': safe_float_convert(row.get('Normalized Range/$')),
-                'best_seat_range_dollar': safe_float_convert(row.get('Best Seat Range/$')),
-                'best_performance_dollar': safe_float_convert(row.get('Best Performance/$')),
-                'normalized_performance_dollar': safe_float_convert(row.get('Normalized Performance/$')),
-                'best_seat_performance_dollar': safe_float_convert(row.get('Best Seat Performance/$')),
-                'best_efficiency_dollar': safe_float_convert(row.get('Best Efficiency/$')),
-                'normalized_efficiency_dollar': safe_float_convert(row.get('Normalized Effieciency/$')),
-                'best_seat_efficiency_dollar': safe_float_convert(row.get('Best Seat Efficiency/$')),
-                'best_all_around_dollar': safe_float_convert(row.get('Best All Around/$')),
-                'best_seat_all_around_dollar': safe_float_convert(row.get('Best Seat All Around/$')),
-                
-                # Cost per metrics
-                'hourly_cost_per_seat': safe_float_convert(row.get('Hourly Cost/Seat')),
-                'cost_per_mile': safe_float_convert(row.get('Cost/Mile')),
-                'cost_per_seat_mile': safe_float_convert(row.get('Cost/Seat Mile')),
-                'hourly_variable_cost': safe_float_convert(row.get('Hourly Variable Cost')),
-                'variable_cost_per_seat': safe_float_convert(row.get('Variable Cost/Seat')),
-                'variable_cost_per_mile': safe_float_convert(row.get('Variable Cost/Mile')),
-                'variable_cost_per_seat_mile': safe_float_convert(row.get('Variable Cost/Seat Mile')),
-                'BF': safe_float_convert(row.get('Best All Around/$'))
-            }
-            # Debug: Print normalized values for M600
-            if 'M600' in aircraft.get('aircraft_name', ''):
-                print(f"🔍 M600 DEBUG - Normalized values loaded:")
-                print(f"  Speed/$: {aircraft.get('normalized_speed_dollar')}")
-                print(f"  Range/$: {aircraft.get('normalized_range_dollar')}")
-                print(f"  Performance/$: {aircraft.get('normalized_performance_dollar')}")
-                print(f"  Efficiency/$: {aircraft.get('normalized_efficiency_dollar')}")
-            
-            # Attach mandatory performance profile
-            try:
-                aircraft['performance_profile'] = generate_performance_profile(aircraft)
-            except ValueError as e:
-                print(f"Skipping aircraft due to incomplete performance profile: {e}")
-                continue  # Skip aircraft with incomplete profile
-            aircraft_data.append(aircraft)
-        
-        print(f"Successfully loaded {len(aircraft_data)} aircraft from CSV with complete performance profiles")
-        return aircraft_data
+        dataset = current_dataset()
+        listings = load_user_listings(SCORED_USER_LISTING_STATUSES + UNSCORED_USER_LISTING_STATUSES)
+        touched = [listing for listing in listings if listing['id'] in set(listing_ids)]
+        scored = [listing for listing in listings if listing['status'] in SCORED_USER_LISTING_STATUSES]
+        USER_LISTING_SCORES.refresh_listings(scored, dataset.version, touched)
+        USER_LISTING_SCORES.ensure_current(scored, dataset.version)
     except Exception as e:
-        print(f"Error loading CSV data: {e}")
-        # Fallback to empty list if CSV loading fails
-        return []
-
-# Load aircraft data at startup
-AIRCRAFT_DATA = load_aircraft_data()
+        print(f"Error refreshing user listing scores: {e}")
 
 # Unified data function that merges spreadsheet and marketplace data
 def get_unified_aircraft_data():
@@ -1274,7 +1301,8 @@ def get_unified_aircraft_data():
     """
     try:
         # Return only spreadsheet data (316 aircraft) - user requested to exclude marketplace listings
-        return AIRCRAFT_DATA.copy()
+        # (read-only views: callers get their own list, never writable shared records)
+        return current_dataset().aircraft.copy()
         
         # DISABLED: Marketplace integration (was adding extra 328 listings)
         # from marketplace import load_listings
@@ -1283,40 +1311,138 @@ def get_unified_aircraft_data():
         
     except Exception as e:
         print(f"Error getting aircraft data: {e}")
-        return AIRCRAFT_DATA.copy() if AIRCRAFT_DATA else []
+        return []
 
+def get_limit_offset(data=None, default_limit=None):
+    """
+    Read top-K paging parameters from a JSON body (or the query string when no body is given)
+    Returns (limit, offset); limit is None when every row should be returned
+    """
+    source = data if data is not None else request.args
+    try:
+        limit = source.get('limit', default_limit)
+        limit = int(limit) if limit not in (None, '') else None
+    except (TypeError, ValueError):
+        limit = default_limit
+    try:
+        offset = max(0, int(source.get('offset', 0) or 0))
+    except (TypeError, ValueError):
+        offset = 0
+    return limit, offset
 
 
-@app.route('/')
-@app.route('/jet-finder')
-def home():
-    """Home route - Jet Finder with comprehensive scoring and pagination"""
+
+def get_value_rating(final_score):
+    """Value rating label for a final recommendation score (lower is better)"""
+    return 'Excellent' if final_score <= 20 else \
+           'Very Good' if final_score <= 40 else \
+           'Good' if final_score <= 60 else \
+           'Fair' if final_score <= 80 else 'Poor'
+
+def rank_jet_finder(fleet, search_query, user_inputs, mission_inputs, user_priorities, sort_by):
+    """
+    Filter, score and sort the fleet for a Jet Finder query
+    Returns the full ranking (fleet rows in display order with their aligned scores) for caching
+    """
+    # Start with unified data (CSV + marketplace)
+    filtered_aircraft = list(fleet.records)
+    
+    # Apply search filter (manufacturer/model/name)
+    if search_query:
+        filtered_aircraft = RecordColumns(filtered_aircraft).query(CatalogQuery(
+            filters=[Contains(('aircraft_name', 'manufacturer', 'model'), search_query)]
+        ))
+    
+    # Recompute the spreadsheet's derived cost metrics for the user's mission inputs
+    mission_metrics = {}
+    spreadsheet_model = SPREADSHEET_MODEL.get() if mission_inputs else None
+    if spreadsheet_model is not None:
+        try:
+            mission_metrics = spreadsheet_model.recalculate_records(fleet.column, mission_inputs, fleet_categories(fleet))
+        except Exception as e:
+            print(f"Error recalculating mission metrics: {e}")
+    
+    # Apply the hard requirement filters (basic, financial and advanced) as one compiled plan;
+    # unpriced aircraft are excluded when a budget is set and annual cost uses the adjusted budget
+    filter_plan = compile_filters(
+        user_inputs,
+        annual_cost_key='adjusted_annual_budget',
+        exclude_unpriced=True,
+        columns=mission_metrics
+    )
+    if filter_plan:
+        filtered_aircraft = filter_plan.filter_records(fleet, filtered_aircraft)
+    
+    # Apply final scoring using strict 50/50 methodology in one batched pass,
+    # normalizing against the filtered set for this request
+    rows = fleet.rows_for(filtered_aircraft)
+    scoring_context = ScoringContext.from_fleet(fleet, rows, user_priorities)
+    scores = score_batch(fleet, rows, user_priorities, scoring_context)
+    
+    # Apply sorting (LOWEST SCORE FIRST); all sorts are stable
+    if sort_by == 'score_desc':
+        order = top_k(scores.final_score, descending=False)  # Ascending: lowest is best
+    elif sort_by == 'score_asc':
+        order = top_k(scores.final_score)
+    elif sort_by == 'price_asc':
+        order = top_k(fleet.column('price')[rows], descending=False)
+    elif sort_by == 'price_desc':
+        order = top_k(fleet.column('price')[rows])
+    elif sort_by == 'name':
+        order = np.array(
+            sorted(range(len(rows)), key=lambda i: filtered_aircraft[i].get('aircraft_name', '')),
+            dtype=np.intp
+        )
+    elif sort_by == 'passengers':
+        order = top_k(fleet.column('passengers')[rows])
+    elif sort_by == 'range':
+        order = top_k(fleet.column('range')[rows])
+    else:
+        order = np.arange(len(rows), dtype=np.intp)
+    
+    return {
+        'fleet': fleet,
+        'rows': rows[order],
+        'final_score': scores.final_score[order],
+        'spreadsheet_score': scores.spreadsheet_score[order],
+        'priority_score': scores.priority_score[order],
+        # Normalization context and priorities, kept so single rows can be explained later
+        'context': scoring_context,
+        'priorities': user_priorities,
+        # Category median prices of the filtered set, the market baseline for deal intelligence
+        'category_medians': compute_category_medians(filtered_aircraft)
+    }
+
+def parse_jet_finder_query(args):
+    """
+    Parse Jet Finder query-string parameters (filters, mission inputs, priorities and sort)
+    Shared by the Jet Finder page and the score explain API so both score in the same context
+    """
     # Get query parameters for filtering
-    budget = request.args.get('budget', type=int)
-    range_requirement = request.args.get('range_requirement', type=int)
-    passengers = request.args.get('passengers', type=int)
-    sort_by = request.args.get('sort', 'score_desc')  # Default to score-based sorting
-    search_query = request.args.get('q', '')
-    page = request.args.get('page', 1, type=int)
+    budget = args.get('budget', type=int)
+    range_requirement = args.get('range_requirement', type=int)
+    passengers = args.get('passengers', type=int)
+    sort_by = args.get('sort', 'score_desc')  # Default to score-based sorting
+    search_query = args.get('q', '')
     
     # Financial analysis filters
-    max_annual_cost = request.args.get('max_annual_cost', type=float)
-    max_hourly_cost = request.args.get('max_hourly_cost', type=float)
+    max_annual_cost = args.get('max_annual_cost', type=float)
+    max_hourly_cost = args.get('max_hourly_cost', type=float)
     
     # Advanced analysis filters
-    min_speed = request.args.get('min_speed', type=int)
-    min_altitude = request.args.get('min_altitude', type=int)
-    max_runway = request.args.get('max_runway', type=int)
-    min_cabin_volume = request.args.get('min_cabin_volume', type=int)
-    fuel_price = request.args.get('fuel_price', type=float)
-    ownership_years = request.args.get('ownership_years', type=int)
+    min_speed = args.get('min_speed', type=int)
+    min_altitude = args.get('min_altitude', type=int)
+    max_runway = args.get('max_runway', type=int)
+    min_cabin_volume = args.get('min_cabin_volume', type=int)
+    fuel_price = args.get('fuel_price', type=float)
+    ownership_years = args.get('ownership_years', type=int)
     
     # Get user priority selections from dropdowns
-    priority_1st = request.args.get('priority_1st', 'best_speed_dollar')
-    priority_2nd = request.args.get('priority_2nd', 'best_range_dollar')
-    priority_3rd = request.args.get('priority_3rd', 'best_performance_dollar')
-    priority_4th = request.args.get('priority_4th', 'best_efficiency_dollar')
-    priority_5th = request.args.get('priority_5th', 'best_all_around_dollar')
+    priority_1st = args.get('priority_1st', 'best_speed_dollar')
+    priority_2nd = args.get('priority_2nd', 'best_range_dollar')
+    priority_3rd = args.get('priority_3rd', 'best_performance_dollar')
+    priority_4th = args.get('priority_4th', 'best_efficiency_dollar')
+    priority_5th = args.get('priority_5th', 'best_all_around_dollar')
     
     # Collect all selected priorities (skip empty selections)
     selected_priorities = []
@@ -1345,12 +1471,12 @@ def home():
     
     # Also check for legacy priority parameters for backwards compatibility
     legacy_priorities = {
-        'price': float(request.args.get('priority_price', 0)),
-        'range': float(request.args.get('priority_range', 0)),
-        'speed': float(request.args.get('priority_speed', 0)),
-        'passengers': float(request.args.get('priority_passengers', 0)),
-        'total_hourly_cost': float(request.args.get('priority_operating_cost', 0)),
-        'runway_length': float(request.args.get('priority_runway', 0))
+        'price': float(args.get('priority_price', 0)),
+        'range': float(args.get('priority_range', 0)),
+        'speed': float(args.get('priority_speed', 0)),
+        'passengers': float(args.get('priority_passengers', 0)),
+        'total_hourly_cost': float(args.get('priority_operating_cost', 0)),
+        'runway_length': float(args.get('priority_runway', 0))
     }
     
     # Merge legacy priorities into user_priorities
@@ -1358,124 +1484,116 @@ def home():
         if value > 0:
             user_priorities[key] = user_priorities.get(key, 0) + value
     
-    # Start with unified data (CSV + marketplace)
-    filtered_aircraft = get_unified_aircraft_data()
-
-    
-    # Apply search filter (manufacturer/model/name)
-    if search_query:
-        filtered_aircraft = [
-            aircraft for aircraft in filtered_aircraft
-            if search_query.lower() in aircraft.get('aircraft_name', '').lower() or
-               search_query.lower() in aircraft.get('manufacturer', '').lower() or
-               search_query.lower() in aircraft.get('model', '').lower()
-        ]
-    
-    # Apply basic filters
-    if budget:
-        # Exclude unknown price (0) when budget filter is set
-        filtered_aircraft = [
-            a for a in filtered_aircraft
-            if a.get('price', 0) > 0 and a.get('price', 0) <= budget
-        ]
-    
-    if range_requirement:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('range', 0) >= range_requirement]
-    
-    if passengers:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('passengers', 0) >= passengers]
-    
-    # Apply financial analysis filters
-    if max_annual_cost:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('adjusted_annual_budget', 0) <= max_annual_cost]
-    
-    if max_hourly_cost:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('total_hourly_cost', 0) <= max_hourly_cost]
-    
-    # Apply advanced analysis filters
-    min_speed = request.args.get('min_speed', type=int)
-    min_altitude = request.args.get('min_altitude', type=int)
-    max_runway = request.args.get('max_runway', type=int)
-    min_cabin_volume = request.args.get('min_cabin_volume', type=int)
-    lowest_year = request.args.get('lowest_year', type=int)
-    
-    if min_speed:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('speed', 0) >= min_speed]
-    
-    if min_altitude:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('max_altitude', 0) >= min_altitude]
-    
-    if max_runway:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('runway_length', 0) <= max_runway]
-    
-    if min_cabin_volume:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('cabin_volume', 0) >= min_cabin_volume]
-
-    if lowest_year:
-        filtered_aircraft = [a for a in filtered_aircraft if a.get('year', 0) >= lowest_year]
+    # Spreadsheet inputs overridden by the user's mission
+    mission_inputs = {}
+    if fuel_price:
+        mission_inputs['JET A Price'] = fuel_price
+    if ownership_years:
+        mission_inputs['Years of Ownership'] = ownership_years
     
-    # Build user inputs for scoring
+    # Build user inputs for filtering
     user_inputs = {
         'budget': budget or 0,
         'range_requirement': range_requirement or 0,
         'passengers': passengers or 0,
         'max_annual_cost': max_annual_cost or 0,
         'max_hourly_cost': max_hourly_cost or 0,
-        'min_speed': request.args.get('min_speed', type=int) or 0,
-        'min_altitude': request.args.get('min_altitude', type=int) or 0,
-        'max_runway': request.args.get('max_runway', type=int) or 0,
-        'min_cabin_volume': request.args.get('min_cabin_volume', type=int) or 0,
+        'min_speed': min_speed or 0,
+        'min_altitude': min_altitude or 0,
+        'max_runway': max_runway or 0,
+        'min_cabin_volume': min_cabin_volume or 0,
+        'lowest_year': args.get('lowest_year', type=int) or 0,
     }
-
-    # Use the filtered set for normalization during this request
-    global SCORING_DATASET
-    SCORING_DATASET = filtered_aircraft
-
-    # Apply final scoring using strict 50/50 methodology
-    for aircraft in filtered_aircraft:
-        score_result = calculate_final_recommendation_score(aircraft, user_priorities, user_inputs)
-        aircraft['display_score'] = score_result['final_score']
-        aircraft['score_breakdown'] = {
-            'final_score': score_result['final_score'],
-            'spreadsheet_score': score_result['spreadsheet_score'],
-            'priority_score': score_result['priority_score'],
-            'value_rating': 'Excellent' if score_result['final_score'] <= 20 else \
-                            'Very Good' if score_result['final_score'] <= 40 else \
-                            'Good' if score_result['final_score'] <= 60 else \
-                            'Fair' if score_result['final_score'] <= 80 else 'Poor'
+    
+    # Build priority selections for template
+    priority_selections = {
+        'priority_1st': priority_1st,
+        'priority_2nd': priority_2nd,
+        'priority_3rd': priority_3rd,
+        'priority_4th': priority_4th,
+        'priority_5th': priority_5th
+    }
+    
+    return {
+        'search_query': search_query,
+        'sort_by': sort_by,
+        'user_inputs': user_inputs,
+        'mission_inputs': mission_inputs,
+        'user_priorities': user_priorities,
+        'priority_selections': priority_selections,
+        'current_criteria': {
+            'budget': budget,
+            'range_requirement': range_requirement,
+            'passengers': passengers,
+            'max_annual_cost': max_annual_cost,
+            'max_hourly_cost': max_hourly_cost,
+            'sort_by': sort_by
         }
+    }
 
-    # Annotate upgrade/value intelligence to help decide on deals
-    annotate_deal_intelligence(filtered_aircraft, SCORING_DATASET)
-    
-    # Reset scoring dataset after scoring
-    SCORING_DATASET = None
+def get_jet_finder_ranking(fleet, query):
+    """Cached ranking for a parsed Jet Finder query; filter, score and sort once per distinct query"""
+    ranking_key = query_fingerprint(
+        dataset=current_dataset().version,
+        q=query['search_query'],
+        filters=query['user_inputs'],
+        mission=query['mission_inputs'],
+        priorities=query['user_priorities'],
+        sort=query['sort_by']
+    )
+    ranking = SCORE_CACHE.get(ranking_key)
+    if ranking is None or ranking['fleet'] is not fleet:
+        ranking = rank_jet_finder(
+            fleet,
+            query['search_query'],
+            query['user_inputs'],
+            query['mission_inputs'],
+            query['user_priorities'],
+            query['sort_by']
+        )
+        SCORE_CACHE.put(ranking_key, ranking)
+    return ranking
 
-    # Apply sorting (LOWEST SCORE FIRST)
-    if sort_by == 'score_desc':
-        filtered_aircraft.sort(key=lambda x: x.get('display_score', 0))  # Ascending: lowest is best
-    elif sort_by == 'score_asc':
-        filtered_aircraft.sort(key=lambda x: x.get('display_score', 0), reverse=True)
-    elif sort_by == 'price_asc':
-        filtered_aircraft.sort(key=lambda x: x.get('price', 0))
-    elif sort_by == 'price_desc':
-        filtered_aircraft.sort(key=lambda x: x.get('price', 0), reverse=True)
-    elif sort_by == 'name':
-        filtered_aircraft.sort(key=lambda x: x.get('aircraft_name', ''))
-    elif sort_by == 'passengers':
-        filtered_aircraft.sort(key=lambda x: x.get('passengers', 0), reverse=True)
-    elif sort_by == 'range':
-        filtered_aircraft.sort(key=lambda x: x.get('range', 0), reverse=True)
+@app.route('/')
+@app.route('/jet-finder')
+def home():
+    """Home route - Jet Finder with comprehensive scoring and pagination"""
+    query = parse_jet_finder_query(request.args)
+    page = request.args.get('page', 1, type=int)
+    
+    # Filter, score and sort once per distinct query; page changes reuse the cached ranking
+    fleet = current_dataset().fleet
+    ranking = get_jet_finder_ranking(fleet, query)
     
     # Implement proper pagination with configurable aircraft per page
-    total = len(filtered_aircraft)
+    total = len(ranking['rows'])
     per_page = request.args.get('per_page', 12, type=int)
     pages = (total + per_page - 1) // per_page  # Ceiling division
     
     # Calculate start and end indices for current page
     start_idx = (page - 1) * per_page
     end_idx = start_idx + per_page
-    aircraft_page = filtered_aircraft[start_idx:end_idx]
+    
+    # Only the aircraft on this page get per-request score and deal annotations (annotated views,
+    # so the shared aircraft records are never mutated)
+    aircraft_page = []
+    page_rows = ranking['rows'][start_idx:end_idx].tolist()
+    page_final = ranking['final_score'][start_idx:end_idx].tolist()
+    page_spreadsheet = ranking['spreadsheet_score'][start_idx:end_idx].tolist()
+    page_priority = ranking['priority_score'][start_idx:end_idx].tolist()
+    for row, final_score, spreadsheet_score, priority_score in zip(page_rows, page_final, page_spreadsheet, page_priority):
+        aircraft = fleet.records[row]
+        aircraft_page.append(aircraft.annotate(
+            display_score=final_score,
+            score_breakdown={
+                'final_score': final_score,
+                'spreadsheet_score': spreadsheet_score,
+                'priority_score': priority_score,
+                'value_rating': get_value_rating(final_score)
+            },
+            # Upgrade/value intelligence to help decide on deals
+            deal_info=get_deal_info(aircraft, ranking['category_medians'])
+        ))
     
     # Create pagination object
     pagination = {
@@ -1489,30 +1607,52 @@ def home():
         'next_num': page + 1 if page < pages else None
     }
     
-    # Build priority selections for template
-    priority_selections = {
-        'priority_1st': priority_1st,
-        'priority_2nd': priority_2nd,
-        'priority_3rd': priority_3rd,
-        'priority_4th': priority_4th,
-        'priority_5th': priority_5th
-    }
-    
     return render_template('index.html', 
                          filtered_aircraft=aircraft_page,
                          pagination=pagination,
                          total_aircraft=total,
-                         search_query=search_query,
-                         user_priorities=user_priorities,
-                         priority_selections=priority_selections,
-                         current_criteria={
-                             'budget': budget,
-                             'range_requirement': range_requirement,
-                             'passengers': passengers,
-                             'max_annual_cost': max_annual_cost,
-                             'max_hourly_cost': max_hourly_cost,
-                             'sort_by': sort_by
-                         })
+                         search_query=query['search_query'],
+                         user_priorities=query['user_priorities'],
+                         priority_selections=query['priority_selections'],
+                         current_criteria=query['current_criteria'])
+
+@app.route('/api/score-explain/<int:aircraft_id>')
+def api_score_explain(aircraft_id):
+    """
+    Full score breakdown for one aircraft, rebuilt from the same scoring context as the Jet Finder
+    page for the same query-string filters, priorities and sort
+    """
+    try:
+        query = parse_jet_finder_query(request.args)
+        fleet = current_dataset().fleet
+        
+        row = fleet.row_for_id(aircraft_id)
+        if row is None:
+            return jsonify({'error': 'Aircraft not found'}), 404
+        
+        ranking = get_jet_finder_ranking(fleet, query)
+        positions = np.flatnonzero(ranking['rows'] == row)
+        if positions.size == 0:
+            return jsonify({'error': 'Aircraft does not match the current filters'}), 404
+        
+        scores = score_batch(fleet, np.array([row], dtype=np.intp), ranking['priorities'], ranking['context'])
+        score_result = scores.result(0)
+        aircraft = fleet.records[row]
+        
+        return jsonify({
+            'success': True,
+            'aircraft_id': aircraft_id,
+            'aircraft_name': aircraft.get('aircraft_name', ''),
+            'position': int(positions[0]) + 1,
+            'total_aircraft': len(ranking['rows']),
+            'value_rating': get_value_rating(score_result['final_score']),
+            'score': score_result,
+            'priorities': ranking['priorities']
+        })
+        
+    except Exception as e:
+        print(f"Error explaining score: {e}")
+        return jsonify({'error': str(e)}), 500
 
 # Unify aircraft listings under Jet Finder
 @app.route('/aircraft-listings')
@@ -1536,7 +1676,7 @@ def compare_aircraft():
             # marketplace listings may be 'listing_...' – skip for this compare
             if rid.isdigit():
                 ids.append(int(rid))
-        selected = [ac for ac in AIRCRAFT_DATA if ac.get('id') in ids]
+        selected = [ac for ac in current_dataset().aircraft if ac.get('id') in ids]
     except Exception:
         selected = []
     if not selected:
@@ -1564,7 +1704,7 @@ def aircraft_details(aircraft_id):
     """Aircraft detail page"""
     # Find aircraft in our data
     aircraft = None
-    for a in AIRCRAFT_DATA:
+    for a in current_dataset().aircraft:
         if a.get('id') == aircraft_id:
             aircraft = a
             break
@@ -1601,7 +1741,7 @@ def api_stock_market_overview():
         # Use real aircraft data from CSV - all 316 aircraft
         aircraft_models = []
         
-        for aircraft in AIRCRAFT_DATA:
+        for aircraft in current_dataset().aircraft:
             # Get price data - if no price, assign reasonable value based on category
             current_price = aircraft.get('price', 0)
             if current_price <= 0:
@@ -1705,11 +1845,12 @@ def api_stock_market_overview():
 def api_stock_market_test():
     """Test endpoint to verify data loading"""
     try:
+        aircraft_data = current_dataset().aircraft
         return jsonify({
             'status': 'success',
-            'total_aircraft_in_csv': len(AIRCRAFT_DATA),
-            'total_aircraft_loaded': len(AIRCRAFT_DATA),
-            'sample_aircraft_names': [aircraft.get('aircraft_name', 'Unknown') for aircraft in AIRCRAFT_DATA[:5]],
+            'total_aircraft_in_csv': len(aircraft_data),
+            'total_aircraft_loaded': len(aircraft_data),
+            'sample_aircraft_names': [aircraft.get('aircraft_name', 'Unknown') for aircraft in aircraft_data[:5]],
             'api_endpoint_available': True
         })
     except Exception as e:
@@ -1719,15 +1860,46 @@ def api_stock_market_test():
 # Lightweight aircraft details API for comparison/details modals
 @app.route('/api/aircraft-detail/<int:aircraft_id>')
 def api_aircraft_detail(aircraft_id: int):
-    """Return a single aircraft from AIRCRAFT_DATA by numeric id as JSON."""
+    """Return a single aircraft of the loaded aircraft dataset by numeric id as JSON."""
     try:
-        for aircraft in AIRCRAFT_DATA:
+        for aircraft in current_dataset().aircraft:
             if aircraft.get('id') == aircraft_id:
                 return jsonify({'success': True, 'aircraft': aircraft})
         return jsonify({'success': False, 'error': 'Aircraft not found'}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/similar-aircraft')
+def api_similar_aircraft():
+    """
+    Similar aircraft for several aircraft at once (e.g. a compare page).
+    Usage: /api/similar-aircraft?ids=1,2,3&limit=6
+    """
+    try:
+        ids = [int(rid) for rid in request.args.get('ids', '').replace(' ', '').split(',') if rid.isdigit()]
+        limit = max(1, min(request.args.get('limit', 6, type=int), 50))
+        if not ids:
+            return jsonify({'success': False, 'error': 'No aircraft ids given'}), 400
+        
+        manager = ENHANCED_DATA_MANAGER.get()
+        if manager is None:
+            return jsonify({'success': False, 'error': 'Similar aircraft unavailable'}), 503
+        
+        # Marketplace listing ids are the catalog rows of the aircraft
+        dataset = current_dataset()
+        rows = {aircraft_id: dataset.fleet.row_for_id(aircraft_id) for aircraft_id in ids}
+        similar_rows = manager.get_similar_listing_ids([row for row in rows.values() if row is not None], limit,
+                                                       catalog=dataset)
+        
+        return jsonify({
+            'success': True,
+            'similar': {str(aircraft_id): [dataset.aircraft[similar] for similar in similar_rows[row]]
+                        for aircraft_id, row in rows.items() if row in similar_rows},
+            'missing': [aircraft_id for aircraft_id, row in rows.items() if row not in similar_rows]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/aircraft-data')
 def api_aircraft_data():
     """Get all aircraft data for JavaScript frontend"""
@@ -1746,82 +1918,77 @@ def api_airports():
         if not query or len(query) < 2:
             return jsonify([])
         
-        # Load airports data
-        import json
-        try:
-            with open('static/data/airports.json', 'r') as f:
-                airports = json.load(f)
-        except FileNotFoundError:
-            # Fallback to root directory
-            with open('airports.json', 'r') as f:
-                airports = json.load(f)
-        
-        # Search airports by IATA code, ICAO code, name, or city
+        # Search airports by IATA code, ICAO code, name, or city (prefix / n-gram index over the shared
+        # airport table), IATA first, then ICAO, then name/city, each by name; only the 20 results are built
+        airports = get_airport_table()
         matching_airports = []
-        for airport in airports:
-            # Check IATA code (primary search)
-            if airport.get('iata', '').upper().startswith(query):
-                matching_airports.append({
-                    'iata': airport.get('iata', ''),
-                    'icao': airport.get('icao', ''),
-                    'name': airport.get('name', ''),
-                    'city': airport.get('city', ''),
-                    'country': airport.get('country', ''),
-                    'lat': airport.get('lat', 0),
-                    'lon': airport.get('lon', 0),
-                    'match_type': 'iata'
-                })
-            # Check ICAO code
-            elif airport.get('icao', '').upper().startswith(query):
-                matching_airports.append({
-                    'iata': airport.get('iata', ''),
-                    'icao': airport.get('icao', ''),
-                    'name': airport.get('name', ''),
-                    'city': airport.get('city', ''),
-                    'country': airport.get('country', ''),
-                    'lat': airport.get('lat', 0),
-                    'lon': airport.get('lon', 0),
-                    'match_type': 'icao'
-                })
-            # Check name and city (partial matches)
-            elif (query in airport.get('name', '').upper() or 
-                  query in airport.get('city', '').upper()):
-                matching_airports.append({
-                    'iata': airport.get('iata', ''),
-                    'icao': airport.get('icao', ''),
-                    'name': airport.get('name', ''),
-                    'city': airport.get('city', ''),
-                    'country': airport.get('country', ''),
-                    'lat': airport.get('lat', 0),
-                    'lon': airport.get('lon', 0),
-                    'match_type': 'name_city'
-                })
-        
-        # Sort by match type priority (IATA first, then ICAO, then name/city)
-        # and limit results to prevent overwhelming the UI
-        matching_airports.sort(key=lambda x: (
-            0 if x['match_type'] == 'iata' else 
-            1 if x['match_type'] == 'icao' else 2,
-            x['name']
-        ))
+        for row, match_type in airports.search(query, limit=20):
+            airport = airports.record(row)
+            matching_airports.append({
+                'iata': airport['iata'],
+                'icao': airport['icao'],
+                'name': airport['name'],
+                'city': airport['city'],
+                'country': airport['country'],
+                'lat': airport['lat'],
+                'lon': airport['lon'],
+                'match_type': match_type
+            })
         
-        # Return up to 20 results
-        return jsonify(matching_airports[:20])
+        return jsonify(matching_airports)
         
     except Exception as e:
         print(f"Error in airports API: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/airports/nearby')
+def api_airports_nearby():
+    """
+    Airports near a point or an airport: the k nearest, or all within radius_nm (nearest first).
+    Usage: /api/airports/nearby?airport=KTEB&radius_nm=50 or /api/airports/nearby?lat=40.7&lon=-74.0&k=5
+    """
+    try:
+        airports = get_airport_table()
+        code = request.args.get('airport', '').strip()
+        if code:
+            origin = airports.search_index.row_for_code(code)
+            if origin is None:
+                return jsonify({'error': f'Unknown airport: {code}'}), 404
+            lat, lon = airports.lat.item(origin), airports.lon.item(origin)
+        else:
+            lat, lon = request.args.get('lat', type=float), request.args.get('lon', type=float)
+            if lat is None or lon is None:
+                return jsonify({'error': 'airport or lat/lon is required'}), 400
+        
+        radius_nm = request.args.get('radius_nm', type=float)
+        limit = max(1, min(request.args.get('k', 10, type=int), 100))
+        if radius_nm is not None:
+            rows, distances = airports.spatial_index.within(lat, lon, radius_nm)
+            rows, distances = rows[:limit], distances[:limit]
+        else:
+            rows, distances = airports.spatial_index.nearest(lat, lon, limit)
+        
+        nearby = []
+        for row, distance in zip(rows.tolist(), distances.tolist()):
+            airport = airports.record(row)
+            airport['distance_nm'] = round(distance, 1)
+            nearby.append(airport)
+        return jsonify(nearby)
+        
+    except Exception as e:
+        print(f"Error in nearby airports API: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/available-columns')
 def api_available_columns():
     """Get available CSV columns for dynamic filtering"""
     try:
         # Return the available columns from the aircraft data
-        if not AIRCRAFT_DATA:
+        if not current_dataset().aircraft:
             return jsonify([])
         
         # Get all keys from the first aircraft record
-        sample_aircraft = AIRCRAFT_DATA[0]
+        sample_aircraft = current_dataset().aircraft[0]
         columns = list(sample_aircraft.keys())
         
         # Filter out technical fields and return user-friendly column names
@@ -1927,100 +2094,38 @@ def api_calculate_priority_ranking():
         
         # Calculate final recommendation scores for all aircraft
         # First, filter aircraft based on hard requirements
-        filtered_aircraft = []
-        
-        for aircraft in AIRCRAFT_DATA:
-            # Check if aircraft meets all hard requirements
-            meets_requirements = True
-            
-            # Budget filter - exclude aircraft over budget
-            budget = user_inputs.get('budget', 0)
-            if budget and aircraft.get('price', 0) > budget:
-                meets_requirements = False
-                continue
-            
-            # Range filter - exclude aircraft with insufficient range
-            required_range = user_inputs.get('range_requirement', 0)
-            if required_range and aircraft.get('range', 0) < required_range:
-                meets_requirements = False
-                continue
-            
-            # Passenger filter - exclude aircraft with insufficient capacity
-            required_passengers = user_inputs.get('passengers', 0)
-            if required_passengers and aircraft.get('passengers', 0) < required_passengers:
-                meets_requirements = False
-                continue
-            
-            # Year filter - exclude aircraft older than specified
-            lowest_year = user_inputs.get('lowest_year', 0)
-            if lowest_year and aircraft.get('year', 0) < lowest_year:
-                meets_requirements = False
-                continue
-            
-            # Speed filter - exclude aircraft below minimum speed
-            min_speed = user_inputs.get('min_speed', 0)
-            if min_speed and aircraft.get('speed', 0) < min_speed:
-                meets_requirements = False
-                continue
-            
-            # Altitude filter - exclude aircraft below minimum altitude
-            min_altitude = user_inputs.get('min_altitude', 0)
-            if min_altitude and aircraft.get('max_altitude', 0) < min_altitude:
-                meets_requirements = False
-                continue
-            
-            # Runway filter - exclude aircraft requiring longer runways
-            max_runway = user_inputs.get('max_runway', 0)
-            if max_runway and aircraft.get('runway_length', 0) > max_runway:
-                meets_requirements = False
-                continue
-            
-            # Cabin volume filter - exclude aircraft with insufficient cabin space
-            min_cabin_volume = user_inputs.get('min_cabin_volume', 0)
-            if min_cabin_volume and aircraft.get('cabin_volume', 0) < min_cabin_volume:
-                meets_requirements = False
-                continue
-            
-            # Annual cost filter - exclude aircraft over annual cost limit
-            max_annual_cost = user_inputs.get('max_annual_cost', 0)
-            if max_annual_cost and aircraft.get('total_hourly_cost', 0) * user_inputs.get('yearly_trips', 100) > max_annual_cost:
-                meets_requirements = False
-                continue
-            
-            # Hourly cost filter - exclude aircraft over hourly cost limit
-            max_hourly_cost = user_inputs.get('max_hourly_cost', 0)
-            if max_hourly_cost and aircraft.get('total_hourly_cost', 0) > max_hourly_cost:
-                meets_requirements = False
-                continue
-            
-            # If aircraft meets all requirements, add to filtered list
-            if meets_requirements:
-                filtered_aircraft.append(aircraft)
+        fleet = current_dataset().fleet
+        filtered_aircraft = compile_filters(user_inputs).filter_records(fleet)
         
-        # Calculate scores for filtered aircraft only
+        # Calculate scores for filtered aircraft only, in one batched pass
         ranked_aircraft = []
-        
-        for aircraft in filtered_aircraft:
-            # Calculate final recommendation score using the new system
-            score_result = calculate_final_recommendation_score(aircraft, priorities, user_inputs)
+        scores = score_batch(fleet, fleet.rows_for(filtered_aircraft), priorities)
+        
+        # Select the requested page by final score (highest first); breakdowns are only built for it,
+        # and can be skipped entirely (include_breakdown=false) in favour of /api/score-explain
+        limit, offset = get_limit_offset(data)
+        include_breakdown = data.get('include_breakdown', True)
+        for i in top_k(scores.final_score, limit, offset):
+            score_result = scores.result(i, include_breakdown)
             
-            ranked_aircraft.append({
-                'aircraft': aircraft,
+            ranking = {
+                'aircraft': filtered_aircraft[i],
                 'final_score': score_result['final_score'],
                 'spreadsheet_score': score_result['spreadsheet_score'],
                 'priority_score': score_result['priority_score'],
                 'combined_score': score_result['combined_score'],
-                'all_around_score': score_result['all_around_score'],
-                'scoring_breakdown': score_result['breakdown']
-            })
-        
-        # Sort by final score (highest first)
-        ranked_aircraft.sort(key=lambda x: x['final_score'], reverse=True)
+                'all_around_score': score_result['all_around_score']
+            }
+            if include_breakdown:
+                ranking['scoring_breakdown'] = score_result['breakdown']
+            ranked_aircraft.append(ranking)
         
         return jsonify({
-            'rankings': ranked_aircraft,  # Return all filtered aircraft
+            'rankings': ranked_aircraft,  # All filtered aircraft unless a limit is given
+            'limit': limit,
+            'offset': offset,
             'total_filtered': len(filtered_aircraft),
-            'total_available': len(AIRCRAFT_DATA),
+            'total_available': len(current_dataset().aircraft),
             'filters_applied': user_inputs,
             'scoring_methodology': {
                 'step_1': 'Calculate spreadsheet score (average of 5 per-dollar metrics)',
@@ -2051,81 +2156,12 @@ def api_calculate_aircraft():
         all_aircraft = get_unified_aircraft_data()
         
         # First, apply strict hard filtering - aircraft that don't meet criteria are EXCLUDED
-        filtered_aircraft = []
+        fleet = current_dataset().fleet
+        filtered_aircraft = compile_filters(user_inputs).filter_records(fleet, all_aircraft)
         filters_applied = {}
-        
-        for aircraft in all_aircraft:
-            # STRICT HARD FILTERING - Aircraft not meeting ANY criteria are excluded
-            meets_requirements = True
-            exclusion_reasons = []
-            
-            # Budget filter - HARD EXCLUDE aircraft over budget
-            budget = user_inputs.get('budget', 0)
-            if budget and budget > 0:
-                filters_applied['budget'] = budget
-                aircraft_price = aircraft.get('price', 0)
-                if aircraft_price > budget:
-                    meets_requirements = False
-                    exclusion_reasons.append(f"Price ${aircraft_price:,} exceeds budget ${budget:,}")
-                    continue
-            
-            # Range filter - exclude aircraft with insufficient range
-            required_range = user_inputs.get('range_requirement', 0)
-            if required_range and aircraft.get('range', 0) < required_range:
-                meets_requirements = False
-                continue
-            
-            # Passenger filter - exclude aircraft with insufficient capacity
-            required_passengers = user_inputs.get('passengers', 0)
-            if required_passengers and aircraft.get('passengers', 0) < required_passengers:
-                meets_requirements = False
-                continue
-            
-            # Year filter - exclude aircraft older than specified
-            lowest_year = user_inputs.get('lowest_year', 0)
-            if lowest_year and aircraft.get('year', 0) < lowest_year:
-                meets_requirements = False
-                continue
-            
-            # Speed filter - exclude aircraft below minimum speed
-            min_speed = user_inputs.get('min_speed', 0)
-            if min_speed and aircraft.get('speed', 0) < min_speed:
-                meets_requirements = False
-                continue
-            
-            # Altitude filter - exclude aircraft below minimum altitude
-            min_altitude = user_inputs.get('min_altitude', 0)
-            if min_altitude and aircraft.get('max_altitude', 0) < min_altitude:
-                meets_requirements = False
-                continue
-            
-            # Runway filter - exclude aircraft requiring longer runways
-            max_runway = user_inputs.get('max_runway', 0)
-            if max_runway and aircraft.get('runway_length', 0) > max_runway:
-                meets_requirements = False
-                continue
-            
-            # Cabin volume filter - exclude aircraft with insufficient cabin space
-            min_cabin_volume = user_inputs.get('min_cabin_volume', 0)
-            if min_cabin_volume and aircraft.get('cabin_volume', 0) < min_cabin_volume:
-                meets_requirements = False
-                continue
-            
-            # Annual cost filter - exclude aircraft over annual cost limit
-            max_annual_cost = user_inputs.get('max_annual_cost', 0)
-            if max_annual_cost and aircraft.get('total_hourly_cost', 0) * user_inputs.get('yearly_trips', 100) > max_annual_cost:
-                meets_requirements = False
-                continue
-            
-            # Hourly cost filter - exclude aircraft over hourly cost limit
-            max_hourly_cost = user_inputs.get('max_hourly_cost', 0)
-            if max_hourly_cost and aircraft.get('total_hourly_cost', 0) > max_hourly_cost:
-                meets_requirements = False
-                continue
-            
-            # If aircraft meets all requirements, add to filtered list
-            if meets_requirements:
-                filtered_aircraft.append(aircraft)
+        budget = user_inputs.get('budget', 0)
+        if budget and budget > 0:
+            filters_applied['budget'] = budget
         
         # Calculate comprehensive scores for filtered aircraft only using the 50/50 system
         recommendations = []
@@ -2137,20 +2173,27 @@ def api_calculate_aircraft():
                 if value and value != '':
                     priorities[value] = 1.0  # Equal weight for selected priorities
         
-        for aircraft in filtered_aircraft:
+        scores = score_batch(fleet, fleet.rows_for(filtered_aircraft), priorities)
+        
+        # Breakdowns can be skipped (include_breakdown=false) in favour of /api/score-explain
+        include_breakdown = data.get('include_breakdown', True)
+        
+        for i, aircraft in enumerate(filtered_aircraft):
             # Use the bulletproof 50/50 scoring system
-            score_result = calculate_final_recommendation_score(aircraft, priorities, user_inputs)
+            score_result = scores.result(i, include_breakdown)
+            scoring_details = {
+                'final_score': score_result['final_score'],
+                'spreadsheet_score': score_result['spreadsheet_score'],
+                'priority_score': score_result['priority_score']
+            }
+            if include_breakdown:
+                scoring_details['breakdown'] = score_result['breakdown']
             
             recommendations.append({
                 'aircraft': aircraft,
                 'total_score': score_result['final_score'],
                 'final_score': score_result['final_score'],
-                'scoring_details': {
-                    'final_score': score_result['final_score'],
-                    'spreadsheet_score': score_result['spreadsheet_score'],
-                    'priority_score': score_result['priority_score'],
-                    'breakdown': score_result['breakdown']
-                },
+                'scoring_details': scoring_details,
                 'display_score': score_result['final_score'],  # For compatibility
                 'recommendation_reason': f"Score: {100 - score_result['final_score']:.1f}% (Spreadsheet: {100 - score_result['spreadsheet_score']:.1f}%, Priority: {100 - score_result['priority_score']:.1f}%)"
             })
@@ -2208,10 +2251,11 @@ def calculate_spreadsheet_score(aircraft, user_inputs=None):
         print(f"Error calculating spreadsheet score: {e}")
         return 100
 
-def calculate_priority_score(aircraft, priorities):
+def calculate_priority_score(aircraft, priorities, context=None):
     """
     Calculate user priority score based on weighted preferences
     Returns a percentage score (0-100) based on how well aircraft matches user priorities
+    Metrics are normalized against context (a ScoringContext), defaulting to the whole fleet
     """
     try:
         if not priorities:
@@ -2230,7 +2274,7 @@ def calculate_priority_score(aircraft, priorities):
                 continue
             
             # Normalize each metric to 0-100 scale
-            normalized_score = normalize_metric_to_percentage(metric_key, aircraft_value)
+            normalized_score = normalize_metric_to_percentage(metric_key, aircraft_value, context)
             
             # Apply weight
             weighted_scores.append(normalized_score * weight)
@@ -2248,38 +2292,21 @@ def calculate_priority_score(aircraft, priorities):
         print(f"Error calculating priority score: {e}")
         return 100
 
-def get_metric_bounds(metric_key):
+def get_metric_bounds(metric_key, context=None):
     """
-    Get the minimum and maximum values for a metric across all aircraft
+    Get the minimum and maximum values for a metric across the scoring context's population
     Returns (min_value, max_value) for proper 0-100% normalization
     """
     try:
-        # Use current request's scoring dataset if available to ensure context-aware normalization
-        global SCORING_DATASET
-        source = SCORING_DATASET if SCORING_DATASET is not None else AIRCRAFT_DATA
-        values = []
-        for aircraft in source:
-            value = aircraft.get(metric_key, 0)
-            if value is not None and value > 0:
-                values.append(value)
-        
-        if not values:
-            return (0, 1)  # Default bounds if no valid values
-        
-        min_val = min(values)
-        max_val = max(values)
-        
-        # Ensure we don't have division by zero
-        if min_val == max_val:
-            return (min_val, max_val + 1)
-        
-        return (min_val, max_val)
+        # Use the request's scoring context if given to ensure context-aware normalization
+        context = context or current_dataset().scoring_context
+        return context.bounds_for(metric_key)
         
     except Exception as e:
         print(f"Error getting bounds for metric {metric_key}: {e}")
         return (0, 1)
 
-def normalize_metric_to_percentage(metric_key, value):
+def normalize_metric_to_percentage(metric_key, value, context=None):
     """
     Normalize different metrics to 0-100 percentage scale based on actual min/max values
     Best performing aircraft gets 100%, worst gets 0% (LOWER IS BETTER: lower value = higher score)
@@ -2287,21 +2314,14 @@ def normalize_metric_to_percentage(metric_key, value):
     try:
         if value is None or value <= 0:
             return 0  # Worst
-        # Get actual bounds for this metric across all aircraft
-        min_val, max_val = get_metric_bounds(metric_key)
+        context = context or current_dataset().scoring_context
+        # Get actual bounds for this metric across the context population
+        min_val, max_val = get_metric_bounds(metric_key, context)
         # Handle edge case where all values are the same
         if min_val == max_val:
             return 50  # Middle score if all values are identical
         # Determine if higher or lower values are better
-        higher_is_better = True  # Default assumption
-        lower_is_better_metrics = [
-            'price', 'total_hourly_cost', 'hourly_variable_cost', 
-            'cost_per_mile', 'cost_per_seat_mile', 'runway_length',
-            'depreciation_rate', 'variable_cost_per_seat', 
-            'variable_cost_per_mile', 'variable_cost_per_seat_mile'
-        ]
-        if metric_key in lower_is_better_metrics:
-            higher_is_better = False
+        higher_is_better = not context.is_lower_better(metric_key)
         # Calculate normalized score (0-100, higher is always better)
         if higher_is_better:
             # Higher values are better: best gets 100, worst gets 0
@@ -2379,44 +2399,50 @@ def annotate_deal_intelligence(aircraft_list: list, reference_dataset: list):
     """
     medians = compute_category_medians(reference_dataset)
     for a in aircraft_list:
-        is_upgraded, highlights = detect_upgrade_highlights(a)
-        price = a.get('price', 0) or 0
-        cat = categorize_aircraft(a)
-        median_price = medians.get(cat)
-        value_tag = 'Unknown'
-        relative_price = 'Unknown'
-        if price > 0 and median_price:
-            ratio = price / median_price
-            if ratio <= 0.85:
-                value_tag = 'Great Deal'
-                relative_price = 'Below Market'
-            elif ratio <= 1.05:
-                value_tag = 'Fair Value'
-                relative_price = 'At Market'
-            else:
-                value_tag = 'Premium'
-                relative_price = 'Above Market'
-        a['deal_info'] = {
-            'is_upgraded': is_upgraded,
-            'highlights': highlights,
-            'relative_price': relative_price,
-            'value_tag': value_tag,
-        }
+        a['deal_info'] = get_deal_info(a, medians)
+
+
+def get_deal_info(aircraft: dict, medians: dict) -> dict:
+    """Deal intelligence for one aircraft given category median prices."""
+    is_upgraded, highlights = detect_upgrade_highlights(aircraft)
+    price = aircraft.get('price', 0) or 0
+    cat = categorize_aircraft(aircraft)
+    median_price = medians.get(cat)
+    value_tag = 'Unknown'
+    relative_price = 'Unknown'
+    if price > 0 and median_price:
+        ratio = price / median_price
+        if ratio <= 0.85:
+            value_tag = 'Great Deal'
+            relative_price = 'Below Market'
+        elif ratio <= 1.05:
+            value_tag = 'Fair Value'
+            relative_price = 'At Market'
+        else:
+            value_tag = 'Premium'
+            relative_price = 'Above Market'
+    return {
+        'is_upgraded': is_upgraded,
+        'highlights': highlights,
+        'relative_price': relative_price,
+        'value_tag': value_tag,
+    }
 
-def calculate_final_recommendation_score(aircraft, priorities, user_inputs=None):
+def calculate_final_recommendation_score(aircraft, priorities, user_inputs=None, context=None, include_breakdown=True):
     """
     Calculate the final recommendation score with STRICT 50/50 weighting:
     1. Calculate spreadsheet score (average of 5 per-dollar metrics) - 50%
     2. Calculate priority score (weighted user preferences) - 50%
     3. Final score = (Spreadsheet Score × 0.5) + (Priority Score × 0.5)
     4. Return final recommendation percentage (LOWER IS BETTER)
+    Pass include_breakdown=False for the compact numeric result without the breakdown dict
     """
     try:
         # Step 1: Calculate spreadsheet score (0-100, lower is better)
         spreadsheet_score = calculate_spreadsheet_score(aircraft, user_inputs)
         
         # Step 2: Calculate priority score (0-100, lower is better)
-        priority_score = calculate_priority_score(aircraft, priorities)
+        priority_score = calculate_priority_score(aircraft, priorities, context)
         
         # Step 3: ENFORCED 50/50 weighting - NO averaging with all-around score
         final_score = (spreadsheet_score * 0.5) + (priority_score * 0.5)
@@ -2427,21 +2453,23 @@ def calculate_final_recommendation_score(aircraft, priorities, user_inputs=None)
         all_around_percentage = (all_around_dollar * 10) if all_around_dollar > 0 else 0
         all_around_percentage = max(0, min(100, all_around_percentage))
         
-        return {
+        result = {
             'final_score': final_score,
             'spreadsheet_score': spreadsheet_score,
             'priority_score': priority_score,
             'spreadsheet_weight': 50.0,
             'priority_weight': 50.0,
-            'all_around_score': all_around_percentage,  # For reference only
-            'breakdown': {
+            'all_around_score': all_around_percentage  # For reference only
+        }
+        if include_breakdown:
+            result['breakdown'] = {
                 'calculation': f"({spreadsheet_score:.1f} × 0.5) + ({priority_score:.1f} × 0.5) = {final_score:.1f}",
                 'spreadsheet_components': get_spreadsheet_breakdown(aircraft),
-                'priority_components': get_priority_breakdown(aircraft, priorities),
+                'priority_components': get_priority_breakdown(aircraft, priorities, context),
                 'all_around_value': all_around_dollar,
                 'scoring_method': 'Strict 50/50 weighting between spreadsheet and priority scores'
             }
-        }
+        return result
         
     except Exception as e:
         print(f"Error calculating final recommendation score: {e}")
@@ -2464,12 +2492,12 @@ def get_spreadsheet_breakdown(aircraft):
         'all_around_per_dollar': aircraft.get('best_all_around_dollar', 0)
     }
 
-def get_priority_breakdown(aircraft, priorities):
+def get_priority_breakdown(aircraft, priorities, context=None):
     """Get detailed breakdown of priority scoring"""
     breakdown = {}
     for metric_key, weight in priorities.items():
         aircraft_value = aircraft.get(metric_key, 0)
-        normalized_score = normalize_metric_to_percentage(metric_key, aircraft_value)
+        normalized_score = normalize_metric_to_percentage(metric_key, aircraft_value, context)
         breakdown[metric_key] = {
             'raw_value': aircraft_value,
             'normalized_score': normalized_score,
@@ -2780,54 +2808,41 @@ def internal_server_error(e):
     """Handle 500 errors"""
     return render_template('error.html', error_code=500, message="Internal server error"), 500
 
-@app.route('/api/market-insights')
-def api_market_insights():
-    """Get market insights and trends"""
-    try:
-        # Analyze market data for insights
-        insights = {
-            'total_aircraft': len(AIRCRAFT_DATA),
-            'categories': {},
-            'price_ranges': {},
-            'top_performers': {},
-            'market_trends': []
-        }
-        
+# /api/market-insights price bands: (label, exclusive upper bound)
+MARKET_PRICE_RANGES = [
+    ('Under $5M', 5000000),
+    ('$5M - $15M', 15000000),
+    ('$15M - $30M', 30000000),
+    ('$30M - $50M', 50000000),
+    ('Over $50M', None)
+]
+
+def price_range_label(price):
+    for label, ceiling in MARKET_PRICE_RANGES:
+        if ceiling is None or price < ceiling:
+            return label
+
+def build_market_insights(dataset):
+    """Market insights of one dataset version: group counts from a market cube, top performers by column"""
+    dataset.define('market.category', lambda catalog: [categorize_aircraft(aircraft) for aircraft in catalog.aircraft])
+    dataset.define('market.price_range',
+                   lambda catalog: [price_range_label(aircraft.get('price', 0)) for aircraft in catalog.aircraft])
+    market = MarketCube(dataset, ('market.category', 'market.price_range')).select()
+    price_counts = market.distribution('market.price_range')
+    
+    # Top performers by category (first aircraft with the highest value)
+    aircraft_data = dataset.aircraft
+    best_value = max(aircraft_data, key=lambda x: x.get('best_all_around_dollar', 0))
+    best_speed = max(aircraft_data, key=lambda x: x.get('speed', 0))
+    best_range = max(aircraft_data, key=lambda x: x.get('range', 0))
+    
+    return {
+        'total_aircraft': len(aircraft_data),
         # Category breakdown
-        for aircraft in AIRCRAFT_DATA:
-            category = categorize_aircraft(aircraft)
-            insights['categories'][category] = insights['categories'].get(category, 0) + 1
-        
+        'categories': market.distribution('market.category'),
         # Price range analysis
-        price_ranges = {
-            'Under $5M': 0,
-            '$5M - $15M': 0,
-            '$15M - $30M': 0,
-            '$30M - $50M': 0,
-            'Over $50M': 0
-        }
-        
-        for aircraft in AIRCRAFT_DATA:
-            price = aircraft.get('price', 0)
-            if price < 5000000:
-                price_ranges['Under $5M'] += 1
-            elif price < 15000000:
-                price_ranges['$5M - $15M'] += 1
-            elif price < 30000000:
-                price_ranges['$15M - $30M'] += 1
-            elif price < 50000000:
-                price_ranges['$30M - $50M'] += 1
-            else:
-                price_ranges['Over $50M'] += 1
-        
-        insights['price_ranges'] = price_ranges
-        
-        # Top performers by category
-        best_value = max(AIRCRAFT_DATA, key=lambda x: x.get('best_all_around_dollar', 0))
-        best_speed = max(AIRCRAFT_DATA, key=lambda x: x.get('speed', 0))
-        best_range = max(AIRCRAFT_DATA, key=lambda x: x.get('range', 0))
-        
-        insights['top_performers'] = {
+        'price_ranges': {label: price_counts.get(label, 0) for label, _ in MARKET_PRICE_RANGES},
+        'top_performers': {
             'best_value': {
                 'name': best_value.get('aircraft_name', 'Unknown'),
                 'score': best_value.get('best_all_around_dollar', 0)
@@ -2840,16 +2855,22 @@ def api_market_insights():
                 'name': best_range.get('aircraft_name', 'Unknown'),
                 'range': best_range.get('range', 0)
             }
-        }
-        
+        },
         # Market trends
-        insights['market_trends'] = [
+        'market_trends': [
             "Light jets dominate the market with highest volume",
             "Turboprops offer best value for short-range missions",
             "Heavy jets provide premium long-range capabilities",
             "Operating costs vary significantly by aircraft category"
         ]
-        
+    }
+
+@app.route('/api/market-insights')
+def api_market_insights():
+    """Get market insights and trends (computed once per dataset version)"""
+    try:
+        dataset = current_dataset()
+        insights = current_dataset_version().derived('market_insights', lambda: build_market_insights(dataset))
         return jsonify(insights)
         
     except Exception as e:
@@ -2866,31 +2887,31 @@ def api_ai_recommendations():
         passengers = request.args.get('passengers', type=int)
         
         # Filter aircraft based on requirements
-        suitable_aircraft = []
-        
-        for aircraft in AIRCRAFT_DATA:
-            # Apply filters
-            if budget and aircraft.get('price', 0) > budget:
-                continue
-            if range_req and aircraft.get('range', 0) < range_req:
-                continue
-            if passengers and aircraft.get('passengers', 0) < passengers:
-                continue
-            
-            # Calculate AI recommendation score
-            ai_score = calculate_ai_recommendation_score(aircraft, mission, budget, range_req, passengers)
-            
-            suitable_aircraft.append({
-                'aircraft': aircraft,
-                'ai_score': ai_score,
-                'match_reasons': generate_ai_match_reasons(aircraft, mission, ai_score)
-            })
+        candidates = compile_filters({
+            'budget': budget,
+            'range_requirement': range_req,
+            'passengers': passengers
+        }).filter_records(current_dataset().fleet)
+        
+        # Calculate AI recommendation scores
+        ai_scores = [
+            calculate_ai_recommendation_score(aircraft, mission, budget, range_req, passengers)
+            for aircraft in candidates
+        ]
         
-        # Sort by AI score
-        suitable_aircraft.sort(key=lambda x: x['ai_score'], reverse=True)
+        # Top AI scores only; match reasons are generated for the returned aircraft
+        limit, offset = get_limit_offset(default_limit=10)
+        suitable_aircraft = [
+            {
+                'aircraft': candidates[i],
+                'ai_score': ai_scores[i],
+                'match_reasons': generate_ai_match_reasons(candidates[i], mission, ai_scores[i])
+            }
+            for i in top_k(ai_scores, limit, offset)
+        ]
         
         return jsonify({
-            'recommendations': suitable_aircraft[:10],  # Top 10 AI recommendations
+            'recommendations': suitable_aircraft,  # Top 10 AI recommendations by default
             'mission_profile': mission,
             'filters_applied': {
                 'budget': budget,
@@ -2920,7 +2941,7 @@ def api_scenario_analysis():
             # Calculate scores for this scenario
             scenario_results = []
             
-            for aircraft in AIRCRAFT_DATA:
+            for aircraft in current_dataset().aircraft:
                 # Calculate comprehensive score for this scenario
                 spreadsheet_score = calculate_spreadsheet_score(aircraft, user_inputs)
                 priority_score = calculate_priority_score(aircraft, priorities)
@@ -3091,356 +3112,27 @@ def calculate_priority_score_new(listing, aircraft_type_listings):
     maintenance recency, and paint condition compared to other listings of the same type.
     
     Returns a score 0-100 where 100 is the best listing of this aircraft type.
+    Scoring several listings of one group? Use score_listing_group once instead.
     """
     try:
-        # Component scores (0-100 each)
-        engine_score = calculate_engine_hours_score(listing, aircraft_type_listings)
-        interior_score = calculate_interior_quality_score(listing, aircraft_type_listings)
-        avionics_score = calculate_avionics_rank_score(listing, aircraft_type_listings)
-        maintenance_score = calculate_maintenance_recency_score(listing, aircraft_type_listings)
-        paint_score = calculate_paint_condition_score(listing, aircraft_type_listings)
-        
-        # Weighted combination based on what typically drives resale value
-        # These weights can be adjusted per aircraft model in the future
-        weights = get_resale_value_weights(listing.get('model', ''))
-        
-        priority_score = (
-            engine_score * weights['engine'] +
-            interior_score * weights['interior'] +
-            avionics_score * weights['avionics'] +
-            maintenance_score * weights['maintenance'] +
-            paint_score * weights['paint']
-        )
-        
-        # Normalize against best in category
-        if aircraft_type_listings:
-            category_scores = []
-            for other_listing in aircraft_type_listings:
-                if other_listing['id'] != listing['id']:
-                    other_score = (
-                        calculate_engine_hours_score(other_listing, aircraft_type_listings) * weights['engine'] +
-                        calculate_interior_quality_score(other_listing, aircraft_type_listings) * weights['interior'] +
-                        calculate_avionics_rank_score(other_listing, aircraft_type_listings) * weights['avionics'] +
-                        calculate_maintenance_recency_score(other_listing, aircraft_type_listings) * weights['maintenance'] +
-                        calculate_paint_condition_score(other_listing, aircraft_type_listings) * weights['paint']
-                    )
-                    category_scores.append(other_score)
-            
-            if category_scores:
-                max_score = max(category_scores + [priority_score])
-                if max_score > 0:
-                    priority_score = (priority_score / max_score) * 100
-        
-        return max(0, min(100, priority_score))
+        group = list(aircraft_type_listings or [])
+        index = next((i for i, other in enumerate(group) if other is listing), None)
+        if index is None:
+            group.append(listing)
+            index = len(group) - 1
+        return float(score_listing_group(group).priority[index])
         
     except Exception as e:
         print(f"Error calculating priority score: {e}")
         return 0
 
-def calculate_engine_hours_score(listing, aircraft_type_listings):
-    """Calculate engine hours score based on remaining hours vs TBO"""
-    try:
-        # Get engine hours and TBO information
-        engine_1_hours = listing.get('engine_1_time_since_new', 0) or 0
-        engine_1_tbo = get_engine_tbo(listing.get('engine_1_model', ''))
-        
-        if engine_1_tbo <= 0:
-            return 50  # Default score if TBO unknown
-        
-        # Calculate remaining hours
-        remaining_hours = max(0, engine_1_tbo - engine_1_hours)
-        remaining_percentage = (remaining_hours / engine_1_tbo) * 100
-        
-        # Cross-compare with other listings of same type
-        if aircraft_type_listings:
-            remaining_percentages = []
-            for other in aircraft_type_listings:
-                other_hours = other.get('engine_1_time_since_new', 0) or 0
-                other_tbo = get_engine_tbo(other.get('engine_1_model', ''))
-                if other_tbo > 0:
-                    other_remaining = max(0, other_tbo - other_hours)
-                    other_percentage = (other_remaining / other_tbo) * 100
-                    remaining_percentages.append(other_percentage)
-            
-            if remaining_percentages:
-                # Calculate percentile rank
-                remaining_percentages.append(remaining_percentage)
-                remaining_percentages.sort()
-                rank = remaining_percentages.index(remaining_percentage)
-                percentile = (rank / (len(remaining_percentages) - 1)) * 100
-                return percentile
-        
-        # If no comparisons available, use absolute scale
-        return remaining_percentage
-        
-    except Exception as e:
-        print(f"Error calculating engine hours score: {e}")
-        return 50
-
-def calculate_interior_quality_score(listing, aircraft_type_listings):
-    """Calculate interior quality score based on condition rating"""
-    try:
-        interior_condition = listing.get('interior_condition', '').lower()
-        
-        # Convert text ratings to numeric scores
-        condition_scores = {
-            'excellent': 100,
-            'very good': 80,
-            'good': 60,
-            'fair': 40,
-            'poor': 20,
-            '': 0  # No rating provided
-        }
-        
-        base_score = condition_scores.get(interior_condition, 0)
-        
-        # Cross-compare with other listings
-        if aircraft_type_listings:
-            all_scores = []
-            for other in aircraft_type_listings:
-                other_condition = other.get('interior_condition', '').lower()
-                other_score = condition_scores.get(other_condition, 0)
-                all_scores.append(other_score)
-            
-            if all_scores:
-                # Calculate relative score
-                all_scores.append(base_score)
-                all_scores.sort()
-                rank = all_scores.index(base_score)
-                percentile = (rank / (len(all_scores) - 1)) * 100 if len(all_scores) > 1 else base_score
-                return percentile
-        
-        return base_score
-        
-    except Exception as e:
-        print(f"Error calculating interior quality score: {e}")
-        return 50
-
-def calculate_avionics_rank_score(listing, aircraft_type_listings):
-    """Calculate avionics rank score based on avionics sophistication"""
-    try:
-        avionics_description = (listing.get('avionics_description', '') or '').lower()
-        
-        # Rank avionics systems (higher is better)
-        avionics_rankings = {
-            'g5000': 100,
-            'g3000': 95,
-            'pro line fusion': 90,
-            'symmetry flight deck': 85,
-            'easy iii': 80,
-            'ace avionics': 75,
-            'pro line 21': 70,
-            'g1000': 65,
-            'perspective': 60,
-            'avidyne r9': 55,
-            'collins proline': 50,
-            'honeywell': 45,
-            'garmin': 40,
-            'bendix king': 35,
-            'basic': 20,
-            '': 0  # No avionics info
-        }
-        
-        # Find best match in description
-        base_score = 0
-        for avionics_type, score in avionics_rankings.items():
-            if avionics_type and avionics_type in avionics_description:
-                base_score = max(base_score, score)
-        
-        # Cross-compare with other listings
-        if aircraft_type_listings:
-            all_scores = []
-            for other in aircraft_type_listings:
-                other_avionics = (other.get('avionics_description', '') or '').lower()
-                other_score = 0
-                for avionics_type, score in avionics_rankings.items():
-                    if avionics_type and avionics_type in other_avionics:
-                        other_score = max(other_score, score)
-                all_scores.append(other_score)
-            
-            if all_scores:
-                all_scores.append(base_score)
-                all_scores.sort()
-                rank = all_scores.index(base_score)
-                percentile = (rank / (len(all_scores) - 1)) * 100 if len(all_scores) > 1 else base_score
-                return percentile
-        
-        return base_score
-        
-    except Exception as e:
-        print(f"Error calculating avionics rank score: {e}")
-        return 50
-
-def calculate_maintenance_recency_score(listing, aircraft_type_listings):
-    """Calculate maintenance recency score based on inspection dates"""
-    try:
-        from datetime import datetime, timedelta
-        
-        last_annual = listing.get('last_annual_date')
-        if not last_annual:
-            return 0  # No maintenance info
-        
-        # Calculate days since last annual
-        try:
-            if isinstance(last_annual, str):
-                annual_date = datetime.strptime(last_annual, '%Y-%m-%d')
-            else:
-                annual_date = last_annual
-            
-            days_since = (datetime.now() - annual_date).days
-            
-            # Fresh inspection (< 90 days) gets high score
-            if days_since < 90:
-                base_score = 100
-            elif days_since < 180:
-                base_score = 80
-            elif days_since < 365:
-                base_score = 60
-            elif days_since < 500:
-                base_score = 40
-            else:
-                base_score = 20  # Overdue
-            
-        except Exception:
-            return 0
-        
-        # Cross-compare with other listings
-        if aircraft_type_listings:
-            all_scores = []
-            for other in aircraft_type_listings:
-                other_annual = other.get('last_annual_date')
-                if other_annual:
-                    try:
-                        if isinstance(other_annual, str):
-                            other_date = datetime.strptime(other_annual, '%Y-%m-%d')
-                        else:
-                            other_date = other_annual
-                        other_days = (datetime.now() - other_date).days
-                        
-                        if other_days < 90:
-                            other_score = 100
-                        elif other_days < 180:
-                            other_score = 80
-                        elif other_days < 365:
-                            other_score = 60
-                        elif other_days < 500:
-                            other_score = 40
-                        else:
-                            other_score = 20
-                        
-                        all_scores.append(other_score)
-                    except Exception:
-                        all_scores.append(0)
-            
-            if all_scores:
-                all_scores.append(base_score)
-                all_scores.sort()
-                rank = all_scores.index(base_score)
-                percentile = (rank / (len(all_scores) - 1)) * 100 if len(all_scores) > 1 else base_score
-                return percentile
-        
-        return base_score
-        
-    except Exception as e:
-        print(f"Error calculating maintenance recency score: {e}")
-        return 50
-
-def calculate_paint_condition_score(listing, aircraft_type_listings):
-    """Calculate paint condition score"""
-    try:
-        exterior_condition = listing.get('exterior_condition', '').lower()
-        
-        # Convert text ratings to numeric scores
-        condition_scores = {
-            'excellent': 100,
-            'very good': 80,
-            'good': 60,
-            'fair': 40,
-            'poor': 20,
-            '': 0  # No rating provided
-        }
-        
-        base_score = condition_scores.get(exterior_condition, 0)
-        
-        # Cross-compare with other listings
-        if aircraft_type_listings:
-            all_scores = []
-            for other in aircraft_type_listings:
-                other_condition = other.get('exterior_condition', '').lower()
-                other_score = condition_scores.get(other_condition, 0)
-                all_scores.append(other_score)
-            
-            if all_scores:
-                all_scores.append(base_score)
-                all_scores.sort()
-                rank = all_scores.index(base_score)
-                percentile = (rank / (len(all_scores) - 1)) * 100 if len(all_scores) > 1 else base_score
-                return percentile
-        
-        return base_score
-        
-    except Exception as e:
-        print(f"Error calculating paint condition score: {e}")
-        return 50
-
 def get_resale_value_weights(aircraft_model):
     """Get resale value weights for different aircraft models"""
-    # Default weights - can be customized per model
-    default_weights = {
-        'engine': 0.30,      # Engine hours most important
-        'interior': 0.25,    # Interior quality
-        'avionics': 0.20,    # Avionics sophistication
-        'maintenance': 0.15, # Maintenance recency
-        'paint': 0.10        # Paint condition
-    }
-    
-    # Model-specific weights (could be stored in database)
-    model_weights = {
-        'citation x': {
-            'engine': 0.35,
-            'interior': 0.20,
-            'avionics': 0.25,
-            'maintenance': 0.15,
-            'paint': 0.05
-        },
-        'gulfstream g550': {
-            'engine': 0.25,
-            'interior': 0.30,
-            'avionics': 0.25,
-            'maintenance': 0.15,
-            'paint': 0.05
-        }
-    }
-    
-    return model_weights.get(aircraft_model.lower(), default_weights)
+    return resale_value_weights(aircraft_model)
 
 def get_engine_tbo(engine_model):
     """Get Time Between Overhaul for different engine models"""
-    # Engine TBO database (hours)
-    engine_tbos = {
-        'pt6a-42': 3500,
-        'pt6a-67': 3500,
-        'pw306c': 5000,
-        'pw307a': 5000,
-        'cf34-3a': 6000,
-        'br710-c4-11': 6000,
-        'tfe731-2': 3000,
-        'tfe731-3': 3500,
-        'tfe731-40': 4000,
-        'tfe731-60': 4000,
-        'jt15d-4': 3000,
-        'jt15d-5': 3500,
-        'ae3007c': 6000,
-        'cf700-2d2': 3000,
-        'htf7000': 4000,
-        'htf7500e': 5000,
-        'pw545c': 4000,
-        'pw610f': 5000,
-        'rolls royce pearl 15': 6000,
-        'ge passport': 6000
-    }
-    
-    return engine_tbos.get(engine_model.lower(), 4000)  # Default 4000 hours
+    return engine_tbo(engine_model)
 
 def calculate_data_score(listing):
     """
@@ -3448,63 +3140,7 @@ def calculate_data_score(listing):
     Returns 0-100 score based on % of fields completed and verification level.
     """
     try:
-        # Required fields for aircraft listings
-        required_fields = [
-            'title', 'manufacturer', 'model', 'year', 'price', 'location',
-            'description', 'airframe_total_time', 'engine_1_manufacturer',
-            'engine_1_model', 'engine_1_time_since_new', 'engine_1_time_since_overhaul',
-            'interior_condition', 'exterior_condition', 'last_annual_date'
-        ]
-        
-        # Highly valued fields (bonus points)
-        bonus_fields = [
-            'serial_number', 'registration_number', 'avionics_description',
-            'equipment_list', 'maintenance_program', 'damage_history',
-            'images', 'specifications'
-        ]
-        
-        # Calculate completeness
-        completed_required = 0
-        for field in required_fields:
-            value = listing.get(field)
-            if value and str(value).strip() and str(value).strip() != '0':
-                completed_required += 1
-        
-        completeness_percentage = (completed_required / len(required_fields)) * 100
-        
-        # Calculate bonus points
-        completed_bonus = 0
-        for field in bonus_fields:
-            value = listing.get(field)
-            if value and str(value).strip():
-                completed_bonus += 1
-        
-        bonus_percentage = (completed_bonus / len(bonus_fields)) * 20  # Max 20 bonus points
-        
-        # Verification score
-        verification_score = 0
-        verification_status = listing.get('verification_status', 'pending')
-        
-        if verification_status == 'verified':
-            verification_score = 20
-        elif verification_status == 'partial':
-            verification_score = 10
-        elif verification_status == 'pending':
-            verification_score = 0
-        
-        # Penalties for missing critical fields
-        penalties = 0
-        if not listing.get('engine_1_time_since_new'):
-            penalties += 10
-        if not listing.get('interior_condition'):
-            penalties += 5
-        if not listing.get('images'):
-            penalties += 10
-        
-        # Calculate final data score
-        data_score = completeness_percentage + bonus_percentage + verification_score - penalties
-        
-        return max(0, min(100, data_score))
+        return data_score_details(listing)['data_score']
         
     except Exception as e:
         print(f"Error calculating data score: {e}")
@@ -3743,7 +3379,7 @@ def api_aircraft_scoring():
         # Calculate scores for all aircraft
         scored_aircraft = []
         
-        for aircraft in AIRCRAFT_DATA:
+        for aircraft in current_dataset().aircraft:
             # Step 1: Get all-around/$ score as percentage
             all_around_dollar = aircraft.get('best_all_around_dollar', 0)
             # INVERTED: Now the highest all-around dollar value gets the lowest percentage
@@ -3789,7 +3425,14 @@ def api_aircraft_scoring():
             # Step 3: Final score = (All-Around/$ + Priority Score) ÷ 2
             final_recommendation_score = (all_around_percentage + priority_score) / 2
             
-            scored_aircraft.append({
+            scored_aircraft.append((aircraft, final_recommendation_score, all_around_percentage, priority_score))
+        
+        # Top recommendations by final score (highest first); details are only built for those
+        limit, offset = get_limit_offset(data, default_limit=50)
+        aircraft_rankings = []
+        for i in top_k([entry[1] for entry in scored_aircraft], limit, offset):
+            aircraft, final_recommendation_score, all_around_percentage, priority_score = scored_aircraft[i]
+            aircraft_rankings.append({
                 'aircraft': aircraft,
                 'final_recommendation_score': final_recommendation_score,
                 'all_around_percentage': all_around_percentage,
@@ -3806,18 +3449,15 @@ def api_aircraft_scoring():
                 }
             })
         
-        # Sort by final recommendation score (highest first)
-        scored_aircraft.sort(key=lambda x: x['final_recommendation_score'], reverse=True)
-        
         return jsonify({
-            'aircraft_rankings': scored_aircraft[:50],  # Top 50 recommendations
+            'aircraft_rankings': aircraft_rankings,  # Top 50 recommendations by default
             'scoring_methodology': {
                 'step_1': 'Get all-around/$ score as percentage',
                 'step_2': 'Calculate priority score (weighted user preferences as percentages)', 
                 'step_3': 'Average all-around/$ score and priority score for final recommendation',
                 'formula': '(all_around_% + priority_score) / 2'
             },
-            'total_aircraft_evaluated': len(AIRCRAFT_DATA),
+            'total_aircraft_evaluated': len(current_dataset().aircraft),
             'filters_applied': user_inputs
         })
         
@@ -3902,7 +3542,7 @@ def api_test_scoring():
         }
         
         # Get first 5 aircraft for testing
-        test_aircraft = AIRCRAFT_DATA[:5]
+        test_aircraft = current_dataset().aircraft[:5]
         results = []
         
         for aircraft in test_aircraft:
@@ -3961,7 +3601,7 @@ def api_test_scoring():
             'methodology': 'final_score = (all_around_% + priority_score) / 2',
             'test_priorities': test_priorities,
             'sample_results': results,
-            'total_aircraft_available': len(AIRCRAFT_DATA)
+            'total_aircraft_available': len(current_dataset().aircraft)
         })
         
     except Exception as e:
@@ -3976,6 +3616,7 @@ def api_test_scoring():
 def api_charter_search():
     """Search for available charter aircraft using Avinode integration"""
     try:
+        avinode_client = AVINODE_CLIENT.get()
         if not avinode_client:
             return jsonify({'error': 'Avinode integration not available'}), 503
         
@@ -4024,6 +3665,7 @@ def api_charter_search():
 def api_charter_aircraft_details(aircraft_id):
     """Get detailed information about a specific charter aircraft"""
     try:
+        avinode_client = AVINODE_CLIENT.get()
         if not avinode_client:
             return jsonify({'error': 'Avinode integration not available'}), 503
         
@@ -4045,6 +3687,7 @@ def api_charter_aircraft_details(aircraft_id):
 def api_create_charter_quote():
     """Create a charter quote/booking request"""
     try:
+        avinode_client = AVINODE_CLIENT.get()
         if not avinode_client:
             return jsonify({'error': 'Avinode integration not available'}), 503
         
@@ -4090,6 +3733,7 @@ def api_create_charter_quote():
 def api_charter_quote_status(quote_id):
     """Get the status of a charter quote"""
     try:
+        avinode_client = AVINODE_CLIENT.get()
         if not avinode_client:
             return jsonify({'error': 'Avinode integration not available'}), 503
         
@@ -4159,8 +3803,10 @@ def api_charter_calculate_price():
         if not departure_airport or not arrival_airport:
             return jsonify({'error': 'Missing departure or arrival airport'}), 400
         
-        # Calculate distance (simplified)
-        distance = avinode_client._calculate_distance(departure_airport, arrival_airport) if avinode_client else 1000
+        # Great-circle distance between the airports
+        distance = DISTANCE_SERVICE.distance_nm(departure_airport, arrival_airport)
+        if distance is None:
+            return jsonify({'error': 'Unknown departure or arrival airport'}), 400
         
         # Estimate flight hours
         flight_hours = distance / 450.0  # Assume 450 knots average speed
@@ -4194,6 +3840,122 @@ def api_charter_calculate_price():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/charter/route-distances', methods=['POST'])
+def api_charter_route_distances():
+    """
+    Leg and total distances of a multi-leg route, computed in one batch.
+    Body: {"route": ["LAX", "JFK", "MIA"]} or {"legs": [["LAX", "JFK"], ["TEB", "PBI"]]}
+    """
+    try:
+        data = request.get_json() or {}
+        if data.get('route'):
+            codes = [str(code).strip().upper() for code in data['route']]
+            if len(codes) < 2:
+                return jsonify({'success': False, 'error': 'A route needs at least two airports'}), 400
+            return jsonify({'success': True, **DISTANCE_SERVICE.route(codes)})
+        
+        legs = [(str(leg[0]).strip().upper(), str(leg[1]).strip().upper()) for leg in data.get('legs') or []]
+        if not legs:
+            return jsonify({'success': False, 'error': 'route or legs is required'}), 400
+        distances = DISTANCE_SERVICE.distances(legs).tolist()
+        return jsonify({
+            'success': True,
+            'legs': [{'from': departure, 'to': arrival,
+                      'distance_nm': None if np.isnan(distance) else round(distance, 1)}
+                     for (departure, arrival), distance in zip(legs, distances)]
+        })
+    except Exception as e:
+        logger.error(f"Error calculating route distances: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/charter/feasible-aircraft', methods=['POST'])
+def api_charter_feasible_aircraft():
+    """
+    Aircraft able to fly every route of a network nonstop (range >= distance with reserve).
+    Body: {"airports": ["TEB", "PBI", "ASE"]} for every pair of the airports, or
+    {"routes": [["TEB", "PBI"], ["PBI", "ASE"]]}; optional passengers and limit
+    """
+    try:
+        data = request.get_json() or {}
+        routes = [(str(leg[0]).strip().upper(), str(leg[1]).strip().upper()) for leg in data.get('routes') or []]
+        if any(departure == arrival for departure, arrival in routes):
+            return jsonify({'success': False, 'error': 'Each route needs two different airports'}), 400
+        codes = [code for route in routes for code in route] if routes else data.get('airports') or []
+        if len(set(str(code).strip().upper() for code in codes)) < 2:
+            return jsonify({'success': False, 'error': 'airports or routes with at least two airports is required'}), 400
+        passengers = int(data.get('passengers') or 0)
+        limit, offset = get_limit_offset(data, default_limit=50)
+        
+        feasibility = get_route_feasibility(codes)
+        if feasibility.unknown:
+            return jsonify({'success': False, 'error': 'Unknown airports',
+                            'unknown_airports': feasibility.unknown}), 400
+        rows = feasibility.aircraft_for_routes(routes or None)
+        fleet = current_dataset().fleet
+        if passengers:
+            rows = rows[fleet.column('passengers')[rows] >= passengers]
+        end = None if limit is None else offset + limit
+        
+        return jsonify({
+            'success': True,
+            'routes': [{'from': departure, 'to': arrival, 'distance_nm': round(feasibility.distance_nm(departure, arrival), 1)}
+                       for departure, arrival in (routes or feasibility.pairs())],
+            'total': len(rows),
+            'aircraft': [fleet.records[row] for row in rows[offset:end].tolist()],
+            'summary': feasibility.summary()
+        })
+    except Exception as e:
+        logger.error(f"Error finding feasible aircraft: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/charter/mission-plan', methods=['POST'])
+def api_charter_mission_plan():
+    """
+    Minimum-time or minimum-cost routing with fuel stops for one aircraft.
+    Body: departure_airport, arrival_airport, objective ("time" or "cost"), and either aircraft_id
+    (range, speed and hourly cost from the catalog) or range_nm, speed_kts and hourly_cost
+    """
+    try:
+        data = request.get_json() or {}
+        dep = (data.get('departure_airport') or '').strip().upper()
+        arr = (data.get('arrival_airport') or '').strip().upper()
+        objective = data.get('objective') or 'time'
+        if not dep or not arr:
+            return jsonify({'success': False, 'error': 'departure_airport and arrival_airport are required'}), 400
+        if objective not in OBJECTIVES:
+            return jsonify({'success': False, 'error': f"objective must be one of {', '.join(OBJECTIVES)}"}), 400
+        
+        aircraft = None
+        if data.get('aircraft_id') is not None:
+            try:
+                aircraft_id = int(data['aircraft_id'])
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'aircraft_id must be an integer'}), 400
+            fleet = current_dataset().fleet
+            row = fleet.row_for_id(aircraft_id)
+            if row is None:
+                return jsonify({'success': False, 'error': 'Aircraft not found'}), 404
+            aircraft = fleet.records[row]
+        try:
+            range_nm = float(data.get('range_nm') or (aircraft or {}).get('range') or 0)
+            speed_kts = float(data.get('speed_kts') or (aircraft or {}).get('speed') or 450)
+            hourly_cost = float(data.get('hourly_cost') or (aircraft or {}).get('total_hourly_cost') or 3500)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'range_nm, speed_kts and hourly_cost must be numbers'}), 400
+        if range_nm <= 0 or speed_kts <= 0:
+            return jsonify({'success': False, 'error': 'A positive range and speed are required'}), 400
+        
+        plan = MISSION_PLANNER.plan(dep, arr, range_nm, speed_kts, hourly_cost, objective)
+        if plan is None:
+            return jsonify({'success': False, 'error': 'Unknown departure or arrival airport'}), 400
+        return jsonify({'success': True, 'aircraft': aircraft, 'plan': plan})
+    except Exception as e:
+        logger.error(f"Error planning charter mission: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/charter/recommend', methods=['POST'])
 def api_charter_recommend():
     """Recommend suitable jet types and specific aircraft for a charter route.
@@ -4208,16 +3970,14 @@ def api_charter_recommend():
         if not dep or not arr:
             return jsonify({'success': False, 'error': 'departure_airport and arrival_airport are required'}), 400
 
-        # Simple recommendation logic without external service
-        def distance_fn(a, b):
-            return avinode_client._calculate_distance(a, b) if avinode_client else 1000
-
-        # Calculate distance for the route
-        distance = distance_fn(dep, arr)
+        # Great-circle distance of the route
+        distance = DISTANCE_SERVICE.distance_nm(dep, arr)
+        if distance is None:
+            return jsonify({'success': False, 'error': 'Unknown departure or arrival airport'}), 400
         
         # Filter aircraft that can make the trip
         suitable_aircraft = []
-        for aircraft in AIRCRAFT_DATA:
+        for aircraft in current_dataset().aircraft:
             aircraft_range = aircraft.get('range', 0)
             aircraft_passengers = aircraft.get('passengers', 0)
             
@@ -4243,74 +4003,55 @@ def api_charter_recommend():
 def api_calculate_all_scores():
     """Calculate Priority, Data, and Match scores for all aircraft listings"""
     try:
-        # Group listings by aircraft type for cross-comparison
-        aircraft_by_type = {}
+        # Scores are materialized per aircraft type group; only a stale table is rescored here
+        dataset = current_dataset()
+        store = get_listing_scores()
+        if (request.get_json(silent=True) or {}).get('force_refresh'):
+            store.refresh(dataset.aircraft, dataset.version)
         
-        # For now, use CSV data to simulate marketplace listings
-        for aircraft in AIRCRAFT_DATA:
-            aircraft_type = f"{aircraft.get('manufacturer', '')} {aircraft.get('model', '')}".strip()
-            if aircraft_type not in aircraft_by_type:
-                aircraft_by_type[aircraft_type] = []
-            aircraft_by_type[aircraft_type].append(aircraft)
+        # Calculate average Match Score (without specific buyer preferences)
+        match_score = 75  # Default good match score
         
+        limit, offset = get_limit_offset(request.get_json(silent=True) or {}, default_limit=50)
         scored_aircraft = []
-        
-        for aircraft_type, type_listings in aircraft_by_type.items():
-            for listing in type_listings:
-                # Calculate Priority Score
-                priority_score = calculate_priority_score_new(listing, type_listings)
-                
-                # Calculate Data Score
-                data_score = calculate_data_score(listing)
-                
-                # Calculate average Match Score (without specific buyer preferences)
-                match_score = 75  # Default good match score
-                
-                # Find best in category for relative positioning
-                category_scores = []
-                for other_listing in type_listings:
-                    other_priority = calculate_priority_score_new(other_listing, type_listings)
-                    category_scores.append(other_priority)
-                
-                best_in_category = max(category_scores) if category_scores else priority_score
-                position = sorted(category_scores, reverse=True).index(priority_score) + 1
-                
-                scored_aircraft.append({
-                    'aircraft': listing,
-                    'aircraft_type': aircraft_type,
-                    'scores': {
-                        'priority_score': round(priority_score, 1),
-                        'data_score': round(data_score, 1),
-                        'match_score': round(match_score, 1)
-                    },
-                    'category_info': {
-                        'best_in_category': round(best_in_category, 1),
-                        'position': position,
-                        'total_in_category': len(type_listings)
-                    },
-                    'score_breakdown': {
-                        'priority_components': {
-                            'engine_hours': calculate_engine_hours_score(listing, type_listings),
-                            'interior_quality': calculate_interior_quality_score(listing, type_listings),
-                            'avionics_rank': calculate_avionics_rank_score(listing, type_listings),
-                            'maintenance_recency': calculate_maintenance_recency_score(listing, type_listings),
-                            'paint_condition': calculate_paint_condition_score(listing, type_listings)
-                        }
+        for row in store.top(limit, offset):
+            aircraft_row = dataset.fleet.row_for_id(row['listing_id'])
+            if aircraft_row is None:
+                continue
+            scored_aircraft.append({
+                'aircraft': dataset.fleet.records[aircraft_row],
+                'aircraft_type': row['aircraft_type'],
+                'scores': {
+                    'priority_score': round(row['priority_score'], 1),
+                    'data_score': round(row['data_score'], 1),
+                    'match_score': round(match_score, 1)
+                },
+                'category_info': {
+                    'best_in_category': round(row['category_best_score'], 1),
+                    'position': row['category_position'],
+                    'total_in_category': row['total_in_category']
+                },
+                'score_breakdown': {
+                    'priority_components': {
+                        'engine_hours': row['engine_hours_score'],
+                        'interior_quality': row['interior_quality_score'],
+                        'avionics_rank': row['avionics_rank_score'],
+                        'maintenance_recency': row['maintenance_recency_score'],
+                        'paint_condition': row['paint_condition_score']
                     }
-                })
-        
-        # Sort by priority score (highest first)
-        scored_aircraft.sort(key=lambda x: x['scores']['priority_score'], reverse=True)
+                }
+            })
         
+        summary = store.summary()
         return jsonify({
             'success': True,
-            'total_aircraft': len(scored_aircraft),
-            'aircraft_types': len(aircraft_by_type),
-            'scored_aircraft': scored_aircraft[:50],  # Return top 50
+            'total_aircraft': summary['total'],
+            'aircraft_types': summary['aircraft_types'],
+            'scored_aircraft': scored_aircraft,  # Top 50 by default
             'scoring_summary': {
-                'avg_priority_score': sum(a['scores']['priority_score'] for a in scored_aircraft) / len(scored_aircraft),
-                'avg_data_score': sum(a['scores']['data_score'] for a in scored_aircraft) / len(scored_aircraft),
-                'avg_match_score': sum(a['scores']['match_score'] for a in scored_aircraft) / len(scored_aircraft)
+                'avg_priority_score': summary['avg_priority_score'],
+                'avg_data_score': summary['avg_data_score'],
+                'avg_match_score': match_score
             }
         })
         
@@ -4398,44 +4139,31 @@ def api_calculate_match_scores():
         
         preferences = dict(preferences)
         
-        # Calculate match scores for all aircraft
+        # Match scores and components for all aircraft in one batched pass (cached per preference row)
+        matches = get_match_scores(preferences)
+        
+        # Top matches (highest first)
+        limit, offset = get_limit_offset(request.get_json(silent=True) or {}, default_limit=50)
         aircraft_with_match_scores = []
         
-        for aircraft in AIRCRAFT_DATA:
-            match_score = calculate_match_score(aircraft, preferences)
-            
-            # Calculate individual component scores for transparency
-            hours_match = calculate_hours_match(aircraft, preferences)
-            engine_match = calculate_engine_hours_match(aircraft, preferences)
-            avionics_match = calculate_avionics_match(aircraft, preferences)
-            interior_match = calculate_interior_match(aircraft, preferences)
-            maintenance_match = calculate_maintenance_match(aircraft, preferences)
-            paint_match = calculate_paint_match(aircraft, preferences)
-            
+        for i in top_k([round(score, 1) for score in matches.scores.tolist()], limit, offset):
+            match_score = float(matches.scores[i])
             aircraft_with_match_scores.append({
-                'aircraft': aircraft,
+                'aircraft': current_dataset().fleet.records[i],
                 'match_score': round(match_score, 1),
                 'match_components': {
-                    'hours_match': round(hours_match, 1),
-                    'engine_match': round(engine_match, 1),
-                    'avionics_match': round(avionics_match, 1),
-                    'interior_match': round(interior_match, 1),
-                    'maintenance_match': round(maintenance_match, 1),
-                    'paint_match': round(paint_match, 1)
+                    name: round(value, 1) for name, value in matches.component_scores(i).items()
                 },
                 'match_label': get_match_label(match_score)
             })
         
-        # Sort by match score (highest first)
-        aircraft_with_match_scores.sort(key=lambda x: x['match_score'], reverse=True)
-        
         conn.close()
         
         return jsonify({
             'success': True,
             'buyer_preferences': preferences,
-            'aircraft_matches': aircraft_with_match_scores[:50],  # Top 50 matches
-            'total_aircraft': len(aircraft_with_match_scores)
+            'aircraft_matches': aircraft_with_match_scores,  # Top 50 matches by default
+            'total_aircraft': len(matches)
         })
         
     except Exception as e:
@@ -4462,22 +4190,19 @@ def api_get_aircraft_scores(aircraft_id):
     """Get detailed scoring information for a specific aircraft"""
     try:
         # Find the aircraft
-        aircraft = None
-        for a in AIRCRAFT_DATA:
-            if a.get('id') == aircraft_id:
-                aircraft = a
-                break
-        
-        if not aircraft:
+        fleet = current_dataset().fleet
+        aircraft_row = fleet.row_for_id(aircraft_id)
+        if aircraft_row is None:
             return jsonify({'error': 'Aircraft not found'}), 404
+        aircraft = fleet.records[aircraft_row]
         
-        # Find other aircraft of the same type for comparison
-        aircraft_type = f"{aircraft.get('manufacturer', '')} {aircraft.get('model', '')}".strip()
-        type_listings = [a for a in AIRCRAFT_DATA if f"{a.get('manufacturer', '')} {a.get('model', '')}".strip() == aircraft_type]
-        
-        # Calculate scores
-        priority_score = calculate_priority_score_new(aircraft, type_listings)
-        data_score = calculate_data_score(aircraft)
+        # Materialized Priority/Data scores within the aircraft's type group
+        scores = get_listing_scores().get(aircraft_id)
+        if not scores:
+            return jsonify({'error': 'Aircraft scores not found'}), 404
+        aircraft_type = scores['aircraft_type']
+        priority_score = scores['priority_score']
+        data_score = scores['data_score']
         
         # Get buyer preferences for match score
         user_id = session.get('user_id')
@@ -4495,17 +4220,13 @@ def api_get_aircraft_scores(aircraft_id):
         preferences = cursor.fetchone()
         preferences = dict(preferences) if preferences else None
         
-        match_score = calculate_match_score(aircraft, preferences) if preferences else 50
+        matches = get_match_scores(preferences) if preferences else None
+        match_score = float(matches.scores[aircraft_row]) if matches else 50
+        match_components = matches.component_scores(aircraft_row) if matches else None
         
-        # Calculate category position
-        category_scores = []
-        for other_aircraft in type_listings:
-            other_priority = calculate_priority_score_new(other_aircraft, type_listings)
-            category_scores.append(other_priority)
-        
-        category_scores.sort(reverse=True)
-        position = category_scores.index(priority_score) + 1
-        best_in_category = category_scores[0] if category_scores else priority_score
+        position = scores['category_position']
+        total_in_category = scores['total_in_category']
+        best_in_category = scores['category_best_score']
         
         conn.close()
         
@@ -4520,31 +4241,29 @@ def api_get_aircraft_scores(aircraft_id):
             'category_comparison': {
                 'aircraft_type': aircraft_type,
                 'position': position,
-                'total_in_category': len(type_listings),
+                'total_in_category': total_in_category,
                 'best_in_category': round(best_in_category, 1),
-                'percentile': round((1 - (position - 1) / len(type_listings)) * 100, 1) if len(type_listings) > 1 else 100
+                'percentile': round(scores['percentile_rank'], 1)
             },
             'detailed_breakdown': {
                 'priority_components': {
-                    'engine_hours_score': round(calculate_engine_hours_score(aircraft, type_listings), 1),
-                    'interior_quality_score': round(calculate_interior_quality_score(aircraft, type_listings), 1),
-                    'avionics_rank_score': round(calculate_avionics_rank_score(aircraft, type_listings), 1),
-                    'maintenance_recency_score': round(calculate_maintenance_recency_score(aircraft, type_listings), 1),
-                    'paint_condition_score': round(calculate_paint_condition_score(aircraft, type_listings), 1),
+                    'engine_hours_score': round(scores['engine_hours_score'], 1),
+                    'interior_quality_score': round(scores['interior_quality_score'], 1),
+                    'avionics_rank_score': round(scores['avionics_rank_score'], 1),
+                    'maintenance_recency_score': round(scores['maintenance_recency_score'], 1),
+                    'paint_condition_score': round(scores['paint_condition_score'], 1),
                     'weights': get_resale_value_weights(aircraft.get('model', ''))
                 },
                 'data_components': {
+                    'completeness_percentage': round(scores['completeness_percentage'], 1),
+                    'required_fields_completed': scores['required_fields_completed'],
+                    'total_required_fields': scores['total_required_fields'],
                     'completeness_bonus': 'Calculated based on required fields filled',
                     'verification_bonus': aircraft.get('verification_status', 'pending'),
                     'critical_field_penalties': 'Applied for missing engine hours, interior rating, or photos'
                 },
                 'match_components': {
-                    'hours_match': round(calculate_hours_match(aircraft, preferences), 1) if preferences else 'N/A',
-                    'engine_match': round(calculate_engine_hours_match(aircraft, preferences), 1) if preferences else 'N/A',
-                    'avionics_match': round(calculate_avionics_match(aircraft, preferences), 1) if preferences else 'N/A',
-                    'interior_match': round(calculate_interior_match(aircraft, preferences), 1) if preferences else 'N/A',
-                    'maintenance_match': round(calculate_maintenance_match(aircraft, preferences), 1) if preferences else 'N/A',
-                    'paint_match': round(calculate_paint_match(aircraft, preferences), 1) if preferences else 'N/A'
+                    name: round(value, 1) for name, value in match_components.items()
                 } if preferences else 'No buyer preferences set'
             }
         })
@@ -4642,9 +4361,11 @@ def api_demo_scoring_data():
             'min_paint_rating': 3
         }
         
-        for listing in demo_listings:
-            # Calculate Priority Score
-            priority_score = calculate_priority_score_new(listing, demo_listings)
+        # Demo listings are compared as one group
+        demo_group = score_listing_group(demo_listings)
+        
+        for i, listing in enumerate(demo_listings):
+            priority_score = float(demo_group.priority[i])
             
             # Calculate Data Score
             data_score = calculate_data_score(listing)
@@ -4652,15 +4373,8 @@ def api_demo_scoring_data():
             # Calculate Match Score
             match_score = calculate_match_score(listing, demo_preferences)
             
-            # Find position in category
-            category_scores = []
-            for other_listing in demo_listings:
-                other_priority = calculate_priority_score_new(other_listing, demo_listings)
-                category_scores.append(other_priority)
-            
-            category_scores.sort(reverse=True)
-            position = category_scores.index(priority_score) + 1
-            best_in_category = category_scores[0] if category_scores else priority_score
+            position = int(demo_group.position[i])
+            best_in_category = demo_group.best_in_category
             
             scored_demos.append({
                 'listing': listing,
@@ -4808,97 +4522,108 @@ def api_performance_profiles():
         print(f"Error loading performance profiles: {e}")
         return jsonify([]), 500
 
-@app.route('/api/user-listings')
-def api_user_listings():
-    """API endpoint to get user-created listings"""
-    try:
-        conn = sqlite3.connect('instance/jet_finder.db')
-        cursor = conn.cursor()
+def load_user_listings(statuses=('active',)):
+    """
+    User listings in the given statuses (newest first), each merged over its performance profile;
+    listings whose profile is no longer in the dataset are left out
+    """
+    conn = sqlite3.connect('instance/jet_finder.db')
+    cursor = conn.cursor()
+    
+    # User listings in the given statuses with their performance profile data
+    placeholders = ', '.join('?' for _ in statuses)
+    cursor.execute(f'''
+        SELECT 
+            ul.id, ul.profile_id, ul.title, ul.year, ul.price, ul.hours,
+            ul.location, ul.email, ul.description, ul.images, ul.documents, ul.status,
+            ul.payment_status, ul.engine_type, ul.manufacturer, ul.pricing_plan,
+            ul.created_at, ul.updated_at
+        FROM user_listings ul
+        WHERE ul.status IN ({placeholders})
+        ORDER BY ul.created_at DESC
+    ''', tuple(statuses))
+    
+    listings = []
+    aircraft_data = get_unified_aircraft_data()
+    aircraft_map = {aircraft.get('id'): aircraft for aircraft in aircraft_data}
+    for row in cursor.fetchall():
+        (
+            listing_id,
+            profile_id,
+            title,
+            year,
+            price,
+            hours,
+            location,
+            email,
+            description,
+            images,
+            documents,
+            status,
+            payment_status,
+            engine_type,
+            listing_manufacturer,
+            pricing_plan,
+            created_at,
+            updated_at
+        ) = row
         
-        # Get all active user listings with performance profile data
-        cursor.execute('''
-            SELECT 
-                ul.id, ul.profile_id, ul.title, ul.year, ul.price, ul.hours,
-                ul.location, ul.email, ul.description, ul.images, ul.documents, ul.status,
-                ul.payment_status, ul.engine_type, ul.manufacturer, ul.pricing_plan,
-                ul.created_at, ul.updated_at
-            FROM user_listings ul
-            WHERE ul.status = 'active'
-            ORDER BY ul.created_at DESC
-        ''')
+        # Get performance profile data
+        profile = aircraft_map.get(profile_id)
         
-        listings = []
-        aircraft_data = get_unified_aircraft_data()
-        aircraft_map = {aircraft.get('id'): aircraft for aircraft in aircraft_data}
-        for row in cursor.fetchall():
-            (
-                listing_id,
-                profile_id,
-                title,
-                year,
-                price,
-                hours,
-                location,
-                email,
-                description,
-                images,
-                documents,
-                status,
-                payment_status,
-                engine_type,
-                listing_manufacturer,
-                pricing_plan,
-                created_at,
-                updated_at
-            ) = row
-            
-            # Get performance profile data
-            profile = aircraft_map.get(profile_id)
-            
-            if profile:
-                profile_copy = dict(profile)
-                image_list = [img.strip() for img in (images or '').split(',') if img.strip()]
-                document_list = [doc.strip() for doc in (documents or '').split(',') if doc.strip()]
+        if profile:
+            profile_copy = dict(profile)
+            image_list = [img.strip() for img in (images or '').split(',') if img.strip()]
+            document_list = [doc.strip() for doc in (documents or '').split(',') if doc.strip()]
 
-                resolved_manufacturer = listing_manufacturer or profile_copy.get('manufacturer') or 'Unknown'
-                resolved_engine_type = engine_type or profile_copy.get('engine_type') or profile_copy.get('category') or 'Unknown'
-                listing_title = title or f"{resolved_manufacturer} {profile_copy.get('aircraft_name', profile_copy.get('name', 'Aircraft'))}".strip()
-                hero_image = image_list[0] if image_list else profile_copy.get('image', '/static/images/aircraft_placeholder.jpg')
+            resolved_manufacturer = listing_manufacturer or profile_copy.get('manufacturer') or 'Unknown'
+            resolved_engine_type = engine_type or profile_copy.get('engine_type') or profile_copy.get('category') or 'Unknown'
+            listing_title = title or f"{resolved_manufacturer} {profile_copy.get('aircraft_name', profile_copy.get('name', 'Aircraft'))}".strip()
+            hero_image = image_list[0] if image_list else profile_copy.get('image', '/static/images/aircraft_placeholder.jpg')
 
-                combined = {
-                    **profile_copy,
-                    'id': listing_id,
-                    'listing_id': listing_id,
-                    'profile_id': profile_id,
-                    'title': listing_title,
-                    'listing_title': listing_title,
-                    'price': price,
-                    'listing_price': price,
-                    'location': location,
-                    'contact_email': email,
-                    'email': email,
-                    'description': description,
-                    'listing_description': description,
-                    'engine_type': resolved_engine_type,
-                    'manufacturer': resolved_manufacturer,
-                    'pricing_plan': pricing_plan or 'monthly',
-                    'status': status,
-                    'payment_status': payment_status,
-                    'images': image_list,
-                    'documents': document_list,
-                    'image': hero_image,
-                    'year': year or profile_copy.get('year'),
-                    'hours': hours,
-                    'created_at': created_at,
-                    'updated_at': updated_at,
-                    'is_user_listing': True
-                }
+            combined = {
+                **profile_copy,
+                'id': listing_id,
+                'listing_id': listing_id,
+                'profile_id': profile_id,
+                'title': listing_title,
+                'listing_title': listing_title,
+                'price': price,
+                'listing_price': price,
+                'location': location,
+                'contact_email': email,
+                'email': email,
+                'description': description,
+                'listing_description': description,
+                'engine_type': resolved_engine_type,
+                'manufacturer': resolved_manufacturer,
+                'pricing_plan': pricing_plan or 'monthly',
+                'status': status,
+                'payment_status': payment_status,
+                'images': image_list,
+                'documents': document_list,
+                'image': hero_image,
+                'year': year or profile_copy.get('year'),
+                'hours': hours,
+                'created_at': created_at,
+                'updated_at': updated_at,
+                'is_user_listing': True
+            }
 
-                listings.append(combined)
-        
-        conn.close()
+            listings.append(combined)
+    
+    conn.close()
+    return listings
+
+@app.route('/api/user-listings')
+def api_user_listings():
+    """API endpoint to get user-created listings"""
+    try:
+        listings = load_user_listings()
+        scores = USER_LISTING_SCORES.get_many(listing['id'] for listing in listings)
+        for listing in listings:
+            listing['scores'] = user_listing_scores(scores.get(listing['id']))
         return jsonify(listings)
-        
     except Exception as e:
         print(f"Error loading user listings: {e}")
         return jsonify([]), 500
@@ -4971,7 +4696,10 @@ def api_create_user_listing():
         listing_id = cursor.lastrowid
         conn.commit()
         conn.close()
-        
+
+        # Score the new listing (and rescore its aircraft type group) in listing_scores
+        refresh_user_listing_scores([listing_id])
+
         # Create Stripe payment session (framework ready for integration)
         # TODO: Integrate with Stripe
         # stripe_session = create_stripe_session(listing_id, data['price'])
@@ -5072,7 +4800,9 @@ def api_get_user_listing(listing_id):
             'max_altitude': profile.get('max_altitude', 0),
             'cabin_volume': profile.get('cabin_volume', 0),
             'baggage_volume': profile.get('baggage_volume', 0),
-            'image': profile.get('image', '/static/images/aircraft_placeholder.jpg')
+            'image': profile.get('image', '/static/images/aircraft_placeholder.jpg'),
+            # Priority/Data scores within the listing's aircraft type group
+            'scores': user_listing_scores(USER_LISTING_SCORES.get(listing_id))
         }
         
         conn.close()
@@ -5103,6 +4833,9 @@ def api_delete_user_listing(listing_id):
         conn.commit()
         conn.close()
         
+        # Drop the deleted listing from its aircraft type group in listing_scores
+        refresh_user_listing_scores([listing_id])
+        
         return jsonify({'message': 'Listing deleted successfully'}), 200
         
     except Exception as e:
@@ -5297,6 +5030,69 @@ def admin_listings():
     
     return render_template('admin/listings.html', pending_listings=pending_listings)
 
+@app.route('/api/admin/score-cache')
+def admin_score_cache_stats():
+    """API endpoint exposing Jet Finder ranking cache counters for sizing"""
+    if not session.get('user_id'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({'success': True, 'score_cache': SCORE_CACHE.stats()})
+
+@app.route('/api/admin/aircraft-data', methods=['GET', 'POST'])
+def admin_aircraft_data():
+    """
+    Aircraft dataset version and reload status (GET), or swap in a new sheet (POST): upload a CSV as
+    'file', or send {"reload": true} to re-read the current one. The new dataset is built in the
+    background and replaces the live one atomically once it is complete. Admin accounts only
+    (ADMIN_EMAILS): the sheet is shared by the whole site.
+    """
+    if not session.get('user_id'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    if not is_admin_user():
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    if request.method == 'GET':
+        return jsonify({'success': True, 'dataset': AIRCRAFT_CATALOGS.status(), 'aircraft': len(current_dataset().aircraft)})
+    
+    upload = request.files.get('file')
+    if upload is None:
+        if not (request.get_json(silent=True) or {}).get('reload'):
+            return jsonify({'error': 'Upload a CSV file or send {"reload": true}'}), 400
+        started = reload_aircraft_data(background=True)
+        return jsonify({'success': True, 'reload_started': started, 'dataset': AIRCRAFT_CATALOGS.status()}), 202
+    
+    if not upload.filename.lower().endswith('.csv'):
+        return jsonify({'error': 'Aircraft data must be a .csv file'}), 400
+    
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    upload_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(upload.filename))
+    try:
+        upload.save(upload_path)
+        # Reject sheets missing required columns before they replace the live CSV
+        import pandas as pd
+        headers = set(pd.read_csv(upload_path, nrows=0).columns)
+        required = {column.header for column in AIRCRAFT_SHEET_SCHEMA
+                    if column.key in PERFORMANCE_PROFILE_METRICS and column.header}
+        missing = sorted(required - headers)
+        if missing:
+            return jsonify({'error': 'CSV is missing required columns', 'missing_columns': missing}), 400
+        
+        backup_path = replace_source_file(upload_path, AIRCRAFT_CSV_PATH)
+    except Exception as e:
+        print(f"Error installing aircraft CSV: {e}")
+        return jsonify({'error': f'Could not read uploaded CSV: {e}'}), 400
+    finally:
+        if os.path.isfile(upload_path):
+            os.remove(upload_path)
+    
+    started = reload_aircraft_data(background=True)
+    return jsonify({
+        'success': True,
+        'reload_started': started,
+        'backup_path': backup_path,
+        'dataset': AIRCRAFT_CATALOGS.status()
+    }), 202
+
 @app.route('/api/admin/listings/<int:listing_id>/approve', methods=['POST'])
 def admin_approve_listing(listing_id):
     """API endpoint to approve a pending listing"""
@@ -5333,7 +5129,10 @@ def admin_approve_listing(listing_id):
         
         conn.commit()
         conn.close()
-        
+
+        # Rescore the approved listing's aircraft type group in listing_scores
+        refresh_user_listing_scores([listing_id])
+
         return jsonify({'message': 'Listing approved successfully', 'status': 'active'}), 200
         
     except Exception as e:
@@ -5377,6 +5176,9 @@ def admin_reject_listing(listing_id):
         conn.commit()
         conn.close()
         
+        # Drop the rejected listing from its aircraft type group in listing_scores
+        refresh_user_listing_scores([listing_id])
+        
         return jsonify({'message': 'Listing rejected successfully', 'status': 'rejected'}), 200
         
     except Exception as e:
@@ -5434,7 +5236,18 @@ def admin_populate_profiles():
         print(f"Error populating performance profiles: {e}")
         return jsonify({'error': 'Failed to populate profiles'}), 500
 
+def create_app(config=None):
+    """
+    The configured Jet Finder app. Nothing heavy happens at import: datasets, pandas managers and
+    third-party clients load on first use (or up front in the gunicorn master, see gunicorn.conf.py),
+    and the schema is set up once per deploy by the gunicorn master (or `flask --app app init-db`).
+    """
+    if config:
+        app.config.update(config)
+    STARTUP_PROFILE.log_report()
+    return app
+
 if __name__ == '__main__':
-    with app.app_context():
-        init_db()
+    init_db()
+    create_app()
     app.run(debug=True, host="0.0.0.0", port=5015)
@@ -4,11 +4,15 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
+from distance_service import DISTANCE_SERVICE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Route distance assumed when an airport code is not in the airport table
+DEFAULT_DISTANCE_NM = 1000.0
+
 class AvinodeIntegration:
     """
     Avinode API integration for charter listings and booking
@@ -137,26 +141,13 @@ class AvinodeIntegration:
     
     def _calculate_distance(self, dep_airport: str, arr_airport: str) -> float:
         """
-        Calculate approximate distance between airports (simplified)
+        Great-circle distance between airports in NM (DEFAULT_DISTANCE_NM when a code is unknown)
         """
-        # Mock distances for common routes
-        route_distances = {
-            ('LAX', 'JFK'): 2150,
-            ('LAX', 'ORD'): 1740,
-            ('JFK', 'LAX'): 2150,
-            ('ORD', 'LAX'): 1740,
-            ('MIA', 'JFK'): 1090,
-            ('JFK', 'MIA'): 1090,
-            ('SFO', 'JFK'): 2580,
-            ('JFK', 'SFO'): 2580,
-        }
-        
-        route = (dep_airport.upper(), arr_airport.upper())
-        if route in route_distances:
-            return route_distances[route]
-        
-        # Default distance calculation (very simplified)
-        return 1000.0
+        distance = DISTANCE_SERVICE.distance_nm(dep_airport, arr_airport)
+        if distance is None:
+            logger.warning(f"Unknown airport in route {dep_airport}-{arr_airport}; assuming {DEFAULT_DISTANCE_NM} NM")
+            return DEFAULT_DISTANCE_NM
+        return distance
     
     def _estimate_flight_hours(self, distance_nm: float) -> float:
         """
@@ -7,42 +7,61 @@ import os
 import pandas as pd
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import shutil
+from aircraft_catalog import AircraftCatalog, CatalogHandle, CatalogQuery, RecordColumns, Between, OneOf, Contains, Order
+from dataset_registry import replace_source_file
+
+
+# Defaults filter_aircraft/sort_aircraft read for fields an aircraft dict lacks
+RECORD_DEFAULTS = {'price': 0, 'year': 0, 'range': 0, 'seats': 0, 'total_hours': 0, 'max_speed': 0,
+                   'category': '', 'manufacturer': '', 'title': '', 'type': ''}
+
+# sort_aircraft options -> (field, descending); 'budget' is annual_budget, else the calculated budget
+SORT_FIELDS = {
+    'price_low': ('price', False), 'price_high': ('price', True),
+    'range_high': ('range', True), 'range_low': ('range', False),
+    'speed_high': ('max_speed', True), 'speed_low': ('max_speed', False),
+    'passengers_high': ('seats', True), 'passengers_low': ('seats', False),
+    'year_new': ('year', True), 'year_old': ('year', False),
+    'annual_budget_low': ('budget', False), 'annual_budget_high': ('budget', True),
+    'total_hourly_cost_low': ('total_hourly_cost', False), 'total_hourly_cost_high': ('total_hourly_cost', True),
+    'lowest_hourly_cost': ('total_hourly_cost', False),
+    'best_all_around': ('best_all_around', True),
+    'best_speed_dollar': ('best_speed_dollar', True),
+    'best_range_dollar': ('best_range_dollar', True),
+    'best_performance_dollar': ('performance_score', True),
+    'best_efficiency_dollar': ('efficiency_score', True),
+    'lowest_annual_cost': ('budget', False),
+    'lowest_mytc': ('mytc', False),
+    'best_own_charter_savings': ('own_charter_savings', True),
+    # Lowest recommendation score first is the most accessible/budget-friendly; highest is the best match
+    'recommendation_low': ('recommendation_score', False),
+    'recommendation_high': ('recommendation_score', True),
+    'aircraft_name': ('title', False),
+    'manufacturer': ('manufacturer', False),
+    'type': ('type', False),
+}
 
 
 class AircraftDataManager:
     def __init__(self, csv_path: str = 'Aircraft Data - Aircraft Data (1).csv'):
         self.csv_path = csv_path
         self.user_inputs_csv = 'Aircraft Data - User Inputs.csv'
-        self.df = None
         self.user_inputs = None
         self.last_loaded = None
 
-        # Column mapping for the CSV structure
-        self.col_indices = {
-            'aircraft_name': 0,      # Column index 0
-            'manufacturer': 1,       # Column index 1
-            'type': 2,               # Column index 2
-            'multi_engine': 3,       # Column index 3
-            'lowest_year': 4,        # Column index 4
-            'highest_year': 5,       # Column index 5
-            'range': 23,             # Column index 23 (X) - Range(NM)
-            'speed': 24,             # Column index 24 (Y) - Speed(KTS)
-            'passengers': 25,        # Column index 25 (Z) - Passengers
-            'price': 26,             # Column index 26 (AA) - Average Price
-            'annual_budget': 38,     # Column index 38 - Annual Budget
-            'total_hourly_cost': 59,  # Column index 59 - Total Hourly Cost
-            'hourly_variable_cost': 63,  # Column index 63 - Hourly Variable Cost
-            'multi_year_cost': 40,   # Column index 40 - Multi-Year Total Cost
-            'cost_to_charter': 42,   # Column index 42 - Cost To Charter
-            'best_speed_dollar': 45,  # Column index 45 - Best Speed/$
-            'best_range_dollar': 48,  # Column index 48 - Best Range/$
-            'best_all_around': 57    # Column index 57 - Best All Around/$
-        }
+        # Aircraft come from the shared aircraft catalog (the live one for the app's sheet)
+        self._catalog = CatalogHandle(csv_path)
 
         # Load data on initialization
         self.load_data()
 
+    @property
+    def catalog(self) -> Optional[AircraftCatalog]:
+        """The live aircraft catalog (follows hot reloads of the sheet); None until load_data() succeeds"""
+        if self.last_loaded is None:
+            return None
+        return self._catalog.current()
+
     def load_data(self) -> bool:
         """Load CSV data into memory"""
         try:
@@ -50,9 +69,10 @@ class AircraftDataManager:
                 print(f"❌ CSV file not found: {self.csv_path}")
                 return False
 
-            # Load main aircraft data
-            self.df = pd.read_csv(self.csv_path, header=0)
-            print(f"✅ Loaded {len(self.df)} rows from {self.csv_path}")
+            # Load main aircraft data from the catalog (shared with the app; the CSV is only parsed
+            # when it changes)
+            catalog = self._catalog.current()
+            print(f"✅ Loaded {len(catalog)} aircraft from {self.csv_path}")
 
             # Load user inputs if available
             self.load_user_inputs()
@@ -127,71 +147,38 @@ class AircraftDataManager:
 
     def get_all_aircraft(self) -> List[Dict[str, Any]]:
         """Get all aircraft as a list of dictionaries"""
-        if self.df is None:
+        catalog = self.catalog
+        if catalog is None:
             return []
 
         aircraft_list = []
+        for row, view in enumerate(catalog.aircraft):
+            aircraft_name = str(view['aircraft_name']).strip()
 
-        for idx, (_, row) in enumerate(self.df.iterrows()):
-            # Skip rows without aircraft name
-            if pd.isna(row.iloc[self.col_indices['aircraft_name']]) or str(
-                    row.iloc[self.col_indices['aircraft_name']]).strip() == '':
+            # Skip header-like entries
+            if aircraft_name.lower() in ['aircraft name', 'aircraft_name', 'name', ''] or aircraft_name == 'nan':
                 continue
 
-            try:
-                aircraft_name = str(row.iloc[self.col_indices['aircraft_name']]).strip()
-
-                # Skip header-like entries
-                if aircraft_name.lower() in ['aircraft name', 'aircraft_name', 'name', ''] or aircraft_name == 'nan':
-                    continue
-
-                aircraft_data = self._row_to_aircraft_dict(row, idx)
-                if aircraft_data:
-                    aircraft_list.append(aircraft_data)
-
-            except Exception as e:
-                print(f"⚠️ Skipping row {idx} due to error: {e}")
-                continue
+            aircraft_data = self._row_to_aircraft_dict(view, row)
+            if aircraft_data:
+                aircraft_list.append(aircraft_data)
 
         return aircraft_list
 
-    def _row_to_aircraft_dict(self, row, idx: int) -> Optional[Dict[str, Any]]:
-        """Convert a DataFrame row to aircraft dictionary"""
+    def _row_to_aircraft_dict(self, view, idx: int) -> Optional[Dict[str, Any]]:
+        """Convert one catalog aircraft to this manager's aircraft dictionary"""
         try:
             # Extract basic info
-            aircraft_name = str(row.iloc[self.col_indices['aircraft_name']]).strip()
-            manufacturer = str(row.iloc[self.col_indices['manufacturer']]) if not pd.isna(
-                row.iloc[self.col_indices['manufacturer']]) else aircraft_name.split(' ')[0]
-            aircraft_type = str(row.iloc[self.col_indices['type']]) if not pd.isna(
-                row.iloc[self.col_indices['type']]) else 'Unknown'
-
-            # Extract numeric data with error handling
-            def safe_numeric(value, default=0):
-                try:
-                    if pd.isna(value) or str(value).strip() == '':
-                        return default
-                    if isinstance(value, str):
-                        value = value.replace('$', '').replace(',', '').replace('%', '')
-                    return float(value)
-                except (ValueError, TypeError):
-                    return default
-
-            def safe_int(value, default=0):
-                try:
-                    if pd.isna(value) or str(value).strip() == '':
-                        return default
-                    if isinstance(value, str):
-                        value = value.replace(',', '')
-                    return int(float(value))
-                except (ValueError, TypeError):
-                    return default
-
-            # Extract all performance and cost data
-            range_nm = safe_int(row.iloc[self.col_indices['range']], 0)
-            speed_kts = safe_int(row.iloc[self.col_indices['speed']], 0)
-            pax = safe_int(row.iloc[self.col_indices['passengers']], 0)
-            price = safe_numeric(row.iloc[self.col_indices['price']], 0)
-            year = safe_int(row.iloc[self.col_indices['highest_year']], 2020)
+            aircraft_name = str(view['aircraft_name']).strip()
+            manufacturer = view['manufacturer']
+            aircraft_type = view['category']
+
+            # Performance and cost data (cleaned by the catalog; missing values are 0, year defaults to 2020)
+            range_nm = view['range']
+            speed_kts = view['speed']
+            pax = view['passengers']
+            price = view['price']
+            year = view['year']
 
             # Determine category
             if aircraft_type.lower() in ['business jet', 'jet']:
@@ -230,15 +217,15 @@ class AircraftDataManager:
                 'owner_id': 'csv_data',
 
                 # Additional CSV data
-                'total_hourly_cost': safe_numeric(row.iloc[self.col_indices['total_hourly_cost']], 0),
-                'annual_budget': safe_numeric(row.iloc[self.col_indices['annual_budget']], 0),
-                'hourly_variable_cost': safe_numeric(row.iloc[self.col_indices['hourly_variable_cost']], 0),
-                'multi_year_cost': safe_numeric(row.iloc[self.col_indices['multi_year_cost']], 0),
-                'cost_to_charter': safe_numeric(row.iloc[self.col_indices['cost_to_charter']], 0),
-                'best_speed_dollar': safe_numeric(row.iloc[self.col_indices['best_speed_dollar']], 0),
-                'best_range_dollar': safe_numeric(row.iloc[self.col_indices['best_range_dollar']], 0),
-                'best_all_around': safe_numeric(row.iloc[self.col_indices['best_all_around']], 0),
-                'multi_engine': str(row.iloc[self.col_indices['multi_engine']]) if not pd.isna(row.iloc[self.col_indices['multi_engine']]) else 'Unknown'
+                'total_hourly_cost': view['total_hourly_cost'],
+                'annual_budget': view['annual_budget'],
+                'hourly_variable_cost': view['hourly_variable_cost'],
+                'multi_year_cost': view['multi_year_total_cost'],
+                'cost_to_charter': view['cost_to_charter'],
+                'best_speed_dollar': view['best_speed_dollar'],
+                'best_range_dollar': view['best_range_dollar'],
+                'best_all_around': view['best_all_around_dollar'],
+                'multi_engine': view['multi_engine']
             }
 
             # Calculate derived metrics
@@ -318,113 +305,42 @@ class AircraftDataManager:
 
     def filter_aircraft(self, aircraft_list: List[Dict], filters: Dict[str, Any]) -> List[Dict]:
         """Apply filters to aircraft list"""
-        filtered = aircraft_list.copy()
-
-        # Apply each filter
+        conditions = []
         if filters.get('category'):
-            filtered = [a for a in filtered if a.get('category', '').lower() == filters['category'].lower()]
-
-        if filters.get('min_price', 0) > 0:
-            filtered = [a for a in filtered if a.get('price', 0) >= filters['min_price']]
-
-        if filters.get('max_price', float('inf')) < float('inf'):
-            filtered = [a for a in filtered if a.get('price', 0) <= filters['max_price']]
-
-        if filters.get('min_year', 0) > 0:
-            filtered = [a for a in filtered if a.get('year', 0) >= filters['min_year']]
-
-        if filters.get('max_year', 9999) < 9999:
-            filtered = [a for a in filtered if a.get('year', 0) <= filters['max_year']]
-
+            conditions.append(OneOf('category', (filters['category'],), ignore_case=True))
         if filters.get('manufacturer'):
-            filtered = [a for a in filtered if filters['manufacturer'].lower() in a.get('manufacturer', '').lower()]
-
-        if filters.get('min_range', 0) > 0:
-            filtered = [a for a in filtered if a.get('range', 0) >= filters['min_range']]
-
-        if filters.get('max_range', float('inf')) < float('inf'):
-            filtered = [a for a in filtered if a.get('range', 0) <= filters['max_range']]
-
-        if filters.get('seats', 0) > 0:
-            filtered = [a for a in filtered if a.get('seats', 0) >= filters['seats']]
-
+            conditions.append(Contains(('manufacturer',), filters['manufacturer']))
+
+        # Numeric bounds (0 / unbounded values mean "no filter")
+        bounds = [('min_price', 'price', 'low'), ('max_price', 'price', 'high'),
+                  ('min_year', 'year', 'low'), ('max_year', 'year', 'high'),
+                  ('min_range', 'range', 'low'), ('max_range', 'range', 'high'),
+                  ('seats', 'seats', 'low')]
+        for name, key, side in bounds:
+            value = filters.get(name)
+            if side == 'low' and value is not None and value > 0:
+                conditions.append(Between(key, low=value))
+            elif side == 'high' and value is not None and value < (9999 if name == 'max_year' else float('inf')):
+                conditions.append(Between(key, high=value))
         if filters.get('max_flight_hours'):
-            filtered = [a for a in filtered if a.get('total_hours', 0) <= filters['max_flight_hours']]
+            conditions.append(Between('total_hours', high=filters['max_flight_hours']))
 
-        return filtered
+        if not conditions:
+            return aircraft_list.copy()
+        return RecordColumns(aircraft_list, RECORD_DEFAULTS).query(CatalogQuery(filters=conditions))
 
     def sort_aircraft(self, aircraft_list: List[Dict], sort_by: str = 'recommended') -> List[Dict]:
         """Sort aircraft list by specified criteria"""
-        sorted_list = aircraft_list.copy()
-
-        if sort_by == 'price_low':
-            sorted_list.sort(key=lambda x: x.get('price', 0))
-        elif sort_by == 'price_high':
-            sorted_list.sort(key=lambda x: x.get('price', 0), reverse=True)
-        elif sort_by == 'range_high':
-            sorted_list.sort(key=lambda x: x.get('range', 0), reverse=True)
-        elif sort_by == 'range_low':
-            sorted_list.sort(key=lambda x: x.get('range', 0))
-        elif sort_by == 'speed_high':
-            sorted_list.sort(key=lambda x: x.get('max_speed', 0), reverse=True)
-        elif sort_by == 'speed_low':
-            sorted_list.sort(key=lambda x: x.get('max_speed', 0))
-        elif sort_by == 'passengers_high':
-            sorted_list.sort(key=lambda x: x.get('seats', 0), reverse=True)
-        elif sort_by == 'passengers_low':
-            sorted_list.sort(key=lambda x: x.get('seats', 0))
-        elif sort_by == 'year_new':
-            sorted_list.sort(key=lambda x: x.get('year', 0), reverse=True)
-        elif sort_by == 'year_old':
-            sorted_list.sort(key=lambda x: x.get('year', 0))
-        elif sort_by == 'annual_budget_low':
-            sorted_list.sort(key=lambda x: x.get('annual_budget', 0) or x.get('calculated_annual_budget', 0))
-        elif sort_by == 'annual_budget_high':
-            sorted_list.sort(
-                key=lambda x: x.get(
-                    'annual_budget',
-                    0) or x.get(
-                    'calculated_annual_budget',
-                    0),
-                reverse=True)
-        elif sort_by == 'total_hourly_cost_low':
-            sorted_list.sort(key=lambda x: x.get('total_hourly_cost', 0))
-        elif sort_by == 'total_hourly_cost_high':
-            sorted_list.sort(key=lambda x: x.get('total_hourly_cost', 0), reverse=True)
-        elif sort_by == 'lowest_hourly_cost':
-            sorted_list.sort(key=lambda x: x.get('total_hourly_cost', 0))
-        elif sort_by == 'best_all_around':
-            sorted_list.sort(key=lambda x: x.get('best_all_around', 0), reverse=True)
-        elif sort_by == 'best_speed_dollar':
-            sorted_list.sort(key=lambda x: x.get('best_speed_dollar', 0), reverse=True)
-        elif sort_by == 'best_range_dollar':
-            sorted_list.sort(key=lambda x: x.get('best_range_dollar', 0), reverse=True)
-        elif sort_by == 'best_performance_dollar':
-            sorted_list.sort(key=lambda x: x.get('performance_score', 0), reverse=True)
-        elif sort_by == 'best_efficiency_dollar':
-            sorted_list.sort(key=lambda x: x.get('efficiency_score', 0), reverse=True)
-        elif sort_by == 'lowest_annual_cost':
-            sorted_list.sort(key=lambda x: x.get('annual_budget', 0) or x.get('calculated_annual_budget', 0))
-        elif sort_by == 'lowest_mytc':
-            sorted_list.sort(key=lambda x: x.get('mytc', 0))
-        elif sort_by == 'best_own_charter_savings':
-            sorted_list.sort(key=lambda x: x.get('own_charter_savings', 0), reverse=True)
-        elif sort_by == 'recommendation_low':
-            # Sort by lowest recommendation score first (most accessible/budget-friendly)
-            sorted_list.sort(key=lambda x: x.get('recommendation_score', 0), reverse=False)
-        elif sort_by == 'recommendation_high':
-            # Sort by highest recommendation score first (best match for criteria)
-            sorted_list.sort(key=lambda x: x.get('recommendation_score', 0), reverse=True)
-        elif sort_by == 'aircraft_name':
-            sorted_list.sort(key=lambda x: x.get('title', ''))
-        elif sort_by == 'manufacturer':
-            sorted_list.sort(key=lambda x: x.get('manufacturer', ''))
-        elif sort_by == 'type':
-            sorted_list.sort(key=lambda x: x.get('type', ''))
-        # Default sorting for 'recommended' is now handled in the calling function
-        # Add more sorting options as needed
-
-        return sorted_list
+        # Default sorting for 'recommended' is handled in the calling function
+        sort_field = SORT_FIELDS.get(sort_by)
+        if sort_field is None:
+            return aircraft_list.copy()
+
+        key, descending = sort_field
+        records = RecordColumns(aircraft_list, RECORD_DEFAULTS, computed={
+            'budget': lambda a: a.get('annual_budget', 0) or a.get('calculated_annual_budget', 0)
+        })
+        return records.query(CatalogQuery(order=[Order(key, descending)]))
 
     def get_aircraft_by_id(self, aircraft_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific aircraft by ID"""
@@ -437,17 +353,15 @@ class AircraftDataManager:
     def upload_csv(self, file_path: str) -> bool:
         """Upload and replace the current CSV file"""
         try:
-            # Backup current file
-            if os.path.exists(self.csv_path):
-                backup_path = f"{self.csv_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(self.csv_path, backup_path)
+            # Back up the current file and swap the new one in atomically (the app's dataset
+            # registry notices the change and reloads without a restart)
+            backup_path = replace_source_file(file_path, self.csv_path)
+            if backup_path:
                 print(f"✅ Backed up current CSV to {backup_path}")
-
-            # Replace with new file
-            shutil.copy2(file_path, self.csv_path)
             print(f"✅ Uploaded new CSV: {file_path}")
 
             # Reload data
+            self._catalog.reload()
             return self.load_data()
 
         except Exception as e:
@@ -0,0 +1,298 @@
+"""
+Aircraft Sheet Ingestion for Jet Finder
+Declares the aircraft CSV schema once (header -> record key, dtype, default) and cleans whole columns
+with vectorized string ops and pd.to_numeric. The app loader, csv_data_manager and import_aircraft_data
+all read the sheet through it.
+"""
+
+import re
+import hashlib
+import numpy as np
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd  # Imported where sheets are parsed, so importing the schema stays cheap
+
+# Bump when the cleaning rules change (invalidates compiled records built with them)
+INGEST_VERSION = 1
+
+# Formatting characters removed from numeric cells before parsing ('$1,234', '12%', '-$136,466')
+NUMERIC_NOISE = ',$%'
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    One record field.
+    header: CSV header the value comes from (None for constant or derived fields)
+    dtype: 'int' (truncated like int(float(x))), 'float' or 'str' (str() of the cell)
+    default: value for missing/unparseable cells, or when the sheet lacks the header
+    constant: fixed value for every record
+    derive: computes the field for all rows from the ingest (runs after header columns)
+    """
+    key: str
+    header: Optional[str] = None
+    dtype: str = 'float'
+    default: Any = 0
+    constant: Any = None
+    derive: Optional[Callable[['SheetIngest'], Sequence[Any]]] = None
+
+
+def clean_numeric(values: 'pd.Series', strip: str = NUMERIC_NOISE) -> np.ndarray:
+    """
+    Parse a column to float64 in one pass: numeric cells as-is, text cells with the strip characters
+    and surrounding whitespace removed. NaN marks missing or unparseable cells.
+    """
+    import pandas as pd
+    if values.dtype.kind in 'iuf':
+        return values.to_numpy(dtype=np.float64, copy=True)
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+    if strip:
+        pattern = '[' + re.escape(strip) + ']'
+        cleaned = values.str.replace(pattern, '', regex=True).str.strip()
+    else:
+        cleaned = values.str.strip()
+    # Non-text cells come back as NaN from .str and keep their direct conversion
+    parsed = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64)
+    return np.where(np.isnan(parsed), numeric, parsed)
+
+
+def as_int(values: np.ndarray, default: int = 0) -> np.ndarray:
+    """Truncate parsed floats to int64; missing or non-finite values become default"""
+    finite = np.isfinite(values)
+    return np.where(finite, np.trunc(np.where(finite, values, 0)), default).astype(np.int64)
+
+
+def as_float(values: np.ndarray, default: float = 0.0) -> np.ndarray:
+    """Parsed floats with missing values replaced by default"""
+    return np.where(np.isnan(values), float(default), values)
+
+
+def as_text(values: 'pd.Series') -> List[str]:
+    """str() of every cell (missing cells read 'nan', as str() of the cell does)"""
+    return [str(value) for value in values.tolist()]
+
+
+def schema_fingerprint(schema: Sequence[Column]) -> str:
+    """Identify a schema (and the cleaning rules applied to it) for compiled-record cache keys"""
+    parts = [str(INGEST_VERSION)]
+    for column in schema:
+        derive = getattr(column.derive, '__qualname__', None)
+        parts.append(repr((column.key, column.header, column.dtype, column.default, column.constant, derive)))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class SheetIngest:
+    """
+    A sheet cleaned column-by-column against a schema.
+    columns[key] holds each field for every row; valid marks rows whose required fields are present
+    and non-zero, and skipped reports the rest with the first failing field.
+    """
+
+    def __init__(self, df: 'pd.DataFrame', schema: Sequence[Column], required: Sequence[str] = ()):
+        self.df = df
+        self.schema = tuple(schema)
+        self.rows = len(df)
+        self._numeric: Dict[str, np.ndarray] = {}
+        self.columns: Dict[str, Any] = {}
+
+        for column in self.schema:
+            if column.derive is not None:
+                continue
+            if column.header is None:
+                self.columns[column.key] = [column.constant] * self.rows
+            elif column.header not in df.columns:
+                self.columns[column.key] = [column.default] * self.rows
+            elif column.dtype == 'str':
+                self.columns[column.key] = as_text(df[column.header])
+            elif column.dtype == 'int':
+                self.columns[column.key] = as_int(self.numeric(column.header), column.default)
+            else:
+                self.columns[column.key] = as_float(self.numeric(column.header), column.default)
+        for column in self.schema:
+            if column.derive is not None:
+                self.columns[column.key] = column.derive(self)
+
+        # Required fields: present and non-zero / non-empty
+        self.valid = np.ones(self.rows, dtype=bool)
+        self.skipped: List[Dict[str, Any]] = []
+        failed_field: List[Optional[str]] = [None] * self.rows
+        for key in required:
+            values = self.columns[key]
+            if isinstance(values, np.ndarray):
+                ok = values != 0
+            else:
+                ok = np.array([value is not None and value != '' and
+                               not (isinstance(value, (int, float)) and value == 0) for value in values], dtype=bool)
+            for row in np.flatnonzero(self.valid & ~ok):
+                failed_field[row] = key
+            self.valid &= ok
+        for row, key in enumerate(failed_field):
+            if key is not None:
+                self.skipped.append({
+                    'row': row,
+                    'field': key,
+                    'reason': f"Missing or invalid value for required metric: {key}"
+                })
+
+    def numeric(self, header: Optional[str]) -> np.ndarray:
+        """Parsed float64 column for a CSV header (NaN where missing/unparseable; all NaN if absent)"""
+        values = self._numeric.get(header)
+        if values is None:
+            if header is not None and header in self.df.columns:
+                values = clean_numeric(self.df[header])
+            else:
+                values = np.full(self.rows, np.nan)
+            self._numeric[header] = values
+        return values
+
+    def header(self, key: str) -> Optional[str]:
+        """CSV header behind a schema key"""
+        for column in self.schema:
+            if column.key == key:
+                return column.header
+        raise KeyError(key)
+
+    def parsed(self, key: str) -> np.ndarray:
+        """A numeric field before defaults are applied (NaN where missing or unparseable)"""
+        return self.numeric(self.header(key))
+
+    def raw(self, key: str, default: Any = None) -> List[Any]:
+        """A field's cell values as Python objects (NaN for empty cells; default if the sheet lacks it)"""
+        header = self.header(key)
+        if header not in self.df.columns:
+            return [default] * self.rows
+        return self.df[header].tolist()
+
+    def records(self, rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Records in schema key order for the given rows (default: the valid rows)"""
+        rows = np.flatnonzero(self.valid) if rows is None else rows
+        keys = [column.key for column in self.schema]
+        values = []
+        for key in keys:
+            column = self.columns[key]
+            if isinstance(column, np.ndarray):
+                values.append(column[rows].tolist())
+            else:
+                values.append([column[row] for row in rows])
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def _sequential_ids(ingest: SheetIngest) -> np.ndarray:
+    """Placeholder ids; ingest_aircraft_sheet numbers the valid rows once validation has run"""
+    return np.zeros(ingest.rows, dtype=np.int64)
+
+
+def _aircraft_description(ingest: SheetIngest) -> List[str]:
+    manufacturer = ingest.raw('manufacturer', 'Unknown')
+    aircraft_type = ingest.raw('category', 'Unknown')
+    date_range = ingest.raw('date_range', 'Unknown years')
+    return [f"{m} {t} - {d}" for m, t, d in zip(manufacturer, aircraft_type, date_range)]
+
+
+# Aircraft sheet -> aircraft record (app AircraftStore rows), in record key order
+AIRCRAFT_SHEET_SCHEMA = (
+    Column('id', dtype='int', derive=_sequential_ids),
+    Column('aircraft_name', '316', 'str', 'Unknown'),  # First column (316) holds the aircraft names
+    Column('manufacturer', 'Manufacturer', 'str', 'Unknown'),
+    Column('model', '316', 'str', 'Unknown'),
+    Column('year', 'Highest Year', 'int', 2020),
+    Column('price', 'Average Price', 'int'),
+    Column('range', 'Range(NM)', 'int'),
+    Column('speed', 'Speed(KTS)', 'int'),
+    Column('passengers', 'Passengers', 'int'),
+    Column('category', 'Type', 'str', 'Unknown'),  # e.g. 'Business Jet', 'Turboprop'
+    Column('location', constant='Various Locations'),
+    Column('description', dtype='str', derive=_aircraft_description),
+    Column('image', constant='/static/images/aircraft_placeholder.jpg'),
+
+    # Raw data for calculations
+    Column('date_range', 'Date Range', 'str', ''),
+    Column('lowest_year', 'Lowest Year', 'int'),
+    Column('highest_year', 'Highest Year', 'int'),
+
+    # Physical specifications
+    Column('max_altitude', 'Max Operating Altitude (ft)', 'int'),
+    Column('runway_length', 'Balanced Field Length (ft)', 'int'),
+    Column('aircraft_height', 'Aircraft Height (ft)', 'float', 0.0),
+    Column('wingspan', 'Wingspan (ft)', 'float', 0.0),
+    Column('aircraft_length', 'Aircraft Length (ft)', 'float', 0.0),
+    Column('aircraft_volume', 'Aircraft Volume (cubic ft)', 'int'),
+    Column('cabin_height', 'Cabin Height (ft)', 'float', 0.0),
+    Column('cabin_width', 'Cabin Width (ft)', 'float', 0.0),
+    Column('cabin_length', 'Cabin Length (ft)', 'float', 0.0),
+    Column('cabin_volume', 'Cabin Volume (cubic ft)', 'float', 0.0),
+    Column('baggage_volume', 'Baggage Volume (cubic ft)', 'int'),
+
+    # Operational data
+    Column('charter_rate', 'Hourly Charter Rate', 'float', 0.0),
+    Column('total_hourly_cost', 'Total Hourly Cost', 'float', 0.0),
+    Column('years_range', 'Date Range', 'str', 'Unknown'),
+    Column('multi_engine', 'Multi Engine', 'str', 'Unknown'),
+    Column('min_crew', 'Min Crew Required', 'int', 1),
+    Column('depreciation_rate', 'Depreciation Rate', 'float', 0.0),
+
+    # Trip time data
+    Column('average_trip_time', 'Average Trip Time', 'float', 0.0),
+    Column('total_trip_time', '# of Hours', 'float', 0.0),
+
+    # Base financial performance metrics (recalculated from user inputs by the formula engine)
+    Column('annual_budget', 'Annual Budget', 'float', 0.0),
+    Column('adjusted_annual_budget', 'Adjusted Annual Budget', 'float', 0.0),
+    Column('multi_year_total_cost', 'Multi-Year Total Cost', 'float', 0.0),
+    Column('mytc_with_aircraft_sale', 'MYTC w/ Aircraft Sale', 'float', 0.0),
+    Column('cost_to_charter', 'Cost To Charter', 'float', 0.0),
+    Column('total_fixed_cost', 'Total Fixed Cost', 'float', 0.0),
+    Column('total_variable_cost', 'Total Variable Cost', 'float', 0.0),
+    Column('adjusted_variable_cost', 'Adjusted Variable Cost', 'float', 0.0),
+
+    # Ownership metrics
+    Column('own_charter_ratio', 'Own/Charter Ratio', 'float', 0.0),
+    Column('own_charter_savings', 'Own/Charter Savings', 'float', 0.0),
+
+    # Value performance metrics
+    Column('best_speed_dollar', 'Best Speed/$', 'float', 0.0),
+    Column('normalized_speed_dollar', 'Normalized Speed/$', 'float', 0.0),
+    Column('best_seat_speed_dollar', 'Best Seat Speed/$', 'float', 0.0),
+    Column('best_range_dollar', 'Best Range/$', 'float', 0.0),
+    Column('normalized_range_dollar', 'Normalized Range/$', 'float', 0.0),
+    Column('best_seat_range_dollar', 'Best Seat Range/$', 'float', 0.0),
+    Column('best_performance_dollar', 'Best Performance/$', 'float', 0.0),
+    Column('normalized_performance_dollar', 'Normalized Performance/$', 'float', 0.0),
+    Column('best_seat_performance_dollar', 'Best Seat Performance/$', 'float', 0.0),
+    Column('best_efficiency_dollar', 'Best Efficiency/$', 'float', 0.0),
+    Column('normalized_efficiency_dollar', 'Normalized Effieciency/$', 'float', 0.0),  # Header typo is the sheet's
+    Column('best_seat_efficiency_dollar', 'Best Seat Efficiency/$', 'float', 0.0),
+    Column('best_all_around_dollar', 'Best All Around/$', 'float', 0.0),
+    Column('best_seat_all_around_dollar', 'Best Seat All Around/$', 'float', 0.0),
+
+    # Cost per metrics
+    Column('hourly_cost_per_seat', 'Hourly Cost/Seat', 'float', 0.0),
+    Column('cost_per_mile', 'Cost/Mile', 'float', 0.0),
+    Column('cost_per_seat_mile', 'Cost/Seat Mile', 'float', 0.0),
+    Column('hourly_variable_cost', 'Hourly Variable Cost', 'float', 0.0),
+    Column('variable_cost_per_seat', 'Variable Cost/Seat', 'float', 0.0),
+    Column('variable_cost_per_mile', 'Variable Cost/Mile', 'float', 0.0),
+    Column('variable_cost_per_seat_mile', 'Variable Cost/Seat Mile', 'float', 0.0),
+    Column('BF', 'Best All Around/$', 'float', 0.0)
+)
+
+# Fields every aircraft needs for its mandatory performance profile
+PERFORMANCE_PROFILE_METRICS = (
+    'price', 'range', 'speed', 'passengers', 'year',
+    'total_hourly_cost', 'runway_length', 'max_altitude',
+    'cabin_volume', 'baggage_volume', 'depreciation_rate',
+    'best_speed_dollar', 'best_range_dollar', 'best_performance_dollar',
+    'best_efficiency_dollar', 'best_all_around_dollar'
+)
+
+
+def ingest_aircraft_sheet(df: 'pd.DataFrame') -> SheetIngest:
+    """
+    Clean the aircraft sheet against AIRCRAFT_SHEET_SCHEMA. Rows with an incomplete performance profile
+    are marked invalid (see .skipped); valid rows are numbered 1..N in the id column.
+    """
+    ingest = SheetIngest(df, AIRCRAFT_SHEET_SCHEMA, PERFORMANCE_PROFILE_METRICS)
+    ingest.columns['id'][ingest.valid] = np.arange(1, int(ingest.valid.sum()) + 1)
+    return ingest
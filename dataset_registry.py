@@ -0,0 +1,192 @@
+"""
+Hot-Reloadable Dataset Registry for Jet Finder
+Builds a dataset from its source file off the request path and swaps it in atomically behind a
+version number. Requests pin the version they started with; caches derived from a dataset live on
+that dataset (or are keyed by its fingerprint), so a swap invalidates them without any downtime.
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetVersion:
+    """One loaded version of a dataset (never modified after the swap) plus the caches derived from it"""
+
+    def __init__(self, number: int, data: Any, fingerprint: str):
+        self.number = number
+        self.data = data
+        self.fingerprint = fingerprint
+        self.loaded_at = datetime.now()
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """Value built once per dataset version (match features, medians, indexes, ...)"""
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._derived[name] = build()
+        return value
+
+
+def source_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the source file, or None when it is missing"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DatasetRegistry:
+    """
+    Current version of one dataset, reloaded when its source file changes or on demand.
+    build() returns the dataset (raising on failure) and fingerprint(data) its content hash; a reload
+    whose content matches the current version keeps that version. fallback() supplies an empty
+    version 0 when the very first load fails, so the app starts and picks up a fixed source later.
+    """
+
+    def __init__(self, name: str, build: Callable[[], Any], fingerprint: Callable[[Any], str],
+                 source_path: Optional[str] = None, poll_interval: float = 5.0,
+                 fallback: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self._fallback = fallback
+        self.source_path = source_path
+        self.poll_interval = poll_interval
+        self._build = build
+        self._fingerprint = fingerprint
+        self._current: Optional[DatasetVersion] = None
+        self._reload_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._first_load_lock = threading.Lock()
+        self._reloading: Optional[threading.Thread] = None
+        self._source_stamp: Optional[Tuple[int, int]] = None  # Source state of the last load attempt
+        self._next_poll = 0.0
+        self._listeners: List[Callable[[DatasetVersion, Optional[DatasetVersion]], None]] = []
+        self.last_error: Optional[str] = None
+
+    def current(self) -> DatasetVersion:
+        """The live dataset version (loaded synchronously on first use)"""
+        current = self._current
+        if current is None:
+            with self._first_load_lock:
+                current = self._current or self.reload()
+        return current
+
+    def on_swap(self, listener: Callable[[DatasetVersion, Optional[DatasetVersion]], None]):
+        """Call listener(new, old) after each swap (e.g. to clear caches keyed by query only)"""
+        self._listeners.append(listener)
+
+    def reload(self, force: bool = False) -> DatasetVersion:
+        """
+        Build the dataset from its source and swap it in. On failure the current version stays live
+        (a failed first load installs the fallback, or re-raises when there is none).
+        """
+        with self._reload_lock:
+            previous = self._current
+            self._source_stamp = source_stamp(self.source_path)
+            try:
+                data = self._build()
+                fingerprint = self._fingerprint(data)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if previous is None:
+                    if self._fallback is None:
+                        raise
+                    logger.error(f"Loading {self.name} failed, serving an empty dataset: {e}")
+                    self._current = DatasetVersion(0, self._fallback(), '')
+                    return self._current
+                logger.error(f"Keeping {self.name} v{previous.number}: reload failed: {e}")
+                return previous
+            self.last_error = None
+
+            if previous is not None and fingerprint == previous.fingerprint and not force:
+                return previous
+            number = previous.number + 1 if previous is not None else 1
+            current = DatasetVersion(number, data, fingerprint)
+            # Readers see either the old or the new version, never a partially built one
+            self._current = current
+            logger.info(f"Loaded {self.name} v{number} ({fingerprint[:12]})")
+
+        for listener in self._listeners:
+            try:
+                listener(current, previous)
+            except Exception as e:
+                logger.error(f"{self.name} swap listener failed: {e}")
+        return current
+
+    def reload_in_background(self, force: bool = False) -> bool:
+        """Start a reload on a worker thread; False if one is already running"""
+        with self._thread_lock:
+            if self._reloading is not None and self._reloading.is_alive():
+                return False
+            self._reloading = threading.Thread(target=self._background_reload, args=(force,),
+                                               name=f"{self.name}-reload", daemon=True)
+            self._reloading.start()
+        return True
+
+    def _background_reload(self, force: bool):
+        try:
+            self.reload(force=force)
+        except Exception as e:
+            logger.error(f"{self.name} reload failed: {e}")
+
+    def poll(self) -> bool:
+        """
+        Cheap change check for the request path: at most once per poll_interval, stat the source and
+        start a background reload if it changed. Returns True when a reload was started.
+        """
+        now = time.monotonic()
+        if self.source_path is None or now < self._next_poll:
+            return False
+        self._next_poll = now + self.poll_interval
+        if self._current is None or source_stamp(self.source_path) == self._source_stamp:
+            return False
+        return self.reload_in_background()
+
+    def status(self) -> Dict[str, Any]:
+        """Version details for admin endpoints"""
+        current = self._current
+        return {
+            'name': self.name,
+            'version': current.number if current else None,
+            'fingerprint': current.fingerprint if current else None,
+            'loaded_at': current.loaded_at.isoformat() if current else None,
+            'source_path': self.source_path,
+            'reloading': bool(self._reloading is not None and self._reloading.is_alive()),
+            'last_error': self.last_error
+        }
+
+
+def replace_source_file(new_path: str, source_path: str, backup: bool = True) -> Optional[str]:
+    """
+    Install new_path as the dataset source with an atomic rename, so a reload (or a worker polling the
+    file) never reads a half-copied CSV. Returns the backup path of the previous source, if one was made.
+    """
+    directory = os.path.dirname(os.path.abspath(source_path))
+    backup_path = None
+    if backup and os.path.exists(source_path):
+        backup_path = f"{source_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        shutil.copy2(source_path, backup_path)
+    scratch = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', suffix='.csv', delete=False)
+    scratch.close()
+    try:
+        shutil.copyfile(new_path, scratch.name)
+        os.replace(scratch.name, source_path)
+    except OSError:
+        if os.path.exists(scratch.name):
+            os.remove(scratch.name)
+        raise
+    return backup_path
@@ -0,0 +1,290 @@
+"""
+Compiled CSV Snapshots for Jet Finder
+Parses a CSV sheet once into typed NumPy column files keyed by the sheet's content hash, so loaders
+(and every gunicorn worker) memory-map the compiled columns instead of reparsing the CSV on startup.
+Snapshots are rebuilt automatically when the CSV content or a record builder changes.
+"""
+
+import os
+import json
+import shutil
+import marshal
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable
+
+if TYPE_CHECKING:
+    import pandas as pd  # Imported on the first frame() so memory-mapped records load without pandas
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Where compiled snapshots live (one directory per CSV content hash)
+DEFAULT_SNAPSHOT_DIR = os.environ.get('AIRCRAFT_SNAPSHOT_DIR', os.path.join('instance', 'snapshots'))
+
+_MANIFEST = 'manifest.json'
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def builder_fingerprint(build: Callable, version: str = '') -> str:
+    """Identify a record builder by its compiled code (nested helpers included) and an optional version"""
+    code = getattr(build, '__code__', None)
+    payload = marshal.dumps(code) if code is not None else repr(build).encode('utf-8')
+    return hashlib.sha1(payload + version.encode('utf-8')).hexdigest()[:16]
+
+
+def _encode_column(values: np.ndarray):
+    """
+    Typed array for a column plus its missing-value mask (None when nothing is missing).
+    Numeric and bool columns are stored as-is; text columns as fixed-width unicode.
+    Returns None for columns that cannot be stored without pickling.
+    """
+    if values.dtype.kind in 'biuf':
+        return values, None
+    missing = np.array([value is None or (isinstance(value, float) and np.isnan(value)) for value in values],
+                       dtype=bool)
+    present = [value for value, is_missing in zip(values, missing) if not is_missing]
+    if not all(isinstance(value, str) for value in present):
+        return None
+    text = np.array(['' if is_missing else value for value, is_missing in zip(values, missing)], dtype=str)
+    if text.dtype.kind != 'U':
+        text = text.astype('U1')
+    return text, (missing if missing.any() else None)
+
+
+def _record_column(values: List[Any]):
+    """Typed array for one key of a record table, or None if its values mix types"""
+    kinds = {type(value) for value in values}
+    if kinds <= {int}:
+        return np.array(values, dtype=np.int64)
+    if kinds <= {float}:
+        return np.array(values, dtype=np.float64)
+    if kinds <= {str}:
+        return np.array(values, dtype=str) if values else np.array([], dtype='U1')
+    return None
+
+
+class CsvSnapshot:
+    """
+    Compiled, content-addressed form of one CSV sheet.
+    frame() is the sheet as pd.read_csv returns it; records() returns a derived list of flat dicts built
+    once per CSV content by a builder function and stored alongside the sheet.
+    """
+
+    def __init__(self, csv_path: str, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, read_csv_kwargs=None,
+                 digest: Optional[str] = None):
+        self.csv_path = csv_path
+        self.snapshot_dir = snapshot_dir
+        self.read_csv_kwargs = dict(read_csv_kwargs or {})
+        self.digest = digest or file_digest(csv_path)
+        # <csv name>-<format and read options>-<content hash>; older contents share the prefix
+        stem = ''.join(ch if ch.isalnum() else '_' for ch in os.path.splitext(os.path.basename(csv_path))[0])
+        options = json.dumps(self.read_csv_kwargs, sort_keys=True, default=str)
+        layout = hashlib.sha1(f"{SNAPSHOT_FORMAT_VERSION}:{options}".encode('utf-8')).hexdigest()[:8]
+        self.prefix = f"{stem}-{layout}-"
+        self.path = os.path.join(snapshot_dir, self.prefix + self.digest[:16])
+        self._lock = threading.Lock()
+        self._frame: Optional['pd.DataFrame'] = None
+
+    # ===== Storage =====
+
+    def _manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, _MANIFEST)) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {'tables': {}}
+
+    def _load_table(self, name: str) -> Optional[Dict[str, Any]]:
+        """{'columns': [...], 'arrays': {column: memmapped array}, 'missing': {...}, 'meta': {...}} or None"""
+        table = self._manifest()['tables'].get(name)
+        if table is None:
+            return None
+        try:
+            arrays, missing = {}, {}
+            for i, column in enumerate(table['columns']):
+                arrays[column] = np.load(os.path.join(self.path, f"{name}.{i}.npy"), mmap_mode='r')
+                if column in table['missing']:
+                    missing[column] = np.load(os.path.join(self.path, f"{name}.{i}.missing.npy"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable snapshot table {name} in {self.path}: {e}")
+            return None
+        return {'columns': table['columns'], 'arrays': arrays, 'missing': missing, 'meta': table.get('meta', {})}
+
+    def _store_table(self, name: str, columns: List[str], arrays: List[np.ndarray],
+                     missing: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        """
+        Write a table next to the existing ones. Files are written to a scratch directory and moved in
+        with atomic renames, so a concurrently starting worker never reads a half-written snapshot.
+        """
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        scratch = tempfile.mkdtemp(prefix='.building-', dir=self.snapshot_dir)
+        try:
+            if os.path.isdir(self.path):
+                for entry in os.listdir(self.path):
+                    shutil.copy2(os.path.join(self.path, entry), scratch)
+            manifest = self._manifest()
+            for i, (column, values) in enumerate(zip(columns, arrays)):
+                np.save(os.path.join(scratch, f"{name}.{i}.npy"), values, allow_pickle=False)
+                if column in missing:
+                    np.save(os.path.join(scratch, f"{name}.{i}.missing.npy"), missing[column], allow_pickle=False)
+            manifest['csv_path'] = self.csv_path
+            manifest['csv_sha256'] = self.digest
+            manifest['tables'][name] = {'columns': columns, 'missing': sorted(missing), 'meta': meta}
+            with open(os.path.join(scratch, _MANIFEST), 'w') as handle:
+                json.dump(manifest, handle)
+
+            retired = None
+            if os.path.isdir(self.path):
+                retired = tempfile.mkdtemp(prefix='.retired-', dir=self.snapshot_dir)
+                os.rmdir(retired)
+                os.replace(self.path, retired)
+            os.replace(scratch, self.path)
+            if retired:
+                shutil.rmtree(retired, ignore_errors=True)
+        except OSError:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+        self._remove_stale_snapshots()
+
+    def _remove_stale_snapshots(self):
+        """Drop snapshots of older contents of the same CSV"""
+        for entry in os.listdir(self.snapshot_dir):
+            if entry.startswith(self.prefix) and entry != os.path.basename(self.path):
+                shutil.rmtree(os.path.join(self.snapshot_dir, entry), ignore_errors=True)
+
+    # ===== Tables =====
+
+    def frame(self, copy: bool = True) -> 'pd.DataFrame':
+        """
+        The sheet as pd.read_csv(csv_path) would return it: a fresh copy the caller may modify, or with
+        copy=False a shallow frame whose numeric columns stay on the memory-mapped snapshot (shared
+        by every worker). Shallow frames may have columns replaced but not written in place.
+        """
+        with self._lock:
+            if self._frame is None:
+                self._frame = self._compiled_frame()
+            return self._frame.copy(deep=copy)
+
+    def _compiled_frame(self) -> 'pd.DataFrame':
+        import pandas as pd
+        table = self._load_table('sheet')
+        if table is not None:
+            data = {}
+            for column in table['columns']:
+                values = table['arrays'][column]
+                if column in table['missing'] or values.dtype.kind == 'U':
+                    values = values.astype(object)
+                    if column in table['missing']:
+                        values[table['missing'][column]] = np.nan
+                data[column] = pd.Series(values, copy=False)
+            return pd.DataFrame(data, columns=table['columns'], copy=False)
+
+        df = pd.read_csv(self.csv_path, **self.read_csv_kwargs)
+        columns, arrays, missing = [], [], {}
+        for column in df.columns:
+            encoded = _encode_column(df[column].to_numpy())
+            if encoded is None or not isinstance(column, str):
+                logger.warning(f"Not snapshotting {self.csv_path}: column {column!r} is not plain text or numeric")
+                return df
+            values, column_missing = encoded
+            columns.append(column)
+            arrays.append(values)
+            if column_missing is not None:
+                missing[column] = column_missing
+        try:
+            self._store_table('sheet', columns, arrays, missing, {'rows': len(df)})
+        except OSError as e:
+            logger.warning(f"Could not write snapshot for {self.csv_path}: {e}")
+        return df
+
+    def records(self, name: str, build: Callable[['pd.DataFrame'], List[Dict[str, Any]]],
+                version: str = '') -> List[Dict[str, Any]]:
+        """
+        Flat records derived from the sheet by build(frame), compiled once per CSV content and builder.
+        Every record must have the same keys with int, float or str values; otherwise the records are
+        returned without being snapshotted.
+        """
+        columns = self.record_columns(name, build, version)
+        if columns is None:
+            return []
+        keys = list(columns)
+        values = [column.tolist() if isinstance(column, np.ndarray) else column for column in columns.values()]
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
+    def record_columns(self, name: str, build: Callable[[Any], List[Dict[str, Any]]],
+                       version: str = '', source: Optional[Callable[[], Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Same data as records(), column by column: {key: memory-mapped array} when compiled, or
+        {key: list} when the records cannot be snapshotted. None when the builder returns no records.
+        source() supplies the builder's input for files that are not CSV sheets (default: frame()).
+        """
+        table_name = f"records-{name}"
+        fingerprint = builder_fingerprint(build, version)
+        table = self._load_table(table_name)
+        if table is not None and table['meta'].get('builder') == fingerprint:
+            if not table['columns']:
+                return None
+            return {column: table['arrays'][column] for column in table['columns']}
+
+        records = build(source() if source is not None else self.frame())
+        if not records:
+            return None
+        keys = list(records[0])
+        as_lists = {key: [record.get(key) for record in records] for key in keys}
+        if any(list(record) != keys for record in records):
+            logger.warning(f"Not snapshotting {name} records: records have different keys")
+            return {key: [record.get(key) for record in records] for key in
+                    dict.fromkeys(key for record in records for key in record)}
+        arrays = []
+        for key in keys:
+            column = _record_column(as_lists[key])
+            if column is None:
+                logger.warning(f"Not snapshotting {name} records: {key!r} has mixed value types")
+                return as_lists
+            arrays.append(column)
+        try:
+            self._store_table(table_name, keys, arrays, {}, {'builder': fingerprint, 'rows': len(records)})
+        except OSError as e:
+            logger.warning(f"Could not write {name} records snapshot: {e}")
+        return dict(zip(keys, arrays))
+
+
+_SNAPSHOTS: Dict[tuple, CsvSnapshot] = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def open_csv_snapshot(csv_path: str, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, **read_csv_kwargs) -> CsvSnapshot:
+    """
+    Snapshot of the CSV's current contents, shared by every loader in the process.
+    The file is re-hashed on each call, so a changed CSV gets a new snapshot.
+    """
+    digest = file_digest(csv_path)
+    key = (os.path.abspath(csv_path), os.path.abspath(snapshot_dir), digest,
+           json.dumps(read_csv_kwargs, sort_keys=True, default=str))
+    with _SNAPSHOTS_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is None:
+            # Forget snapshots of older contents of this file
+            for stale in [k for k in _SNAPSHOTS if k[0] == key[0] and k[2] != digest]:
+                del _SNAPSHOTS[stale]
+            snapshot = _SNAPSHOTS[key] = CsvSnapshot(csv_path, snapshot_dir, read_csv_kwargs, digest)
+        return snapshot
+
+
+def read_csv_snapshot(csv_path: str, copy: bool = True, **read_csv_kwargs) -> 'pd.DataFrame':
+    """Drop-in for pd.read_csv(csv_path, ...) served from the compiled snapshot (see CsvSnapshot.frame)"""
+    return open_csv_snapshot(csv_path, **read_csv_kwargs).frame(copy=copy)
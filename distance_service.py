@@ -0,0 +1,73 @@
+"""
+Great-Circle Distance Service for Jet Finder
+Airport-to-airport distances in nautical miles: IATA/ICAO codes resolve through the airport search
+index, distances are haversine over the airport table's coordinate arrays (vectorized for batches of
+routes), and pair results are memoized in a bounded LRU.
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Callable
+
+from airport_data import AirportTable, get_airport_table, haversine_nm
+from score_cache import ScoreCache
+
+
+class DistanceService:
+    """Airport pair distances over the shared airport table, with an LRU of computed pairs"""
+
+    def __init__(self, table: Callable[[], AirportTable] = get_airport_table, max_entries: int = 8192):
+        self._table = table
+        self.cache = ScoreCache(max_entries=max_entries)
+
+    def resolve(self, code: str) -> Optional[int]:
+        """Airport table row of an IATA or ICAO code, or None"""
+        return self._table().search_index.row_for_code(code)
+
+    def distances(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Distance in NM of each (departure, arrival) code pair; NaN where a code is unknown"""
+        table = self._table()
+        index = table.search_index
+        result = np.full(len(pairs), np.nan)
+        misses: List[Tuple[int, str, int, int]] = []
+        for position, (departure, arrival) in enumerate(pairs):
+            first, second = index.row_for_code(departure), index.row_for_code(arrival)
+            if first is None or second is None:
+                continue
+            # Distances are symmetric: one entry per unordered pair
+            first, second = min(first, second), max(first, second)
+            key = f'{first}:{second}'
+            cached = self.cache.get(key)
+            if cached is None:
+                misses.append((position, key, first, second))
+            else:
+                result[position] = cached
+
+        if misses:
+            firsts = np.array([miss[2] for miss in misses], dtype=np.intp)
+            seconds = np.array([miss[3] for miss in misses], dtype=np.intp)
+            computed = haversine_nm(table.lat[firsts], table.lon[firsts], table.lat[seconds], table.lon[seconds])
+            for (position, key, _, _), distance in zip(misses, computed.tolist()):
+                result[position] = distance
+                self.cache.put(key, distance)
+        return result
+
+    def distance_nm(self, departure: str, arrival: str) -> Optional[float]:
+        """Distance in NM between two airports, or None when either code is unknown"""
+        distance = self.distances([(departure, arrival)])[0]
+        return None if np.isnan(distance) else float(distance)
+
+    def route(self, codes: Sequence[str]) -> Dict[str, Any]:
+        """Legs and total distance of a multi-leg route through codes (in order)"""
+        pairs = list(zip(codes, codes[1:]))
+        distances = self.distances(pairs).tolist()
+        legs = [{'from': departure, 'to': arrival, 'distance_nm': None if np.isnan(distance) else round(distance, 1)}
+                for (departure, arrival), distance in zip(pairs, distances)]
+        return {
+            'legs': legs,
+            'total_distance_nm': round(sum(distance for distance in distances if not np.isnan(distance)), 1),
+            'unknown_airports': [code for code in dict.fromkeys(codes) if self.resolve(code) is None]
+        }
+
+
+# Process-wide distance service over the shared airport table
+DISTANCE_SERVICE = DistanceService()
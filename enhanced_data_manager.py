@@ -1,172 +1,218 @@
 """
 Enhanced Aircraft Data Manager for Marketplace
 Handles CSV data as live marketplace listings with advanced filtering
-Built for scale and performance like a Google product
+Built for scale and performance like a Google product: listings are served from the shared aircraft
+catalog (aircraft_catalog) rather than a DataFrame of its own
 """
 
-import pandas as pd
-import numpy as np
-import json
 import os
-from typing import Dict, List, Any, Optional, Union, cast
-from pandas import Series, DataFrame
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
 import logging
+import numpy as np
+from typing import Dict, List, Any, Optional
+from aircraft_catalog import (AircraftCatalog, CatalogHandle, CatalogQuery, Between, OneOf, Contains, Order,
+                              AIRCRAFT_CSV_PATH)
+from csv_ingest import AIRCRAFT_SHEET_SCHEMA
+from market_cube import MarketCube
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Listing fields this manager derives from catalog columns (defined once per catalog version)
+CATEGORY_BY_TYPE = {'Piston': 'piston', 'Turboprop': 'turboprop', 'Business Jet': 'jet'}
+
+
+def _size_categories(passengers: np.ndarray) -> List[str]:
+    return ['light' if np.isnan(count) or count <= 4 else
+            'mid' if count <= 8 else
+            'super-mid' if count <= 12 else 'heavy'
+            for count in passengers.tolist()]
+
+
+def _define_listing_columns(catalog: AircraftCatalog):
+    number = catalog.store.column
+    catalog.define('listing.category', lambda c: [CATEGORY_BY_TYPE.get(value, 'unknown')
+                                                  for value in c.column('category')])
+    catalog.define('listing.size_category', lambda c: _size_categories(number('passengers')))
+    # Unknown years read as the sheet's full production span
+    catalog.define('listing.lowest_year', lambda c: np.where(number('lowest_year') > 0, number('lowest_year'), 1980))
+    catalog.define('listing.highest_year', lambda c: np.where(number('highest_year') > 0, number('highest_year'), 2024))
+    # Efficiency metrics (a zero divisor counts as 1)
+    catalog.define('listing.cost_per_nm', lambda c: number('price') / np.where(number('range') == 0, 1, number('range')))
+    catalog.define('listing.cost_per_passenger',
+                   lambda c: number('price') / np.where(number('passengers') == 0, 1, number('passengers')))
+    catalog.define('listing.relevance', lambda c: (
+        number('speed') * 0.3 + number('range') * 0.3 + number('passengers') * 10 +
+        (2024 - c.column('listing.lowest_year')) * 0.1
+    ))
+    # Nearest neighbours table (see get_similar_aircraft), built on the first similar-aircraft lookup
+    catalog.define('listing.similar', _build_similar_table)
+
+
+# Similarity weights: category match, price within 50% of the base price, passengers within 2,
+# range within 500 NM, manufacturer match
+PRICE_TOLERANCE = 0.5
+PASSENGER_TOLERANCE = 2
+RANGE_TOLERANCE = 500
+# Neighbours kept per aircraft in the similarity table (larger limits are scored on demand)
+SIMILAR_NEIGHBOURS = 12
+SIMILARITY_BLOCK_ROWS = 256
+
+
+def _similarity_scores(catalog: AircraftCatalog, rows: np.ndarray) -> np.ndarray:
+    """Similarity of each aircraft in rows (one matrix row each) to every aircraft in the catalog"""
+    price = catalog.store.column('price')
+    passengers = catalog.store.column('passengers')
+    range_nm = catalog.store.column('range')
+    category = catalog.encoded('listing.category').codes
+    manufacturer = catalog.encoded('manufacturer').codes
+    base = rows[:, None]
+    return (
+        (category == category[base]) * 30.0 +
+        (np.abs(price - price[base]) / np.maximum(price[base], 1) <= PRICE_TOLERANCE) * 25.0 +
+        (np.abs(passengers - passengers[base]) <= PASSENGER_TOLERANCE) * 20.0 +
+        (np.abs(range_nm - range_nm[base]) <= RANGE_TOLERANCE) * 15.0 +
+        (manufacturer == manufacturer[base]) * 10.0
+    )
+
+
+def _nearest_rows(catalog: AircraftCatalog, rows: np.ndarray, limit: int) -> np.ndarray:
+    """The limit most similar other aircraft of each row, most similar first (ties in catalog order)"""
+    similarity = _similarity_scores(catalog, rows)
+    # The base aircraft itself sorts last
+    similarity[np.arange(len(rows)), rows] = -np.inf
+    return np.argsort(-similarity, axis=1, kind='stable')[:, :min(limit, len(catalog) - 1)]
+
+
+def _build_similar_table(catalog: AircraftCatalog) -> np.ndarray:
+    """Top SIMILAR_NEIGHBOURS table (one row per aircraft), scored a block of aircraft at a time"""
+    size = len(catalog)
+    blocks = [_nearest_rows(catalog, np.arange(start, min(start + SIMILARITY_BLOCK_ROWS, size)), SIMILAR_NEIGHBOURS)
+              for start in range(0, size, SIMILARITY_BLOCK_ROWS)]
+    table = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.intp)
+    table.setflags(write=False)
+    return table
+
+
+def _similar_rows(catalog: AircraftCatalog, row: int, limit: int) -> np.ndarray:
+    if limit <= SIMILAR_NEIGHBOURS:
+        return catalog.column('listing.similar')[row][:max(limit, 0)]
+    return _nearest_rows(catalog, np.array([row]), limit)[0]
+
+
+# Market insights cube: listing groups by the filters it can answer from group aggregates alone
+MARKET_DIMENSIONS = ('listing.category', 'manufacturer', 'listing.size_category', 'multi_engine')
+MARKET_METRICS = ('price', 'range', 'speed')
+CUBE_FILTERS = {'category': 'listing.category', 'manufacturer': 'manufacturer', 'size_category': 'listing.size_category'}
+
+
+def _build_market_cube(catalog: AircraftCatalog) -> MarketCube:
+    return MarketCube(catalog, MARKET_DIMENSIONS, MARKET_METRICS)
+
+
+def _cube_selection(filters: Dict[str, Any]) -> Optional[Dict[str, tuple]]:
+    """The cube selection equivalent to filters, or None when an active filter is not a cube dimension"""
+    selection = {}
+    for name, value in filters.items():
+        if name == 'multi_engine':
+            if value is not None:
+                selection['multi_engine'] = ('Yes' if value == 'Yes' else 'No',)
+        elif name in CUBE_FILTERS:
+            if value:
+                selection[CUBE_FILTERS[name]] = _choices(value)
+        elif value:
+            return None
+    return selection
+
+
+# Columns search_aircraft filters, sorts and facets on, built and encoded when a catalog version is first served
+LISTING_COLUMNS = ('listing.category', 'listing.size_category', 'listing.lowest_year', 'listing.highest_year',
+                   'listing.cost_per_nm', 'listing.cost_per_passenger', 'listing.relevance')
+ENCODED_COLUMNS = ('listing.category', 'listing.size_category', 'manufacturer', 'multi_engine',
+                   'category', 'aircraft_name')
+
+
+def _prepare_listing_columns(catalog: AircraftCatalog):
+    _define_listing_columns(catalog)
+    for key in LISTING_COLUMNS:
+        catalog.column(key)
+    for key in ENCODED_COLUMNS:
+        catalog.encoded(key)
+    catalog.derived('listing.market_cube', _build_market_cube)
+
+
+# search_aircraft sort options -> catalog order
+SORT_ORDERS = {
+    'price_low': Order('price'),
+    'price_high': Order('price', descending=True),
+    'year_new': Order('listing.highest_year', descending=True),
+    'year_old': Order('listing.lowest_year'),
+    'range_high': Order('range', descending=True),
+    'speed_high': Order('speed', descending=True),
+    'passengers_high': Order('passengers', descending=True),
+    'efficiency': Order('listing.cost_per_nm'),
+}
+RELEVANCE_ORDER = Order('listing.relevance', descending=True)
+
+
+def _choices(value) -> tuple:
+    return tuple(value) if isinstance(value, list) else (value,)
+
 
 class EnhancedAircraftDataManager:
     """
     Advanced data manager for aircraft marketplace with live filtering capabilities
+    (marketplace listing adapter over the shared aircraft catalog)
     """
     
     def __init__(self):
-        self.aircraft_data_path = "Aircraft Data - Aircraft Data (1).csv"
+        self.aircraft_data_path = AIRCRAFT_CSV_PATH
         self.user_inputs_path = "Aircraft Data - User Inputs.csv"
-        self.aircraft_df = None
         self.user_preferences = None
         self.filters_cache = {}
+        self._catalog = CatalogHandle(self.aircraft_data_path)
+        self._prepared_catalog: Optional[AircraftCatalog] = None
         self.load_data()
     
+    @property
+    def catalog(self) -> AircraftCatalog:
+        """The live aircraft catalog (follows hot reloads of the sheet), with the listing columns built"""
+        return self._prepared(self._catalog.current())
+    
+    def _prepared(self, catalog: AircraftCatalog) -> AircraftCatalog:
+        if catalog is not self._prepared_catalog:
+            _prepare_listing_columns(catalog)
+            self._prepared_catalog = catalog
+        return catalog
+    
     def load_data(self):
-        """Load and preprocess aircraft data"""
+        """Load the aircraft catalog and the user preferences sheet"""
         try:
-            # Load aircraft data
-            self.aircraft_df = pd.read_csv(self.aircraft_data_path)
-            logger.info(f"Loaded {len(self.aircraft_df)} aircraft records")
+            logger.info(f"Loaded {len(self.catalog)} aircraft records")
             
             # Load user preferences if file exists
             if os.path.exists(self.user_inputs_path):
+                import pandas as pd
                 self.user_preferences = pd.read_csv(self.user_inputs_path)
                 logger.info("Loaded user preferences")
             else:
-                logger.warning("User preferences file not found, creating empty DataFrame")
-                self.user_preferences = pd.DataFrame()
-            
-            # Clean and enhance data
-            self._clean_and_enhance_data()
+                logger.warning("User preferences file not found")
+                self.user_preferences = None
             
         except Exception as e:
             logger.error(f"Error loading data: {e}")
-            # Create empty DataFrame as fallback
-            self.aircraft_df = pd.DataFrame()
-            self.user_preferences = pd.DataFrame()
-    
-    def _clean_and_enhance_data(self):
-        """Clean data and add computed fields for better filtering"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
-            logger.warning("No aircraft data to clean")
-            return
-        
-        # Convert price strings to numbers
-        if 'Average Price' in self.aircraft_df.columns:
-            price_series = cast(Series, pd.to_numeric(
-                self.aircraft_df['Average Price'].replace(r'[\$,]', '', regex=True), 
-                errors='coerce'
-            ))
-            self.aircraft_df['price_numeric'] = price_series.fillna(0)
-        else:
-            self.aircraft_df['price_numeric'] = 1000000  # Default price
-        
-        # Convert range to numeric
-        if 'Range(NM)' in self.aircraft_df.columns:
-            range_series = cast(Series, pd.to_numeric(self.aircraft_df['Range(NM)'], errors='coerce'))
-            self.aircraft_df['Range(NM)'] = range_series.fillna(0)
-        
-        # Convert speed to numeric  
-        if 'Speed(KTS)' in self.aircraft_df.columns:
-            speed_series = cast(Series, pd.to_numeric(self.aircraft_df['Speed(KTS)'], errors='coerce'))
-            self.aircraft_df['Speed(KTS)'] = speed_series.fillna(0)
-        
-        # Convert passengers to numeric
-        if 'Passengers' in self.aircraft_df.columns:
-            passengers_series = cast(Series, pd.to_numeric(self.aircraft_df['Passengers'], errors='coerce'))
-            self.aircraft_df['Passengers'] = passengers_series.fillna(0)
-        
-        # Convert year columns to numeric
-        if 'Lowest Year' in self.aircraft_df.columns:
-            lowest_year_series = cast(Series, pd.to_numeric(self.aircraft_df['Lowest Year'], errors='coerce'))
-            self.aircraft_df['Lowest Year'] = lowest_year_series.fillna(1980)
-        
-        if 'Highest Year' in self.aircraft_df.columns:
-            highest_year_series = cast(Series, pd.to_numeric(self.aircraft_df['Highest Year'], errors='coerce'))
-            self.aircraft_df['Highest Year'] = highest_year_series.fillna(2024)
-        
-        # Add aircraft categories based on type
-        if 'Type' in self.aircraft_df.columns:
-            def map_category(aircraft_type: Any) -> str:
-                mapping = {
-                    'Piston': 'piston',
-                    'Turboprop': 'turboprop', 
-                    'Business Jet': 'jet'
-                }
-                return mapping.get(aircraft_type, 'unknown')
-            self.aircraft_df['category'] = self.aircraft_df['Type'].apply(map_category)
-        else:
-            self.aircraft_df['category'] = 'unknown'
-        
-        # Add size categories based on passengers
-        def categorize_size(passengers):
-            if pd.isna(passengers) or passengers <= 4:
-                return 'light'
-            elif passengers <= 8:
-                return 'mid'
-            elif passengers <= 12:
-                return 'super-mid'
-            else:
-                return 'heavy'
-        
-        self.aircraft_df['size_category'] = self.aircraft_df['Passengers'].apply(categorize_size)
-        
-        # Calculate efficiency metrics (avoid division by zero)
-        range_safe = self.aircraft_df['Range(NM)'].replace(0, 1)  # Replace 0 with 1 to avoid division by zero
-        passengers_safe = self.aircraft_df['Passengers'].replace(0, 1)
-        
-        self.aircraft_df['cost_per_nm'] = self.aircraft_df['price_numeric'] / range_safe
-        self.aircraft_df['cost_per_passenger'] = self.aircraft_df['price_numeric'] / passengers_safe
-        
-        # Add unique listing IDs
-        self.aircraft_df['listing_id'] = range(len(self.aircraft_df))
-        
-        # Ensure all required columns exist with default values
-        required_columns = {
-            'Multi Engine': 'No',
-            'Max Operating Altitude (ft)': 0,
-            'Balanced Field Length (ft)': 0,
-            'Cabin Height (ft)': 0,
-            'Cabin Width (ft)': 0,
-            'Cabin Length (ft)': 0,
-            'Cabin Volume (cubic ft)': 0,
-            'Baggage Volume (cubic ft)': 0,
-            'Total Hourly Cost': 0
-        }
-        
-        for col, default_val in required_columns.items():
-            if col not in self.aircraft_df.columns:
-                self.aircraft_df[col] = default_val
-            else:
-                # Convert to numeric if it should be numeric
-                if col != 'Multi Engine':
-                    numeric_series = cast(Series, pd.to_numeric(self.aircraft_df[col], errors='coerce'))
-                    self.aircraft_df[col] = numeric_series.fillna(default_val)
-        
-        # Handle manufacturer column
-        if 'Manufacturer' not in self.aircraft_df.columns:
-            self.aircraft_df['Manufacturer'] = 'Unknown'
+            self.user_preferences = None
     
     def get_filter_options(self) -> Dict[str, List]:
         """Get all available filter options for the UI"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
+        catalog = self.catalog
+        if not len(catalog):
             return {'manufacturers': [], 'categories': [], 'size_categories': [], 'price_ranges': [], 'year_ranges': []}
             
         return {
-            'manufacturers': sorted(self.aircraft_df['Manufacturer'].dropna().unique().tolist()),
-            'categories': sorted(self.aircraft_df['category'].dropna().unique().tolist()),
-            'size_categories': sorted(self.aircraft_df['size_category'].dropna().unique().tolist()),
+            'manufacturers': sorted(catalog.facet('manufacturer')),
+            'categories': sorted(catalog.facet('listing.category')),
+            'size_categories': sorted(catalog.facet('listing.size_category')),
             'price_ranges': [
                 {'label': 'Under $500K', 'min': 0, 'max': 500000},
                 {'label': '$500K - $1M', 'min': 500000, 'max': 1000000},
@@ -184,6 +230,33 @@ class EnhancedAircraftDataManager:
             ]
         }
     
+    def _catalog_filters(self, filters: Dict[str, Any]) -> List[Any]:
+        """search_aircraft filters as catalog conditions"""
+        conditions = []
+        bounds = [
+            ('price_min', 'price', 'low', float), ('price_max', 'price', 'high', float),
+            ('min_range', 'range', 'low', float), ('max_range', 'range', 'high', float),
+            ('min_passengers', 'passengers', 'low', int), ('max_passengers', 'passengers', 'high', int),
+            ('min_speed', 'speed', 'low', float),
+            ('year_min', 'listing.highest_year', 'low', int), ('year_max', 'listing.lowest_year', 'high', int),
+        ]
+        for name, key, side, convert in bounds:
+            if filters.get(name):
+                conditions.append(Between(key, **{side: convert(filters[name])}))
+        
+        for name, key in (('category', 'listing.category'), ('manufacturer', 'manufacturer'),
+                          ('size_category', 'listing.size_category')):
+            if filters.get(name):
+                conditions.append(OneOf(key, _choices(filters[name])))
+        
+        if filters.get('multi_engine') is not None:
+            conditions.append(OneOf('multi_engine', ('Yes' if filters['multi_engine'] == 'Yes' else 'No',)))
+        
+        # Text search
+        if filters.get('search_text'):
+            conditions.append(Contains(('manufacturer', 'category', 'aircraft_name'), filters['search_text']))
+        return conditions
+    
     def search_aircraft(self, filters: Dict[str, Any], 
                        sort_by: str = 'relevance',
                        page: int = 1, 
@@ -191,287 +264,151 @@ class EnhancedAircraftDataManager:
         """
         Advanced search with multiple filters - CarGurus style
         """
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
+        catalog = self.catalog
+        if not len(catalog):
             return {'listings': [], 'total_results': 0, 'page': 1, 'per_page': per_page, 'total_pages': 0, 'filters_applied': filters, 'sort_by': sort_by}
-            
-        df: DataFrame = self.aircraft_df.copy()
-        
-        # Apply filters
-        if filters.get('price_min'):
-            df = cast(DataFrame, df[df['price_numeric'] >= float(filters['price_min'])])
-        
-        if filters.get('price_max'):
-            df = cast(DataFrame, df[df['price_numeric'] <= float(filters['price_max'])])
-        
-        if filters.get('min_range'):
-            df = cast(DataFrame, df[df['Range(NM)'] >= float(filters['min_range'])])
-        
-        if filters.get('max_range'):
-            df = cast(DataFrame, df[df['Range(NM)'] <= float(filters['max_range'])])
-        
-        if filters.get('min_passengers'):
-            df = cast(DataFrame, df[df['Passengers'] >= int(filters['min_passengers'])])
-        
-        if filters.get('max_passengers'):
-            df = cast(DataFrame, df[df['Passengers'] <= int(filters['max_passengers'])])
-        
-        if filters.get('min_speed'):
-            df = cast(DataFrame, df[df['Speed(KTS)'] >= float(filters['min_speed'])])
-        
-        if filters.get('category'):
-            if isinstance(filters['category'], list):
-                df = cast(DataFrame, df[df['category'].isin(filters['category'])])
-            else:
-                df = cast(DataFrame, df[df['category'] == filters['category']])
-        
-        if filters.get('manufacturer'):
-            if isinstance(filters['manufacturer'], list):
-                df = cast(DataFrame, df[df['Manufacturer'].isin(filters['manufacturer'])])
-            else:
-                df = cast(DataFrame, df[df['Manufacturer'] == filters['manufacturer']])
-        
-        if filters.get('size_category'):
-            if isinstance(filters['size_category'], list):
-                df = cast(DataFrame, df[df['size_category'].isin(filters['size_category'])])
-            else:
-                df = cast(DataFrame, df[df['size_category'] == filters['size_category']])
         
-        if filters.get('year_min'):
-            df = cast(DataFrame, df[df['Highest Year'] >= int(filters['year_min'])])
-        
-        if filters.get('year_max'):
-            df = cast(DataFrame, df[df['Lowest Year'] <= int(filters['year_max'])])
-        
-        if filters.get('multi_engine') is not None:
-            multi_engine_bool = filters['multi_engine'] == 'Yes'
-            df = cast(DataFrame, df[df['Multi Engine'] == ('Yes' if multi_engine_bool else 'No')])
-        
-        # Text search
-        if filters.get('search_text'):
-            search_text = filters['search_text'].lower()
-            text_mask = (
-                df['Manufacturer'].str.lower().str.contains(search_text, na=False) |
-                df['Type'].str.lower().str.contains(search_text, na=False) |
-                df.iloc[:, 0].str.lower().str.contains(search_text, na=False)  # Model name
-            )
-            df = cast(DataFrame, df[text_mask])
-        
-        # Sort results
-        df = cast(DataFrame, self._sort_results(df, sort_by))
-        
-        # Pagination
-        total_results = len(df)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_df = df.iloc[start_idx:end_idx]
-        
-        # Convert to listings format
-        listings = []
-        for _, row in paginated_df.iterrows():
-            listing = self._row_to_listing(row)
-            listings.append(listing)
+        result = catalog.query(CatalogQuery(
+            filters=self._catalog_filters(filters),
+            order=[SORT_ORDERS.get(sort_by, RELEVANCE_ORDER)],
+            page=page,
+            per_page=per_page
+        ))
         
         return {
-            'listings': listings,
-            'total_results': total_results,
+            'listings': [self._row_to_listing(catalog, row) for row in result.rows.tolist()],
+            'total_results': result.total,
             'page': page,
             'per_page': per_page,
-            'total_pages': (total_results + per_page - 1) // per_page,
+            'total_pages': result.total_pages,
             'filters_applied': filters,
             'sort_by': sort_by
         }
     
-    def _sort_results(self, df: pd.DataFrame, sort_by: str) -> pd.DataFrame:
-        """Sort search results"""
-        if sort_by == 'price_low':
-            return df.sort_values('price_numeric', ascending=True)
-        elif sort_by == 'price_high':
-            return df.sort_values('price_numeric', ascending=False)
-        elif sort_by == 'year_new':
-            return df.sort_values('Highest Year', ascending=False)
-        elif sort_by == 'year_old':
-            return df.sort_values('Lowest Year', ascending=True)
-        elif sort_by == 'range_high':
-            return df.sort_values('Range(NM)', ascending=False)
-        elif sort_by == 'speed_high':
-            return df.sort_values('Speed(KTS)', ascending=False)
-        elif sort_by == 'passengers_high':
-            return df.sort_values('Passengers', ascending=False)
-        elif sort_by == 'efficiency':
-            return df.sort_values('cost_per_nm', ascending=True)
-        else:  # relevance or default
-            # Sort by a combination of factors for relevance
-            df['relevance_score'] = (
-                df['Speed(KTS)'].fillna(0) * 0.3 +
-                df['Range(NM)'].fillna(0) * 0.3 +
-                df['Passengers'].fillna(0) * 10 +
-                (2024 - df['Lowest Year'].fillna(2024)) * 0.1
-            )
-            return df.sort_values('relevance_score', ascending=False)
-    
-    def _row_to_listing(self, row: pd.Series) -> Dict[str, Any]:
-        """Convert DataFrame row to listing dictionary"""
-        # Extract model name (first column)
-        model_name = str(row.iloc[0]) if not pd.isna(row.iloc[0]) else "Unknown Model"
-        
-        # Helper function to safely convert values
-        def safe_int(value: Any) -> int:
-            try:
-                return int(value) if not pd.isna(value) else 0
-            except (ValueError, TypeError):
-                return 0
+    def _row_to_listing(self, catalog: AircraftCatalog, row: int) -> Dict[str, Any]:
+        """Convert a catalog row to a listing dictionary"""
+        aircraft = catalog.aircraft[row]
+        model_name = aircraft['aircraft_name'] or "Unknown Model"
+        lowest_year = int(catalog.column('listing.lowest_year')[row])
+        highest_year = int(catalog.column('listing.highest_year')[row])
+        price = int(aircraft['price'])
         
-        def safe_float(value: Any) -> float:
-            try:
-                return float(value) if not pd.isna(value) else 0.0
-            except (ValueError, TypeError):
-                return 0.0
-        
-        def safe_str(value: Any, default: str = 'Unknown') -> str:
-            try:
-                return str(value) if not pd.isna(value) else default
-            except (ValueError, TypeError):
-                return default
-
         return {
-            'id': safe_int(row['listing_id']),
+            'id': row,
             'model': model_name,
-            'manufacturer': safe_str(row['Manufacturer']),
-            'type': safe_str(row['Type']),
-            'category': row['category'],
-            'size_category': row['size_category'],
-            'price': safe_int(row['price_numeric']),
-            'price_formatted': f"${safe_int(row['price_numeric']):,}" if safe_int(row['price_numeric']) > 0 else 'Price on Request',
-            'range': safe_int(row['Range(NM)']),
-            'speed': safe_int(row['Speed(KTS)']),
-            'passengers': safe_int(row['Passengers']),
-            'year_range': f"{safe_int(row['Lowest Year'])}-{safe_int(row['Highest Year'])}" if safe_int(row['Lowest Year']) > 0 else 'N/A',
-            'lowest_year': safe_int(row['Lowest Year']),
-            'highest_year': safe_int(row['Highest Year']),
-            'multi_engine': row['Multi Engine'] == 'Yes',
-            'max_altitude': safe_int(row['Max Operating Altitude (ft)']),
-            'runway_length': safe_int(row['Balanced Field Length (ft)']),
-            'cabin_height': safe_float(row['Cabin Height (ft)']),
-            'cabin_width': safe_float(row['Cabin Width (ft)']),
-            'cabin_length': safe_float(row['Cabin Length (ft)']),
-            'cabin_volume': safe_float(row['Cabin Volume (cubic ft)']),
-            'baggage_volume': safe_float(row['Baggage Volume (cubic ft)']),
-            'cost_per_nm': safe_float(row['cost_per_nm']),
-            'cost_per_passenger': safe_float(row['cost_per_passenger']),
-            'total_hourly_cost': safe_float(row['Total Hourly Cost']) if 'Total Hourly Cost' in row.index else 0.0,
+            'manufacturer': aircraft['manufacturer'],
+            'type': aircraft['category'],
+            'category': catalog.column('listing.category')[row],
+            'size_category': catalog.column('listing.size_category')[row],
+            'price': price,
+            'price_formatted': f"${price:,}" if price > 0 else 'Price on Request',
+            'range': int(aircraft['range']),
+            'speed': int(aircraft['speed']),
+            'passengers': int(aircraft['passengers']),
+            'year_range': f"{lowest_year}-{highest_year}" if lowest_year > 0 else 'N/A',
+            'lowest_year': lowest_year,
+            'highest_year': highest_year,
+            'multi_engine': aircraft['multi_engine'] == 'Yes',
+            'max_altitude': int(aircraft['max_altitude']),
+            'runway_length': int(aircraft['runway_length']),
+            'cabin_height': float(aircraft['cabin_height']),
+            'cabin_width': float(aircraft['cabin_width']),
+            'cabin_length': float(aircraft['cabin_length']),
+            'cabin_volume': float(aircraft['cabin_volume']),
+            'baggage_volume': float(aircraft['baggage_volume']),
+            'cost_per_nm': float(catalog.column('listing.cost_per_nm')[row]),
+            'cost_per_passenger': float(catalog.column('listing.cost_per_passenger')[row]),
+            'total_hourly_cost': float(aircraft['total_hourly_cost']),
             'image_url': f"/static/images/aircraft/{model_name.lower().replace(' ', '_')}.jpg",
-            'details_url': f"/aircraft/{row['listing_id']}",
-            'contact_url': f"/contact/{row['listing_id']}"
+            'details_url': f"/aircraft/{row}",
+            'contact_url': f"/contact/{row}"
         }
     
     def get_aircraft_details(self, listing_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed information for a specific aircraft"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
-            return None
-            
-        try:
-            row = self.aircraft_df[self.aircraft_df['listing_id'] == listing_id].iloc[0]
-            listing = self._row_to_listing(row)
-            
-            # Add additional details
-            all_columns = self.aircraft_df.columns.tolist()
-            for col in all_columns:
-                if col not in ['listing_id'] and not pd.isna(row[col]):
-                    key = col.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_')
-                    listing[f'spec_{key}'] = row[col]
-            
-            return listing
-            
-        except (IndexError, KeyError):
+        catalog = self.catalog
+        if not 0 <= listing_id < len(catalog):
             return None
+        
+        listing = self._row_to_listing(catalog, listing_id)
+        
+        # Add the sheet's columns as spec_<column> details
+        aircraft = catalog.aircraft[listing_id]
+        for column in AIRCRAFT_SHEET_SCHEMA:
+            if column.header is None:
+                continue
+            key = column.header.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_')
+            listing.setdefault(f'spec_{key}', aircraft[column.key])
+        
+        return listing
     
     def get_similar_aircraft(self, listing_id: int, limit: int = 6) -> List[Dict[str, Any]]:
         """Find similar aircraft based on specifications"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
-            return []
-            
-        try:
-            base_aircraft = self.aircraft_df[self.aircraft_df['listing_id'] == listing_id].iloc[0]
-            
-            # Calculate similarity scores
-            df = self.aircraft_df.copy()
-            df = df[df['listing_id'] != listing_id]  # Exclude the base aircraft
-            
-            # Similarity based on category, price range, passenger count, and range
-            price_tolerance = 0.5  # 50% price tolerance
-            passenger_tolerance = 2
-            range_tolerance = 500  # NM
-            
-            # Initialize similarity score
-            df['similarity_score'] = 0.0
-            
-            # Calculate each similarity component separately and sum them
-            # Category match (high weight)
-            category_score = (df['category'] == base_aircraft['category']).astype(float) * 30.0
-            
-            # Price similarity
-            price_diff = abs(df['price_numeric'] - base_aircraft['price_numeric']) / max(base_aircraft['price_numeric'], 1)
-            price_score = (price_diff <= price_tolerance).astype(float) * 25.0
-            
-            # Passenger similarity
-            passenger_diff = abs(df['Passengers'] - base_aircraft['Passengers'])
-            passenger_score = (passenger_diff <= passenger_tolerance).astype(float) * 20.0
-            
-            # Range similarity
-            range_diff = abs(df['Range(NM)'] - base_aircraft['Range(NM)'])
-            range_score = (range_diff <= range_tolerance).astype(float) * 15.0
-            
-            # Manufacturer match
-            manufacturer_score = (df['Manufacturer'] == base_aircraft['Manufacturer']).astype(float) * 10.0
-            
-            # Sum all similarity components
-            df['similarity_score'] = category_score + price_score + passenger_score + range_score + manufacturer_score
-            
-            # Sort by similarity and get top results
-            similar_df = df.nlargest(limit, 'similarity_score')  # type: ignore
-            
-            return [self._row_to_listing(row) for _, row in similar_df.iterrows()]
-            
-        except (IndexError, KeyError):
+        catalog = self.catalog
+        if not 0 <= listing_id < len(catalog):
             return []
+        return [self._row_to_listing(catalog, row) for row in _similar_rows(catalog, listing_id, limit).tolist()]
+    
+    def get_similar_listing_ids(self, listing_ids: List[int], limit: int = 6,
+                                catalog: Optional[AircraftCatalog] = None) -> Dict[int, List[int]]:
+        """
+        Ids (catalog rows) of the similar aircraft of each known listing id, most similar first, in the
+        live catalog or in the given catalog version
+        """
+        catalog = self.catalog if catalog is None else self._prepared(catalog)
+        return {listing_id: _similar_rows(catalog, listing_id, limit).tolist()
+                for listing_id in dict.fromkeys(listing_ids) if 0 <= listing_id < len(catalog)}
+    
+    def get_similar_aircraft_batch(self, listing_ids: List[int], limit: int = 6) -> Dict[int, List[Dict[str, Any]]]:
+        """Similar aircraft for each known listing id (e.g. every aircraft on a compare page)"""
+        catalog = self.catalog
+        return {listing_id: [self._row_to_listing(catalog, row) for row in rows]
+                for listing_id, rows in self.get_similar_listing_ids(listing_ids, limit).items()}
     
     def get_market_insights(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get market insights and statistics"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
+        catalog = self.catalog
+        if not len(catalog):
             return {'error': 'No aircraft data available'}
-            
-        df: DataFrame = self.aircraft_df.copy()
         
-        # Apply filters if provided
+        # Apply filters if provided (a filter that matches nothing reports on the whole market)
+        cube = catalog.derived('listing.market_cube', _build_market_cube)
+        market = cube.select()
         if filters:
-            search_result = self.search_aircraft(filters, per_page=10000)
-            if search_result['listings']:
-                filtered_ids = [listing['id'] for listing in search_result['listings']]
-                df = cast(DataFrame, df[df['listing_id'].isin(filtered_ids)])
+            selection = _cube_selection(filters)
+            if selection is not None:
+                # Only grouping dimensions selected: combine the matching groups
+                matching = cube.select(selection)
+            else:
+                rows = catalog.query(CatalogQuery(filters=self._catalog_filters(filters))).rows
+                matching = MarketCube(catalog, MARKET_DIMENSIONS, MARKET_METRICS, rows=rows).select()
+            if matching.total:
+                market = matching
         
-        if len(df) == 0:
-            return {'error': 'No aircraft match the specified criteria'}
+        price = market.stats('price')
+        range_stats = market.stats('range')
+        speed = market.stats('speed')
         
         insights = {
-            'total_aircraft': len(df),
+            'total_aircraft': market.total,
             'price_stats': {
-                'min': int(df['price_numeric'].min()),
-                'max': int(df['price_numeric'].max()),
-                'avg': int(df['price_numeric'].mean()),
-                'median': int(df['price_numeric'].median())
+                'min': int(price['min']),
+                'max': int(price['max']),
+                'avg': int(price['avg']),
+                'median': int(price['median'])
             },
-            'category_distribution': df['category'].value_counts().to_dict(),
-            'manufacturer_distribution': df['Manufacturer'].value_counts().head(10).to_dict(),
-            'size_distribution': df['size_category'].value_counts().to_dict(),
+            'category_distribution': market.distribution('listing.category'),
+            'manufacturer_distribution': dict(list(market.distribution('manufacturer').items())[:10]),
+            'size_distribution': market.distribution('listing.size_category'),
             'range_stats': {
-                'min': int(df['Range(NM)'].min()),
-                'max': int(df['Range(NM)'].max()),
-                'avg': int(df['Range(NM)'].mean())
+                'min': int(range_stats['min']),
+                'max': int(range_stats['max']),
+                'avg': int(range_stats['avg'])
             },
             'speed_stats': {
-                'min': int(df['Speed(KTS)'].min()),
-                'max': int(df['Speed(KTS)'].max()),
-                'avg': int(df['Speed(KTS)'].mean())
+                'min': int(speed['min']),
+                'max': int(speed['max']),
+                'avg': int(speed['avg'])
             }
         }
         
@@ -479,26 +416,26 @@ class EnhancedAircraftDataManager:
     
     def suggest_filters(self, partial_query: str) -> List[Dict[str, Any]]:
         """Suggest filters based on partial query - for autocomplete"""
-        if self.aircraft_df is None or len(self.aircraft_df) == 0:
+        catalog = self.catalog
+        if not len(catalog):
             return []
             
         suggestions = []
         partial_lower = partial_query.lower()
         
-        # Manufacturer suggestions
-        manufacturers = self.aircraft_df['Manufacturer'].dropna().unique()
-        for mfg in manufacturers:
+        # Manufacturer suggestions (in sheet order)
+        manufacturer_counts = catalog.facet('manufacturer')
+        for mfg in dict.fromkeys(catalog.column('manufacturer')):
             if partial_lower in mfg.lower():
                 suggestions.append({
                     'type': 'manufacturer',
                     'value': mfg,
                     'label': f"Manufacturer: {mfg}",
-                    'count': len(self.aircraft_df[self.aircraft_df['Manufacturer'] == mfg])
+                    'count': manufacturer_counts[mfg]
                 })
         
         # Model suggestions  
-        models = self.aircraft_df.iloc[:, 0].dropna().unique()
-        for model in models:
+        for model in dict.fromkeys(catalog.column('aircraft_name')):
             if partial_lower in str(model).lower():
                 suggestions.append({
                     'type': 'model',
@@ -511,4 +448,4 @@ class EnhancedAircraftDataManager:
 
 
 # Global instance
-enhanced_data_manager = EnhancedAircraftDataManager() 
\ No newline at end of file
+enhanced_data_manager = EnhancedAircraftDataManager()
@@ -0,0 +1,171 @@
+"""
+Compiled Hard-Filter Pipeline for Jet Finder
+Turns a user_inputs dict into a single filter plan and runs it against the fleet's sorted column
+indexes, so a multi-filter query only touches rows that survive the most selective filter
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+from scoring_engine import AircraftFleet
+
+
+# Hard requirement filters: user input key -> (aircraft metric, comparison)
+# 'min' keeps aircraft with metric >= input, 'max' keeps aircraft with metric <= input
+HARD_FILTERS = {
+    'budget': ('price', 'max'),
+    'range_requirement': ('range', 'min'),
+    'passengers': ('passengers', 'min'),
+    'lowest_year': ('year', 'min'),
+    'min_speed': ('speed', 'min'),
+    'min_altitude': ('max_altitude', 'min'),
+    'max_runway': ('runway_length', 'max'),
+    'min_cabin_volume': ('cabin_volume', 'min'),
+    'max_hourly_cost': ('total_hourly_cost', 'max'),
+}
+
+# Trips per year used to turn the hourly cost into an annual cost when no annual metric is given
+DEFAULT_YEARLY_TRIPS = 100
+
+
+class RangePredicate:
+    """metric * scale within [min_value, max_value]; either bound may be open (None)"""
+
+    __slots__ = ('key', 'min_value', 'max_value', 'min_exclusive', 'scale')
+
+    def __init__(self, key: str, min_value: Optional[float] = None, max_value: Optional[float] = None,
+                 min_exclusive: bool = False, scale: float = 1.0):
+        self.key = key
+        self.min_value = min_value
+        self.max_value = max_value
+        self.min_exclusive = min_exclusive
+        self.scale = scale
+
+    def span(self, sorted_values: np.ndarray) -> tuple:
+        """Positions [lo, hi) of matching values within an ascending, NaN-free array"""
+        if self.scale != 1:
+            sorted_values = sorted_values * self.scale
+        lo, hi = 0, len(sorted_values)
+        if self.min_value is not None:
+            lo = int(np.searchsorted(sorted_values, self.min_value, side='right' if self.min_exclusive else 'left'))
+        if self.max_value is not None:
+            hi = int(np.searchsorted(sorted_values, self.max_value, side='right'))
+        return lo, max(lo, hi)
+
+    def matches(self, values: np.ndarray) -> np.ndarray:
+        """Boolean mask of matching values (NaN never matches)"""
+        if self.scale != 1:
+            values = values * self.scale
+        mask = ~np.isnan(values)
+        if self.min_value is not None:
+            mask &= (values > self.min_value) if self.min_exclusive else (values >= self.min_value)
+        if self.max_value is not None:
+            mask &= values <= self.max_value
+        return mask
+
+
+class FilterPlan:
+    """A compiled conjunction of range predicates over fleet metrics"""
+
+    def __init__(self, predicates: List[RangePredicate], columns: Optional[Dict[str, np.ndarray]] = None):
+        self.predicates = predicates
+        # Per-request metric columns (e.g. mission recalculations) that replace indexed fleet columns
+        self.columns = columns or {}
+
+    def __bool__(self) -> bool:
+        return bool(self.predicates)
+
+    def execute(self, fleet: AircraftFleet, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Run the plan and return matching fleet rows in ascending order.
+
+        Indexed predicates are resolved to [lo, hi) spans of their sorted column with a binary search.
+        The narrowest span seeds the candidate rows; the other spans are checked through each
+        column's rank array, so only candidates are ever touched. Predicates over per-request
+        columns are applied last as plain masks.
+
+        Args:
+            fleet: Fleet to filter
+            rows: Optional pre-selected rows to restrict the result to
+        """
+        spans = []
+        direct = []
+        for predicate in self.predicates:
+            if predicate.key in self.columns or predicate.scale <= 0:
+                direct.append(predicate)
+                continue
+            order, sorted_values, rank, valid_count = fleet.sorted_index(predicate.key)
+            lo, hi = predicate.span(sorted_values[:valid_count])
+            spans.append((hi - lo, predicate.key, lo, hi))
+
+        if spans:
+            spans.sort(key=lambda span: span[0])
+            _, key, lo, hi = spans[0]
+            candidates = fleet.sorted_index(key)[0][lo:hi]
+            if rows is not None:
+                candidates = candidates[np.isin(candidates, rows)]
+            for _, key, lo, hi in spans[1:]:
+                if candidates.size == 0:
+                    break
+                positions = fleet.sorted_index(key)[2][candidates]
+                candidates = candidates[(positions >= lo) & (positions < hi)]
+            candidates = np.sort(candidates)
+        elif rows is not None:
+            candidates = np.sort(np.asarray(rows, dtype=np.intp))
+        else:
+            candidates = fleet.all_rows()
+
+        for predicate in direct:
+            values = self.columns[predicate.key] if predicate.key in self.columns else fleet.column(predicate.key)
+            candidates = candidates[predicate.matches(values[candidates])]
+        return candidates
+
+    def filter_records(self, fleet: AircraftFleet, records: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Run the plan over fleet records (default: the whole fleet), keeping their order"""
+        rows = None if records is None else fleet.rows_for(records)
+        return [fleet.records[row] for row in self.execute(fleet, rows)]
+
+
+def _threshold(value: Any) -> Optional[float]:
+    """Filter inputs are only applied when set (non-zero, non-empty)"""
+    if not value:
+        return None
+    return float(value)
+
+
+def compile_filters(user_inputs: Dict[str, Any],
+                    annual_cost_key: Optional[str] = None,
+                    exclude_unpriced: bool = False,
+                    columns: Optional[Dict[str, np.ndarray]] = None) -> FilterPlan:
+    """
+    Compile the hard requirement filters in user_inputs into a FilterPlan.
+
+    Args:
+        user_inputs: budget, range_requirement, passengers, lowest_year, min_speed, min_altitude,
+            max_runway, min_cabin_volume, max_annual_cost, max_hourly_cost (unset/0 = no filter)
+        annual_cost_key: Metric compared against max_annual_cost. When None the annual cost is
+            total_hourly_cost * user_inputs['yearly_trips'] (default 100)
+        exclude_unpriced: With a budget set, also drop aircraft without a price (price 0)
+        columns: Per-request {metric: fleet-aligned array} overriding fleet columns
+    """
+    predicates = []
+    for input_key, (metric_key, comparison) in HARD_FILTERS.items():
+        value = _threshold(user_inputs.get(input_key))
+        if value is None:
+            continue
+        if comparison == 'min':
+            predicates.append(RangePredicate(metric_key, min_value=value))
+        elif input_key == 'budget' and exclude_unpriced:
+            predicates.append(RangePredicate(metric_key, min_value=0, min_exclusive=True, max_value=value))
+        else:
+            predicates.append(RangePredicate(metric_key, max_value=value))
+
+    max_annual_cost = _threshold(user_inputs.get('max_annual_cost'))
+    if max_annual_cost is not None:
+        if annual_cost_key:
+            predicates.append(RangePredicate(annual_cost_key, max_value=max_annual_cost))
+        else:
+            yearly_trips = user_inputs.get('yearly_trips', DEFAULT_YEARLY_TRIPS)
+            predicates.append(RangePredicate('total_hourly_cost', max_value=max_annual_cost, scale=yearly_trips))
+
+    return FilterPlan(predicates, columns)
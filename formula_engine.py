@@ -0,0 +1,562 @@
+"""
+Spreadsheet Formula Engine for Jet Finder
+Compiles the derived-column equations from 'Aircraft Data Equations - Sheet1.csv' into vectorized
+NumPy expressions and recalculates them for the whole fleet from a 'User Inputs' row in one pass
+"""
+
+import re
+import csv
+import logging
+import numpy as np
+from typing import Dict, List, Any, Optional, Iterable, Callable, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EQUATIONS_CSV = 'Aircraft Data Equations - Sheet1.csv'
+USER_INPUTS_CSV = 'Aircraft Data - User Inputs.csv'
+USER_INPUTS_SHEET = 'User Inputs'
+
+# Spreadsheet row holding the per-aircraft formulas; other rows only appear inside column ranges
+FORMULA_ROW = 2
+
+# The formula row is the sheet's turboprop template (JET A, turboprop pilot pay). Rows of other
+# aircraft categories read their own user input in place of the template's:
+# {category: {template input header: category input header}}
+CATEGORY_INPUTS = {
+    'Piston': {'JET A Price': 'AVGAS Price', 'Turboprop Pilot Pay Subtration': 'Piston Pilot Pay Subtraction'},
+    'Business Jet': {'Turboprop Pilot Pay Subtration': 'Business Jet Pilot Pay Subtraction'},
+}
+
+# Record metrics a recompute at the default inputs must reproduce from the sheet, and the relative
+# tolerance for the sheet's rounded cells
+SHEET_CHECK_METRICS = ('adjusted_variable_cost', 'adjusted_annual_budget', 'multi_year_total_cost')
+SHEET_CHECK_TOLERANCE = 0.01
+
+# Spreadsheet header -> aircraft record key (see csv_ingest.AIRCRAFT_SHEET_SCHEMA)
+SPREADSHEET_RECORD_KEYS = {
+    'Lowest Year': 'lowest_year',
+    'Highest Year': 'highest_year',
+    'Min Crew Required': 'min_crew',
+    'Max Operating Altitude (ft)': 'max_altitude',
+    'Balanced Field Length (ft)': 'runway_length',
+    'Aircraft Height (ft)': 'aircraft_height',
+    'Wingspan (ft)': 'wingspan',
+    'Aircraft Length (ft)': 'aircraft_length',
+    'Aircraft Volume (cubic ft)': 'aircraft_volume',
+    'Cabin Height (ft)': 'cabin_height',
+    'Cabin Width (ft)': 'cabin_width',
+    'Cabin Length (ft)': 'cabin_length',
+    'Cabin Volume (cubic ft)': 'cabin_volume',
+    'Baggage Volume (cubic ft)': 'baggage_volume',
+    'Range(NM)': 'range',
+    'Speed(KTS)': 'speed',
+    'Passengers': 'passengers',
+    'Average Price': 'price',
+    'Depreciation Rate': 'depreciation_rate',
+    'Average Trip Time': 'average_trip_time',
+    '# of Hours': 'total_trip_time',
+    'Hourly Charter Rate': 'charter_rate',
+    'Total Fixed Cost': 'total_fixed_cost',
+    'Total Variable Cost': 'total_variable_cost',
+    'Adjusted Variable Cost': 'adjusted_variable_cost',
+    'Annual Budget': 'annual_budget',
+    'Adjusted Annual Budget': 'adjusted_annual_budget',
+    'Multi-Year Total Cost': 'multi_year_total_cost',
+    'MYTC w/ Aircraft Sale': 'mytc_with_aircraft_sale',
+    'Cost To Charter': 'cost_to_charter',
+    'Own/Charter Ratio': 'own_charter_ratio',
+    'Own/Charter Savings': 'own_charter_savings',
+    'Best Speed/$': 'best_speed_dollar',
+    'Normalized Speed/$': 'normalized_speed_dollar',
+    'Best Seat Speed/$': 'best_seat_speed_dollar',
+    'Best Range/$': 'best_range_dollar',
+    'Normalized Range/$': 'normalized_range_dollar',
+    'Best Seat Range/$': 'best_seat_range_dollar',
+    'Best Performance/$': 'best_performance_dollar',
+    'Normalized Performance/$': 'normalized_performance_dollar',
+    'Best Seat Performance/$': 'best_seat_performance_dollar',
+    'Best Efficiency/$': 'best_efficiency_dollar',
+    'Normalized Effieciency/$': 'normalized_efficiency_dollar',
+    'Best Seat Efficiency/$': 'best_seat_efficiency_dollar',
+    'Best All Around/$': 'best_all_around_dollar',
+    'Best Seat All Around/$': 'best_seat_all_around_dollar',
+    'Total Hourly Cost': 'total_hourly_cost',
+    'Hourly Cost/Seat': 'hourly_cost_per_seat',
+    'Cost/Mile': 'cost_per_mile',
+    'Cost/Seat Mile': 'cost_per_seat_mile',
+    'Hourly Variable Cost': 'hourly_variable_cost',
+    'Variable Cost/Seat': 'variable_cost_per_seat',
+    'Variable Cost/Mile': 'variable_cost_per_mile',
+    'Variable Cost/Seat Mile': 'variable_cost_per_seat_mile'
+}
+
+
+class FormulaError(ValueError):
+    """Raised for spreadsheet formulas the engine cannot compile"""
+
+
+def column_letter(index: int) -> str:
+    """0-based column index -> spreadsheet letter (0 -> A, 26 -> AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def parse_input_value(text: str) -> float:
+    """Parse a 'User Inputs' cell: '$6.50' -> 6.5, '4.00%' -> 0.04, '$65,000' -> 65000, blank -> 0"""
+    cleaned = (text or '').replace('$', '').replace(',', '').strip()
+    if not cleaned:
+        return 0.0
+    percent = cleaned.endswith('%')
+    try:
+        value = float(cleaned.rstrip('%'))
+    except ValueError:
+        return 0.0
+    return value / 100 if percent else value
+
+
+# ===== Tokenizer =====
+
+_TOKEN_PATTERNS = [
+    # Cross-sheet reference; some exported formulas lost the opening quote ("User Inputs'!$F$2")
+    ('SHEET_REF', r"'?(?P<sheet>[A-Za-z][A-Za-z ]*)'!\$?(?P<sheet_col>[A-Z]+)\$?(?P<sheet_row>\d+)"),
+    ('RANGE', r'\$?(?P<start_col>[A-Z]+)\$?(?P<start_row>\d+):\$?(?P<end_col>[A-Z]+)\$?(?P<end_row>\d+)'),
+    ('FUNC', r'(?P<func>[A-Z_]+)\('),
+    ('CELL', r'\$?(?P<col>[A-Z]+)\$?(?P<row>\d+)'),
+    ('NUMBER', r'\d+(?:\.\d*)?|\.\d+'),
+    ('OP', r'[-+*/^(),]'),
+    ('SPACE', r'\s+'),
+]
+_TOKEN_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in _TOKEN_PATTERNS))
+
+
+def tokenize(formula: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    position = 0
+    while position < len(formula):
+        match = _TOKEN_RE.match(formula, position)
+        if not match:
+            raise FormulaError(f"Unsupported syntax at {formula[position:position + 10]!r}")
+        kind = match.lastgroup
+        position = match.end()
+        if kind == 'SPACE':
+            continue
+        if kind == 'SHEET_REF':
+            if match.group('sheet').strip() != USER_INPUTS_SHEET:
+                raise FormulaError(f"Unknown sheet {match.group('sheet')!r}")
+            tokens.append(('INPUT', match.group('sheet_col')))
+        elif kind == 'RANGE':
+            if match.group('start_col') != match.group('end_col'):
+                raise FormulaError("Only single-column ranges are supported")
+            tokens.append(('RANGE', match.group('start_col')))
+        elif kind == 'FUNC':
+            tokens.append(('FUNC', match.group('func')))
+        elif kind == 'CELL':
+            if int(match.group('row')) != FORMULA_ROW:
+                raise FormulaError("Only same-row cell references are supported")
+            tokens.append(('CELL', match.group('col')))
+        elif kind == 'NUMBER':
+            tokens.append(('NUMBER', float(match.group(kind))))
+        else:
+            tokens.append(('OP', match.group(kind)))
+    return tokens
+
+
+# ===== Parser (recursive descent -> nested tuples) =====
+#   expr   := term (('+' | '-') term)*
+#   term   := power (('*' | '/') power)*
+#   power  := unary ('^' unary)*
+#   unary  := '-' unary | '+' unary | atom
+#   atom   := NUMBER | CELL | INPUT | RANGE | FUNC args ')' | '(' expr ')'
+
+_AGGREGATES = {
+    'MIN': np.nanmin,
+    'MAX': np.nanmax,
+    'SUM': np.nansum,
+    'AVERAGE': np.nanmean,
+}
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, Any]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, Any]:
+        token = self.peek()
+        if token is None:
+            raise FormulaError("Unexpected end of formula")
+        self.position += 1
+        return token
+
+    def expect(self, value: str):
+        token = self.take()
+        if token != ('OP', value):
+            raise FormulaError(f"Expected {value!r}, got {token[1]!r}")
+
+    def parse(self):
+        node = self.expr()
+        if self.peek() is not None:
+            raise FormulaError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in (('OP', '+'), ('OP', '-')):
+            node = ('binop', self.take()[1], node, self.term())
+        return node
+
+    def term(self):
+        node = self.power()
+        while self.peek() in (('OP', '*'), ('OP', '/')):
+            node = ('binop', self.take()[1], node, self.power())
+        return node
+
+    def power(self):
+        node = self.unary()
+        while self.peek() == ('OP', '^'):
+            self.take()
+            node = ('binop', '^', node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ('OP', '-'):
+            self.take()
+            return ('neg', self.unary())
+        if self.peek() == ('OP', '+'):
+            self.take()
+            return self.unary()
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == 'NUMBER':
+            return ('num', value)
+        if kind == 'CELL':
+            return ('col', value)
+        if kind == 'INPUT':
+            return ('input', value)
+        if kind == 'RANGE':
+            return ('range', value)
+        if kind == 'FUNC':
+            if value not in _AGGREGATES:
+                raise FormulaError(f"Unsupported function {value}")
+            args = [self.expr()]
+            while self.peek() == ('OP', ','):
+                self.take()
+                args.append(self.expr())
+            self.expect(')')
+            return ('call', value, args)
+        if (kind, value) == ('OP', '('):
+            node = self.expr()
+            self.expect(')')
+            return node
+        raise FormulaError(f"Unexpected token {value!r}")
+
+
+def parse_formula(formula: str):
+    """Parse a spreadsheet formula (without the leading '=') into an expression tree"""
+    return _Parser(tokenize(formula)).parse()
+
+
+def _references(node, kind: str) -> set:
+    """Collect the column letters referenced by an expression tree ('col'/'range' or 'input')"""
+    found = set()
+    if node[0] in ('col', 'range') and kind == 'col':
+        found.add(node[1])
+    elif node[0] == 'input' and kind == 'input':
+        found.add(node[1])
+    elif node[0] == 'binop':
+        found |= _references(node[2], kind) | _references(node[3], kind)
+    elif node[0] == 'neg':
+        found |= _references(node[1], kind)
+    elif node[0] == 'call':
+        for arg in node[2]:
+            found |= _references(arg, kind)
+    return found
+
+
+def _compile(node) -> Callable[[Dict[str, np.ndarray], Dict[str, float]], Any]:
+    """Compile an expression tree into a closure over (columns, inputs) returning an array or scalar"""
+    op = node[0]
+    if op == 'num':
+        value = node[1]
+        return lambda columns, inputs: value
+    if op == 'col':
+        letter = node[1]
+        return lambda columns, inputs: columns[letter]
+    if op == 'input':
+        letter = node[1]
+        return lambda columns, inputs: inputs.get(letter, 0.0)
+    if op == 'range':
+        # A bare range only makes sense inside an aggregate; AVERAGE/MIN/MAX reduce it to a scalar
+        letter = node[1]
+        return lambda columns, inputs: columns[letter]
+    if op == 'neg':
+        operand = _compile(node[1])
+        return lambda columns, inputs: -operand(columns, inputs)
+    if op == 'binop':
+        left, right = _compile(node[2]), _compile(node[3])
+        operator = {
+            '+': np.add,
+            '-': np.subtract,
+            '*': np.multiply,
+            '/': np.divide,
+            '^': np.power,
+        }[node[1]]
+        return lambda columns, inputs: operator(left(columns, inputs), right(columns, inputs))
+    if op == 'call':
+        reducer = _AGGREGATES[node[1]]
+        args = [(arg[0] == 'range', _compile(arg)) for arg in node[2]]
+        if len(args) == 1 and args[0][0]:
+            # Column aggregate, e.g. MIN($AT$2:$AT$358)
+            evaluate = args[0][1]
+            return lambda columns, inputs: reducer(evaluate(columns, inputs))
+        if node[1] == 'SUM':
+            stack = np.nansum
+        elif node[1] == 'AVERAGE':
+            stack = np.nanmean
+        else:
+            stack = reducer
+
+        def call(columns, inputs):
+            values = []
+            for is_range, evaluate in args:
+                value = evaluate(columns, inputs)
+                values.append(reducer(value) if is_range else value)
+            return stack(np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in values]), axis=0)
+        return call
+    raise FormulaError(f"Unknown node {op}")
+
+
+class SpreadsheetModel:
+    """
+    Compiled derived-column formulas of the aircraft spreadsheet.
+    Columns are addressed by spreadsheet letter; recalculate() evaluates formulas as whole-column
+    arrays in dependency order, optionally only the columns affected by changed inputs.
+    """
+
+    def __init__(self, headers: Dict[str, str], formulas: Dict[str, str],
+                 input_headers: Dict[str, str], inputs: Dict[str, float]):
+        self.headers = headers
+        self.letters = {header: letter for letter, header in headers.items()}
+        self.input_headers = input_headers
+        self.input_letters = {header: letter for letter, header in input_headers.items()}
+        self.inputs = inputs
+        self.skipped: Dict[str, str] = {}
+        # {category: {template input letter: category input letter}}
+        self.category_inputs = {
+            category: {self.input_letters[template]: self.input_letters[replacement]
+                       for template, replacement in replacements.items()
+                       if template in self.input_letters and replacement in self.input_letters}
+            for category, replacements in CATEGORY_INPUTS.items()
+        }
+
+        self._compiled: Dict[str, Callable] = {}
+        self._column_refs: Dict[str, set] = {}
+        self._input_refs: Dict[str, set] = {}
+        for letter, formula in formulas.items():
+            try:
+                tree = parse_formula(formula)
+            except FormulaError as e:
+                self.skipped[letter] = str(e)
+                continue
+            self._compiled[letter] = _compile(tree)
+            self._column_refs[letter] = _references(tree, 'col') - {letter}
+            self._input_refs[letter] = _references(tree, 'input')
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_csv(cls, equations_path: str = EQUATIONS_CSV,
+                 inputs_path: str = USER_INPUTS_CSV) -> 'SpreadsheetModel':
+        """Load the equations sheet (header row + formula row) and the default user inputs"""
+        with open(equations_path, newline='') as f:
+            header_row, formula_row = list(csv.reader(f))[:2]
+        headers = {column_letter(i): header for i, header in enumerate(header_row)}
+        formulas = {
+            column_letter(i): formula.lstrip('=')
+            for i, formula in enumerate(formula_row) if formula.strip()
+        }
+
+        with open(inputs_path, newline='') as f:
+            input_header_row, input_value_row = list(csv.reader(f))[:2]
+        input_headers = {column_letter(i): header for i, header in enumerate(input_header_row)}
+        inputs = {column_letter(i): parse_input_value(value) for i, value in enumerate(input_value_row)}
+
+        return cls(headers, formulas, input_headers, inputs)
+
+    def _topological_order(self) -> List[str]:
+        """Order formula columns so every column is evaluated after the formula columns it reads"""
+        pending = {letter: refs & self._compiled.keys() for letter, refs in self._column_refs.items()}
+        order = []
+        ready = sorted(letter for letter, refs in pending.items() if not refs)
+        while ready:
+            letter = ready.pop(0)
+            order.append(letter)
+            del pending[letter]
+            for other, refs in pending.items():
+                if letter in refs:
+                    refs.discard(letter)
+                    if not refs and other not in ready:
+                        ready.append(other)
+        if pending:
+            raise FormulaError(f"Circular references between columns {sorted(pending)}")
+        return order
+
+    def dependents(self, changed_inputs: Iterable[str]) -> set:
+        """Formula columns whose value depends (transitively) on the given input letters"""
+        changed_inputs = set(changed_inputs)
+        # A category's input stands in for the template's, so changing it dirties the template's readers
+        for replacements in self.category_inputs.values():
+            changed_inputs |= {template for template, replacement in replacements.items()
+                               if replacement in changed_inputs}
+        dirty = set()
+        for letter in self.order:
+            if self._input_refs[letter] & changed_inputs or self._column_refs[letter] & dirty:
+                dirty.add(letter)
+        return dirty
+
+    def resolve_inputs(self, overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Default input row with overrides applied; overrides may be keyed by letter or header"""
+        inputs = dict(self.inputs)
+        for key, value in (overrides or {}).items():
+            letter = self.input_letters.get(key, key)
+            if letter not in self.input_headers:
+                raise KeyError(f"Unknown user input {key!r}")
+            inputs[letter] = float(value)
+        return inputs
+
+    def row_inputs(self, inputs: Dict[str, Any], categories: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Inputs with each template input the categories replace turned into a per-row array
+        (categories aligned with the sheet rows; other categories keep the template's value)
+        """
+        categories = np.asarray(categories, dtype=object)
+        inputs = dict(inputs)
+        for category, replacements in self.category_inputs.items():
+            rows = categories == category
+            if not rows.any():
+                continue
+            for template, replacement in replacements.items():
+                values = inputs[template]
+                if np.ndim(values) == 0:
+                    values = inputs[template] = np.full(len(categories), float(values))
+                values[rows] = inputs.get(replacement, 0.0)
+        return inputs
+
+    def recalculate(self, columns: Dict[str, np.ndarray],
+                    overrides: Optional[Dict[str, float]] = None,
+                    changed_only: bool = False,
+                    categories: Optional[Sequence[Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the formula columns for every row at once.
+
+        Args:
+            columns: {letter: array} sheet values; formula columns found here are reused unless dirty
+            overrides: {input letter or header: value} changes to the default user inputs
+            changed_only: Only recompute columns that depend on the overridden inputs
+            categories: Aircraft category per row (see CATEGORY_INPUTS); None evaluates every row
+                with the template's inputs
+
+        Returns:
+            {letter: float64 array} for each recomputed column (non-finite results become 0)
+        """
+        inputs = self.resolve_inputs(overrides)
+        if categories is not None:
+            inputs = self.row_inputs(inputs, categories)
+        if changed_only:
+            changed = {self.input_letters.get(key, key) for key in (overrides or {})}
+            dirty = self.dependents(changed)
+        else:
+            dirty = set(self.order)
+
+        size = len(next(iter(columns.values()))) if columns else 0
+        env = dict(columns)
+        results = {}
+        for letter in self.order:
+            if letter not in dirty and letter in env:
+                continue
+            missing = [ref for ref in self._column_refs[letter] if ref not in env]
+            for ref in missing:
+                env[ref] = np.zeros(size)
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                values = self._compiled[letter](env, inputs)
+                values = np.array(np.broadcast_to(values, (size,)), dtype=np.float64)
+            values[~np.isfinite(values)] = 0.0
+            env[letter] = values
+            if letter in dirty:
+                results[letter] = values
+        return results
+
+    def columns_from_records(self, column_source: Callable[[str], np.ndarray]) -> Dict[str, np.ndarray]:
+        """Build the {letter: array} sheet from record columns using SPREADSHEET_RECORD_KEYS"""
+        columns = {}
+        for header, key in SPREADSHEET_RECORD_KEYS.items():
+            letter = self.letters.get(header)
+            if letter is not None:
+                columns[letter] = np.nan_to_num(column_source(key), nan=0.0)
+        return columns
+
+    def recalculate_records(self, column_source: Callable[[str], np.ndarray],
+                            overrides: Dict[str, float],
+                            categories: Optional[Sequence[Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Recompute the record metrics affected by user-input overrides.
+
+        Args:
+            column_source: key -> float64 array accessor (e.g. AircraftFleet.column)
+            overrides: {input header or letter: value}
+            categories: Record 'category' per row, so each category reads its own fuel and pilot pay inputs
+
+        Returns:
+            {record key: array} for each recomputed metric, aligned with the column source rows
+        """
+        results = self.recalculate(self.columns_from_records(column_source), overrides, changed_only=True,
+                                   categories=categories)
+        return {
+            SPREADSHEET_RECORD_KEYS[self.headers[letter]]: values
+            for letter, values in results.items()
+            if self.headers.get(letter) in SPREADSHEET_RECORD_KEYS
+        }
+
+    def check_records(self, column_source: Callable[[str], np.ndarray], categories: Sequence[Any],
+                      metrics: Sequence[str] = SHEET_CHECK_METRICS,
+                      tolerance: float = SHEET_CHECK_TOLERANCE) -> Dict[str, int]:
+        """
+        Recompute the metrics fed by the category-dependent inputs at their default values and count,
+        per metric, the rows that differ from the sheet's own values by more than tolerance.
+        An empty result means the model reproduces the sheet.
+        """
+        headers = {header for replacements in CATEGORY_INPUTS.values() for pair in replacements.items()
+                   for header in pair if header in self.input_letters}
+        defaults = {header: self.inputs[self.input_letters[header]] for header in headers}
+        recomputed = self.recalculate_records(column_source, defaults, categories)
+        mismatches = {}
+        for key in metrics:
+            if key not in recomputed:
+                continue
+            sheet = column_source(key)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                error = np.abs(recomputed[key] - sheet) / np.maximum(np.abs(sheet), 1.0)
+            count = int(np.count_nonzero(~np.isnan(sheet) & (error > tolerance)))
+            if count:
+                mismatches[key] = count
+        return mismatches
+
+
+def load_spreadsheet_model() -> Optional[SpreadsheetModel]:
+    """Load the spreadsheet model, returning None if the sheets are missing or malformed"""
+    try:
+        model = SpreadsheetModel.from_csv()
+        logger.info(f"Compiled {len(model.order)} spreadsheet formulas "
+                    f"({len(model.skipped)} skipped: {', '.join(sorted(model.skipped))})")
+        return model
+    except Exception as e:
+        logger.error(f"Error loading spreadsheet formulas: {e}")
+        return None
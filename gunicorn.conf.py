@@ -0,0 +1,32 @@
+"""
+Gunicorn settings for Jet Finder
+The master imports the app, brings the database schema up to date and loads the read-only datasets
+once (preload_app), then forks the workers, which share those pages copy-on-write instead of each
+loading its own copy.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Create or migrate the schema and load the shared datasets in the master (once per deploy, before
+    any worker serves a request), then keep the GC from touching (and copying) them. The schema is
+    set up here rather than in a release phase, whose throwaway dyno would migrate its own copy of
+    the SQLite file.
+    """
+    from app import init_db, preload_shared_data
+    from lazy_init import STARTUP_PROFILE
+    with STARTUP_PROFILE.stage('init_db'):
+        init_db()
+    preload_shared_data()
+    gc.freeze()
+    STARTUP_PROFILE.log_report()
+    server.log.info("Shared datasets loaded; forking workers")
@@ -3,22 +3,7 @@ import json
 import os
 import uuid
 from datetime import datetime
-
-
-def clean_numeric(value):
-    """Convert numeric values to proper format, handling special characters like $, commas, etc."""
-    if isinstance(value, str):
-        # Remove $ and commas
-        value = value.replace('$', '').replace(',', '')
-        # Remove quotation marks
-        value = value.replace('"', '')
-
-    try:
-        # Try to convert to float
-        return float(value)
-    except (ValueError, TypeError):
-        # If conversion fails, return original value
-        return value
+from csv_ingest import SheetIngest, AIRCRAFT_SHEET_SCHEMA
 
 
 def get_category(aircraft_type):
@@ -43,16 +28,11 @@ def main():
 
     # Read the CSV file
     try:
-        # Skip the first row which contains header description
-        # Use first row as data, set column names to indices
-        df = pd.read_csv(csv_path, header=None)
-        print(f"Successfully read CSV with {len(df) - 1} rows")
-
-        # Get column names from the first row (for reference)
-        column_names = df.iloc[0].tolist()
+        df = pd.read_csv(csv_path)
+        print(f"Successfully read CSV with {len(df)} rows")
 
-        # Remove the header row from the dataframe
-        df = df.iloc[1:].reset_index(drop=True)
+        # Get column names from the header row (for reference)
+        column_names = df.columns.tolist()
 
         # Print the column names for reference
         print(f"Column names from CSV: {column_names[:10]}...")
@@ -75,36 +55,35 @@ def main():
             print(f"Error loading existing listings: {e}")
             existing_listings = []
 
-    # Column indices for relevant data (based on the header row)
-    col_idx = {
-        'aircraft_name': 0,  # First column contains aircraft model name
-        'manufacturer': 1,   # Second column is manufacturer
-        'type': 2,           # Third column is aircraft type
-        'min_year': 4,       # Fifth column is lowest year
-        'max_year': 5,       # Sixth column is highest year
-        'max_altitude': 11,  # Max operating altitude
-        'range': 23,         # Range in NM
-        'speed': 24,         # Speed in KTS
-        'passengers': 25,    # Number of passengers
-        'price': 26,         # Average price
-        'total_hourly_cost': 58,  # Total hourly cost
-        'hourly_variable_cost': 62,  # Hourly variable cost
-        'annual_budget': 37  # Annual budget
-    }
+    # Clean the sheet column-by-column (columns are mapped by csv_ingest.AIRCRAFT_SHEET_SCHEMA)
+    sheet = SheetIngest(df, AIRCRAFT_SHEET_SCHEMA)
+    names = sheet.raw('aircraft_name')
+    manufacturers = sheet.raw('manufacturer')
+    types = sheet.raw('category')
+    min_years = sheet.parsed('lowest_year').tolist()
+    max_years = sheet.parsed('highest_year').tolist()
+    prices = sheet.parsed('price').tolist()
+    altitudes = sheet.parsed('max_altitude').tolist()
+    ranges = sheet.columns['range'].tolist()
+    speeds = sheet.columns['speed'].tolist()
+    passengers = sheet.columns['passengers'].tolist()
+    hourly_costs = sheet.parsed('total_hourly_cost').tolist()
+    hourly_variable_costs = sheet.parsed('hourly_variable_cost').tolist()
+    annual_budgets = sheet.parsed('annual_budget').tolist()
+
+    def present(value):
+        return not pd.isna(value)
 
     # Process each row in the CSV and convert to listing format
     new_listings = []
-    for idx, row in df.iterrows():
+    for idx, aircraft_name in enumerate(names):
         # Skip rows without an aircraft name (first column)
-        if pd.isna(row[col_idx['aircraft_name']]):
+        if pd.isna(aircraft_name):
             continue
-
-        # Get aircraft name from first column
-        aircraft_name = row[col_idx['aircraft_name']]
+        aircraft_name = str(aircraft_name)
 
         # Get manufacturer from second column or from aircraft name
-        manufacturer = row[col_idx['manufacturer']] if not pd.isna(
-            row[col_idx['manufacturer']]) else aircraft_name.split(' ')[0]
+        manufacturer = str(manufacturers[idx]) if present(manufacturers[idx]) else aircraft_name.split(' ')[0]
 
         # Get model from aircraft name, removing manufacturer if it's a prefix
         if aircraft_name.startswith(manufacturer):
@@ -113,45 +92,27 @@ def main():
             model = aircraft_name
 
         # Determine aircraft type and category
-        aircraft_type = row[col_idx['type']] if not pd.isna(row[col_idx['type']]) else 'Piston'
+        aircraft_type = str(types[idx]) if present(types[idx]) else 'Piston'
         category = get_category(aircraft_type)
 
-        # Determine year range
-        try:
-            min_year = int(float(row[col_idx['min_year']])) if not pd.isna(row[col_idx['min_year']]) else 2000
-            max_year = int(float(row[col_idx['max_year']])) if not pd.isna(row[col_idx['max_year']]) else min_year + 5
-
-            # Use middle of the year range
-            year = min_year + (max_year - min_year) // 2
-        except (ValueError, TypeError):
-            # Default if years can't be parsed
-            min_year = 2000
-            max_year = 2010
-            year = 2005
+        # Determine year range, using the middle of the range
+        min_year = int(min_years[idx]) if present(min_years[idx]) else 2000
+        max_year = int(max_years[idx]) if present(max_years[idx]) else min_year + 5
+        year = min_year + (max_year - min_year) // 2
 
         # Get price
-        price = clean_numeric(row[col_idx['price']]) if not pd.isna(row[col_idx['price']]) else 0
+        price = prices[idx] if present(prices[idx]) else 0
 
         # Get performance data
-        try:
-            range_nm = int(float(row[col_idx['range']])) if not pd.isna(row[col_idx['range']]) else 0
-            max_speed = int(float(row[col_idx['speed']])) if not pd.isna(row[col_idx['speed']]) else 0
-            seats = int(float(row[col_idx['passengers']])) if not pd.isna(row[col_idx['passengers']]) else 0
-            max_altitude = int(float(row[col_idx['max_altitude']])) if not pd.isna(
-                row[col_idx['max_altitude']]) else 25000
-        except (ValueError, TypeError):
-            range_nm = 0
-            max_speed = 0
-            seats = 0
-            max_altitude = 25000
+        range_nm = ranges[idx]
+        max_speed = speeds[idx]
+        seats = passengers[idx]
+        max_altitude = int(altitudes[idx]) if present(altitudes[idx]) else 25000
 
         # Get operating costs if available
-        hourly_cost = clean_numeric(row[col_idx['total_hourly_cost']]) if not pd.isna(
-            row.get(col_idx['total_hourly_cost'], '')) else 0
-        hourly_variable_cost = clean_numeric(row[col_idx['hourly_variable_cost']]) if not pd.isna(
-            row.get(col_idx['hourly_variable_cost'], '')) else 0
-        annual_budget = clean_numeric(row[col_idx['annual_budget']]) if not pd.isna(
-            row.get(col_idx['annual_budget'], '')) else 0
+        hourly_cost = hourly_costs[idx] if present(hourly_costs[idx]) else 0
+        hourly_variable_cost = hourly_variable_costs[idx] if present(hourly_variable_costs[idx]) else 0
+        annual_budget = annual_budgets[idx] if present(annual_budgets[idx]) else 0
 
         # Create a listing
         listing = {
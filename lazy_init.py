@@ -0,0 +1,146 @@
+"""
+Lazy Subsystem Initialization for Jet Finder
+Heavy subsystems (pandas data managers, third-party clients, compiled models) load on first use instead
+of at import, and every startup stage is timed so slow starts can be traced to the stage (or import)
+responsible. Set JETFINDER_PROFILE_STARTUP=1 to also time each module imported by the app.
+"""
+
+import os
+import sys
+import time
+import builtins
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_IMPORTS = os.environ.get('JETFINDER_PROFILE_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+
+class StartupProfile:
+    """Wall-clock timings of startup stages and (when enabled) of the app's top-level imports"""
+
+    def __init__(self, profile_imports: bool = PROFILE_IMPORTS):
+        self.profile_imports = profile_imports
+        self.stages: List[Tuple[str, float]] = []
+        self.imports: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+        self._import_depth = threading.local()
+        self._original_import: Optional[Callable] = None
+        self._imports_started: Optional[float] = None
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.stages.append((name, seconds))
+        if self.profile_imports:
+            logger.info(f"Startup: {name} took {seconds * 1000:.1f} ms")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one startup stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def start_imports(self):
+        """
+        Start timing the importing module's own imports; with import profiling enabled, each import
+        of a module not loaded yet is timed (inclusive of the modules it pulls in)
+        """
+        self._imports_started = time.perf_counter()
+        if not self.profile_imports or self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+        depth = self._import_depth
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            outermost = getattr(depth, 'value', 0) == 0
+            depth.value = getattr(depth, 'value', 0) + 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                depth.value -= 1
+                if outermost:
+                    with self._lock:
+                        self.imports.append((name, time.perf_counter() - started))
+
+        builtins.__import__ = timed_import
+
+    def stop_imports(self, name: str = 'imports'):
+        """Record the import stage started by start_imports() and remove the import hook"""
+        if self._imports_started is not None:
+            self.record(name, time.perf_counter() - self._imports_started)
+            self._imports_started = None
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self, top_imports: int = 15) -> Dict[str, Any]:
+        """Stage timings in order, plus the slowest imports when import profiling ran"""
+        with self._lock:
+            stages = list(self.stages)
+            imports = sorted(self.imports, key=lambda item: item[1], reverse=True)[:top_imports]
+        return {
+            'stages': [{'stage': name, 'ms': round(seconds * 1000, 1)} for name, seconds in stages],
+            'slowest_imports': [{'module': name, 'ms': round(seconds * 1000, 1)} for name, seconds in imports],
+            'total_ms': round(sum(seconds for _, seconds in stages) * 1000, 1)
+        }
+
+    def log_report(self):
+        report = self.report()
+        stages = ', '.join(f"{stage['stage']} {stage['ms']} ms" for stage in report['stages'])
+        logger.info(f"Startup took {report['total_ms']} ms ({stages})")
+        for entry in report['slowest_imports']:
+            logger.info(f"  import {entry['module']}: {entry['ms']} ms")
+
+
+STARTUP_PROFILE = StartupProfile()
+
+
+class LazySubsystem:
+    """
+    A subsystem built by load() on first get() (once, even under concurrent requests) and timed as a
+    startup stage. load() may return None for an optional subsystem that is unavailable.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, name: str, load: Callable[[], Any], profile: StartupProfile = STARTUP_PROFILE):
+        self.name = name
+        self._load = load
+        self._profile = profile
+        self._value = self._UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not self._UNSET
+
+    def get(self) -> Any:
+        value = self._value
+        if value is self._UNSET:
+            with self._lock:
+                value = self._value
+                if value is self._UNSET:
+                    with self._profile.stage(self.name):
+                        value = self._value = self._load()
+        return value
+
+
+def optional_import(module: str, attribute: str) -> Callable[[], Any]:
+    """Loader returning module.attribute, or None when the module cannot be imported"""
+    def load():
+        try:
+            imported = __import__(module, fromlist=[attribute])
+        except ImportError as e:
+            logger.warning(f"{module} unavailable: {e}")
+            return None
+        return getattr(imported, attribute)
+    return load
@@ -0,0 +1,226 @@
+"""
+Materialized Listing Scores for Jet Finder
+Writes Priority, Data and category-position scores into the listing_scores table, one aircraft-type
+group at a time, so read endpoints serve them with an indexed lookup instead of rescoring the fleet
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+from listing_scoring import score_listings_by_type, data_score_details, listing_type
+
+# Bump when the scoring rules change so rows written by older code are recalculated
+LISTING_SCORE_VERSION = '2.0'
+
+# listing_scores.listing_type for CSV/marketplace aircraft and for user-created listings
+AIRCRAFT_LISTING_TYPE = 'aircraft'
+USER_LISTING_TYPE = 'user_listing'
+
+# listing_scores column per Priority Score component
+_COMPONENT_COLUMNS = {
+    'engine': 'engine_hours_score',
+    'interior': 'interior_quality_score',
+    'avionics': 'avionics_rank_score',
+    'maintenance': 'maintenance_recency_score',
+    'paint': 'paint_condition_score',
+}
+
+_SCORE_COLUMNS = (
+    'listing_id', 'listing_type', 'aircraft_type',
+    'priority_score', 'engine_hours_score', 'interior_quality_score', 'avionics_rank_score',
+    'maintenance_recency_score', 'paint_condition_score',
+    'data_score', 'completeness_percentage', 'verification_score',
+    'required_fields_completed', 'total_required_fields',
+    'percentile_rank', 'category_best_score', 'category_position', 'total_in_category',
+    'last_calculated', 'calculation_version'
+)
+
+_UPSERT_SQL = (
+    f"INSERT INTO listing_scores ({', '.join(_SCORE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _SCORE_COLUMNS)}) "
+    f"ON CONFLICT(listing_id, listing_type) DO UPDATE SET "
+    + ', '.join(f'{column} = excluded.{column}' for column in _SCORE_COLUMNS[2:])
+)
+
+
+def create_listing_score_indexes(cursor: sqlite3.Cursor):
+    """Indexes behind the materialized score reads (lookup by id is covered by the UNIQUE key)"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_listing_scores_type_group
+        ON listing_scores (listing_type, aircraft_type)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_listing_scores_priority
+        ON listing_scores (listing_type, priority_score DESC)
+    ''')
+
+
+class ListingScoreStore:
+    """
+    Incrementally refreshed listing_scores table.
+    refresh() rescores only the aircraft-type groups it is given; ensure_current() rebuilds the table
+    when its rows were computed by other scoring rules or from another dataset.
+    """
+
+    def __init__(self, db_path: str, listing_type_name: str = AIRCRAFT_LISTING_TYPE):
+        self.db_path = db_path
+        self.listing_type = listing_type_name
+        self._lock = threading.Lock()
+        # calculation_version of the rows currently materialized (None until checked)
+        self._materialized_version: Optional[str] = None
+
+    @staticmethod
+    def calculation_version(dataset_version: str) -> str:
+        """calculation_version stamp: scoring rules version plus the dataset it was computed from"""
+        return f"{LISTING_SCORE_VERSION}/{dataset_version}"
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def refresh(self, listings: Iterable[Dict[str, Any]], dataset_version: str,
+                aircraft_types: Optional[Iterable[str]] = None, now: Optional[datetime] = None) -> int:
+        """
+        Rescore and upsert the given aircraft-type groups (all groups when aircraft_types is None).
+        Rows of a refreshed group whose listing is gone are deleted. Returns the number of rows written.
+        """
+        now = now or datetime.now()
+        version = self.calculation_version(dataset_version)
+        listings = list(listings)
+        if aircraft_types is not None:
+            aircraft_types = set(aircraft_types)
+            listings = [listing for listing in listings if listing_type(listing) in aircraft_types]
+        groups = score_listings_by_type(listings, now)
+        calculated_at = now.strftime('%Y-%m-%d %H:%M:%S')
+
+        rows = []
+        for aircraft_type, group in groups.items():
+            for i, listing in enumerate(group.listings):
+                data = data_score_details(listing)
+                components = group.component_scores(i)
+                position = int(group.position[i])
+                percentile = (1 - (position - 1) / group.total) * 100 if group.total > 1 else 100
+                row = {
+                    'listing_id': listing.get('id'),
+                    'listing_type': self.listing_type,
+                    'aircraft_type': aircraft_type,
+                    'priority_score': float(group.priority[i]),
+                    'data_score': data['data_score'],
+                    'completeness_percentage': data['completeness_percentage'],
+                    'verification_score': data['verification_score'],
+                    'required_fields_completed': data['required_fields_completed'],
+                    'total_required_fields': data['total_required_fields'],
+                    'percentile_rank': percentile,
+                    'category_best_score': group.best_in_category,
+                    'category_position': position,
+                    'total_in_category': group.total,
+                    'last_calculated': calculated_at,
+                    'calculation_version': version,
+                }
+                for name, column in _COMPONENT_COLUMNS.items():
+                    row[column] = components[name]
+                rows.append(tuple(row[column] for column in _SCORE_COLUMNS))
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                if aircraft_types is None:
+                    cursor.execute('DELETE FROM listing_scores WHERE listing_type = ?', (self.listing_type,))
+                else:
+                    # Drop rows of the refreshed groups (listings may have left a group), then rewrite them
+                    for aircraft_type in aircraft_types:
+                        cursor.execute('DELETE FROM listing_scores WHERE listing_type = ? AND aircraft_type = ?',
+                                       (self.listing_type, aircraft_type))
+                cursor.executemany(_UPSERT_SQL, rows)
+                conn.commit()
+            finally:
+                conn.close()
+            if aircraft_types is None:
+                self._materialized_version = version
+        return len(rows)
+
+    def refresh_listings(self, all_listings: Iterable[Dict[str, Any]], dataset_version: str,
+                         touched: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+        """Rescore only the groups containing the touched (created, approved or edited) listings"""
+        return self.refresh(all_listings, dataset_version, {listing_type(listing) for listing in touched}, now)
+
+    def ensure_current(self, listings: List[Dict[str, Any]], dataset_version: str) -> bool:
+        """
+        Make sure every row was materialized from this dataset by the current scoring rules,
+        rebuilding all groups otherwise (first run, rule change or new CSV). Returns True if rebuilt.
+        """
+        version = self.calculation_version(dataset_version)
+        if self._materialized_version == version:
+            return False
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT COUNT(*) AS total, SUM(calculation_version = ?) AS current '
+                'FROM listing_scores WHERE listing_type = ?',
+                (version, self.listing_type)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row['total'] == len(listings) and row['current'] == row['total']:
+            # Already materialized by another worker or an earlier run
+            self._materialized_version = version
+            return False
+        self.refresh(listings, dataset_version)
+        return True
+
+    def get(self, listing_id: int) -> Optional[Dict[str, Any]]:
+        """Materialized scores for one listing (indexed lookup), or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM listing_scores WHERE listing_id = ? AND listing_type = ?',
+                               (listing_id, self.listing_type)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def get_many(self, listing_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Materialized scores of several listings by id (indexed lookups in one query); missing ids are left out"""
+        listing_ids = list(dict.fromkeys(listing_ids))
+        if not listing_ids:
+            return {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM listing_scores WHERE listing_type = ? "
+                f"AND listing_id IN ({', '.join('?' for _ in listing_ids)})",
+                (self.listing_type, *listing_ids)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row['listing_id']: dict(row) for row in rows}
+
+    def top(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Materialized rows by priority score (highest first), ties in listing id order"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT * FROM listing_scores WHERE listing_type = ? '
+                'ORDER BY priority_score DESC, listing_id LIMIT ? OFFSET ?',
+                (self.listing_type, -1 if limit is None else limit, offset)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def summary(self) -> Dict[str, float]:
+        """Row count, aircraft-type count and average Priority/Data scores"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT COUNT(*) AS total, COUNT(DISTINCT aircraft_type) AS aircraft_types, '
+                'AVG(priority_score) AS avg_priority_score, AVG(data_score) AS avg_data_score '
+                'FROM listing_scores WHERE listing_type = ?',
+                (self.listing_type,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return {key: row[key] or 0 for key in row.keys()}
@@ -0,0 +1,343 @@
+"""
+Group-wise Listing Priority Scores for Jet Finder
+Computes each Priority Score component once per listing and ranks it within the listing's
+aircraft-type group with a sort, giving priority score, category position and best in category
+for every listing in O(N log N). Also holds the per-listing Data Score rules.
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+# Priority Score components, in weighting order
+PRIORITY_COMPONENTS = ('engine', 'interior', 'avionics', 'maintenance', 'paint')
+
+# Score given to a component that cannot be computed for the group (bad field values)
+DEFAULT_COMPONENT_SCORE = 50
+
+# Engine Time Between Overhaul (hours)
+ENGINE_TBOS = {
+    'pt6a-42': 3500,
+    'pt6a-67': 3500,
+    'pw306c': 5000,
+    'pw307a': 5000,
+    'cf34-3a': 6000,
+    'br710-c4-11': 6000,
+    'tfe731-2': 3000,
+    'tfe731-3': 3500,
+    'tfe731-40': 4000,
+    'tfe731-60': 4000,
+    'jt15d-4': 3000,
+    'jt15d-5': 3500,
+    'ae3007c': 6000,
+    'cf700-2d2': 3000,
+    'htf7000': 4000,
+    'htf7500e': 5000,
+    'pw545c': 4000,
+    'pw610f': 5000,
+    'rolls royce pearl 15': 6000,
+    'ge passport': 6000
+}
+DEFAULT_ENGINE_TBO = 4000
+
+# Text condition ratings (interior / exterior)
+CONDITION_SCORES = {
+    'excellent': 100,
+    'very good': 80,
+    'good': 60,
+    'fair': 40,
+    'poor': 20,
+    '': 0  # No rating provided
+}
+
+# Avionics systems ranked by sophistication (higher is better)
+AVIONICS_RANKINGS = {
+    'g5000': 100,
+    'g3000': 95,
+    'pro line fusion': 90,
+    'symmetry flight deck': 85,
+    'easy iii': 80,
+    'ace avionics': 75,
+    'pro line 21': 70,
+    'g1000': 65,
+    'perspective': 60,
+    'avidyne r9': 55,
+    'collins proline': 50,
+    'honeywell': 45,
+    'garmin': 40,
+    'bendix king': 35,
+    'basic': 20,
+    '': 0  # No avionics info
+}
+
+# Component weights reflecting what typically drives resale value
+DEFAULT_RESALE_VALUE_WEIGHTS = {
+    'engine': 0.30,      # Engine hours most important
+    'interior': 0.25,    # Interior quality
+    'avionics': 0.20,    # Avionics sophistication
+    'maintenance': 0.15, # Maintenance recency
+    'paint': 0.10        # Paint condition
+}
+
+# Model-specific weights (could be stored in database)
+MODEL_RESALE_VALUE_WEIGHTS = {
+    'citation x': {
+        'engine': 0.35,
+        'interior': 0.20,
+        'avionics': 0.25,
+        'maintenance': 0.15,
+        'paint': 0.05
+    },
+    'gulfstream g550': {
+        'engine': 0.25,
+        'interior': 0.30,
+        'avionics': 0.25,
+        'maintenance': 0.15,
+        'paint': 0.05
+    }
+}
+
+
+# Data Score: fields every aircraft listing should fill in
+DATA_REQUIRED_FIELDS = (
+    'title', 'manufacturer', 'model', 'year', 'price', 'location',
+    'description', 'airframe_total_time', 'engine_1_manufacturer',
+    'engine_1_model', 'engine_1_time_since_new', 'engine_1_time_since_overhaul',
+    'interior_condition', 'exterior_condition', 'last_annual_date'
+)
+
+# Highly valued fields (bonus points, up to 20)
+DATA_BONUS_FIELDS = (
+    'serial_number', 'registration_number', 'avionics_description',
+    'equipment_list', 'maintenance_program', 'damage_history',
+    'images', 'specifications'
+)
+
+# Data Score points per verification status
+VERIFICATION_SCORES = {
+    'verified': 20,
+    'partial': 10,
+    'pending': 0
+}
+
+
+def engine_tbo(engine_model: str) -> int:
+    """Time Between Overhaul for an engine model (default 4000 hours)"""
+    return ENGINE_TBOS.get(engine_model.lower(), DEFAULT_ENGINE_TBO)
+
+
+def resale_value_weights(aircraft_model: str) -> Dict[str, float]:
+    """Component weights for an aircraft model"""
+    return dict(MODEL_RESALE_VALUE_WEIGHTS.get(aircraft_model.lower(), DEFAULT_RESALE_VALUE_WEIGHTS))
+
+
+def listing_type(listing: Dict[str, Any]) -> str:
+    """Aircraft type a listing is compared within, e.g. 'Gulfstream G550'"""
+    return f"{listing.get('manufacturer', '')} {listing.get('model', '')}".strip()
+
+
+def inspection_recency_score(days_since: int) -> int:
+    """Bucket days since the last annual inspection (fresh < 90 days, overdue >= 500)"""
+    if days_since < 90:
+        return 100
+    elif days_since < 180:
+        return 80
+    elif days_since < 365:
+        return 60
+    elif days_since < 500:
+        return 40
+    return 20
+
+
+def data_score_details(listing: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Data Score (0-100) from listing completeness and verification status, with its components:
+    completeness_percentage, verification_score, required_fields_completed, total_required_fields
+    """
+    completed_required = 0
+    for field in DATA_REQUIRED_FIELDS:
+        value = listing.get(field)
+        if value and str(value).strip() and str(value).strip() != '0':
+            completed_required += 1
+    completeness_percentage = (completed_required / len(DATA_REQUIRED_FIELDS)) * 100
+
+    completed_bonus = 0
+    for field in DATA_BONUS_FIELDS:
+        value = listing.get(field)
+        if value and str(value).strip():
+            completed_bonus += 1
+    bonus_percentage = (completed_bonus / len(DATA_BONUS_FIELDS)) * 20
+
+    verification_score = VERIFICATION_SCORES.get(listing.get('verification_status', 'pending'), 0)
+
+    # Penalties for missing critical fields
+    penalties = 0
+    if not listing.get('engine_1_time_since_new'):
+        penalties += 10
+    if not listing.get('interior_condition'):
+        penalties += 5
+    if not listing.get('images'):
+        penalties += 10
+
+    data_score = completeness_percentage + bonus_percentage + verification_score - penalties
+    return {
+        'data_score': max(0, min(100, data_score)),
+        'completeness_percentage': completeness_percentage,
+        'verification_score': verification_score,
+        'required_fields_completed': completed_required,
+        'total_required_fields': len(DATA_REQUIRED_FIELDS)
+    }
+
+
+# ===== Raw component values =====
+# Each returns (value, ranked): ranked=False keeps the listing out of its group's comparison
+# population and makes the raw value its final score. Exceptions fail the component for the group.
+
+def _engine_value(listing, now):
+    hours = listing.get('engine_1_time_since_new', 0) or 0
+    tbo = engine_tbo(listing.get('engine_1_model', ''))
+    if tbo <= 0:
+        return DEFAULT_COMPONENT_SCORE, False
+    return (max(0, tbo - hours) / tbo) * 100, True
+
+
+def _interior_value(listing, now):
+    return CONDITION_SCORES.get(listing.get('interior_condition', '').lower(), 0), True
+
+
+def _avionics_value(listing, now):
+    description = (listing.get('avionics_description', '') or '').lower()
+    value = 0
+    for avionics_type, score in AVIONICS_RANKINGS.items():
+        if avionics_type and avionics_type in description:
+            value = max(value, score)
+    return value, True
+
+
+def _maintenance_value(listing, now):
+    last_annual = listing.get('last_annual_date')
+    if not last_annual:
+        return 0, False
+    try:
+        if isinstance(last_annual, str):
+            annual_date = datetime.strptime(last_annual, '%Y-%m-%d')
+        else:
+            annual_date = last_annual
+        return inspection_recency_score((now - annual_date).days), True
+    except Exception:
+        # Unreadable dates rank as 0 within the group
+        return 0, True
+
+
+def _paint_value(listing, now):
+    return CONDITION_SCORES.get(listing.get('exterior_condition', '').lower(), 0), True
+
+
+_COMPONENT_VALUES = {
+    'engine': _engine_value,
+    'interior': _interior_value,
+    'avionics': _avionics_value,
+    'maintenance': _maintenance_value,
+    'paint': _paint_value,
+}
+
+
+def _percentile_scores(values: np.ndarray, ranked: np.ndarray) -> np.ndarray:
+    """
+    Percentile of each value within the ranked population: share of ranked values strictly below it.
+    Unranked entries (and every entry if nothing is ranked) keep their raw value.
+    """
+    population = np.sort(values[ranked])
+    if population.size == 0:
+        return values.copy()
+    below = np.searchsorted(population, values, side='left')
+    return np.where(ranked, (below / population.size) * 100, values)
+
+
+class ListingGroupScores:
+    """Priority Scores for one aircraft-type group, aligned with its listings"""
+
+    def __init__(self, listings: List[Dict[str, Any]], now: Optional[datetime] = None):
+        self.listings = listings
+        self.total = len(listings)
+        now = now or datetime.now()
+
+        # components[i, c]: listing i's percentile for PRIORITY_COMPONENTS[c]
+        self.components = np.zeros((self.total, len(PRIORITY_COMPONENTS)))
+        for c, name in enumerate(PRIORITY_COMPONENTS):
+            extract = _COMPONENT_VALUES[name]
+            try:
+                extracted = [extract(listing, now) for listing in listings]
+            except Exception as e:
+                print(f"Error calculating {name} scores for {listing_type(listings[0])}: {e}")
+                self.components[:, c] = DEFAULT_COMPONENT_SCORE
+                continue
+            values = np.array([value for value, _ in extracted], dtype=np.float64)
+            ranked = np.array([is_ranked for _, is_ranked in extracted], dtype=bool)
+            self.components[:, c] = _percentile_scores(values, ranked)
+
+        self.priority = self._priority_scores()
+        ordered = np.sort(self.priority)
+        # Position = 1 + number of listings with a strictly higher score (ties share a position)
+        self.position = (self.total - np.searchsorted(ordered, self.priority, side='right')) + 1
+        self.best_in_category = float(ordered[-1]) if self.total else 0.0
+
+    def _priority_scores(self) -> np.ndarray:
+        """
+        Weighted component sum per listing, normalized against the best of the listing itself and
+        its peers (listings with another id) under the listing's own weights, clipped to 0-100.
+        """
+        priority = np.zeros(self.total)
+        try:
+            ids = [listing['id'] for listing in self.listings]
+        except Exception as e:
+            print(f"Error calculating priority score: {e}")
+            return priority
+
+        # Weighted sums are computed once per distinct weighting in the group
+        weighted_sums = {}
+        for i, listing in enumerate(self.listings):
+            try:
+                listing_weights = resale_value_weights(listing.get('model', ''))
+            except Exception as e:
+                print(f"Error calculating priority score: {e}")
+                continue
+            key = tuple(listing_weights[name] for name in PRIORITY_COMPONENTS)
+            if key not in weighted_sums:
+                sums = self.components[:, 0] * key[0]
+                for c in range(1, len(key)):
+                    sums = sums + self.components[:, c] * key[c]
+                # Best sum per id, and the two best ids, so each listing can skip its own id
+                best_by_id = {}
+                for listing_id, value in zip(ids, sums.tolist()):
+                    best_by_id[listing_id] = max(best_by_id.get(listing_id, value), value)
+                leaders = sorted(best_by_id, key=best_by_id.get, reverse=True)[:2]
+                weighted_sums[key] = (sums, best_by_id, leaders)
+            sums, best_by_id, leaders = weighted_sums[key]
+            score = sums[i]
+            peers = [listing_id for listing_id in leaders if listing_id != ids[i]]
+            if peers:
+                best = max(best_by_id[peers[0]], score)
+                if best > 0:
+                    score = (score / best) * 100
+            priority[i] = max(0, min(100, score))
+        return priority
+
+    def component_scores(self, index: int) -> Dict[str, float]:
+        """{component: percentile} for one listing"""
+        return {name: float(self.components[index, c]) for c, name in enumerate(PRIORITY_COMPONENTS)}
+
+
+def score_listing_group(listings: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> ListingGroupScores:
+    """Score listings as a single comparison group"""
+    return ListingGroupScores(list(listings), now)
+
+
+def score_listings_by_type(listings: Iterable[Dict[str, Any]],
+                           now: Optional[datetime] = None) -> Dict[str, ListingGroupScores]:
+    """Group listings by aircraft type (in first-seen order) and score each group"""
+    now = now or datetime.now()
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for listing in listings:
+        groups.setdefault(listing_type(listing), []).append(listing)
+    return {aircraft_type: ListingGroupScores(group, now) for aircraft_type, group in groups.items()}
@@ -0,0 +1,131 @@
+"""
+Market Cube for Jet Finder
+Group aggregates of a catalog version: for each combination of grouping dimension values, the aircraft
+count and per-metric count, sum, min, max and values (for medians). Insight queries that select
+dimension values combine the matching groups instead of rescanning the fleet.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence
+
+from aircraft_catalog import ColumnSource, as_numbers
+
+
+@dataclass
+class MetricSummary:
+    """Aggregate of one metric over a group of aircraft (NaN values are left out)"""
+    count: int
+    total: float
+    minimum: float
+    maximum: float
+    values: np.ndarray
+
+    @classmethod
+    def of(cls, values: np.ndarray) -> 'MetricSummary':
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return cls(0, 0.0, np.inf, -np.inf, values)
+        return cls(len(values), float(values.sum()), float(values.min()), float(values.max()), values)
+
+    @classmethod
+    def combine(cls, summaries: Sequence['MetricSummary']) -> 'MetricSummary':
+        if len(summaries) == 1:
+            return summaries[0]
+        return cls(
+            count=sum(summary.count for summary in summaries),
+            total=sum(summary.total for summary in summaries),
+            minimum=min((summary.minimum for summary in summaries), default=np.inf),
+            maximum=max((summary.maximum for summary in summaries), default=-np.inf),
+            values=np.concatenate([summary.values for summary in summaries]) if summaries else np.zeros(0)
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """min/max/avg/median (zeros for an empty summary, like aircraft_catalog.numeric_stats)"""
+        if not self.count:
+            return {'min': 0.0, 'max': 0.0, 'avg': 0.0, 'median': 0.0}
+        return {'min': self.minimum, 'max': self.maximum,
+                'avg': self.total / self.count, 'median': float(np.median(self.values))}
+
+
+@dataclass
+class MarketGroup:
+    """Aircraft sharing one value of every dimension (codes index each dimension's categories)"""
+    codes: tuple
+    count: int
+    first_row: int
+    metrics: Dict[str, MetricSummary]
+
+
+class MarketSlice:
+    """The groups of a cube matching one selection, with their aggregates combined on demand"""
+
+    def __init__(self, cube: 'MarketCube', groups: List[MarketGroup]):
+        self._cube = cube
+        self.groups = groups
+
+    @property
+    def total(self) -> int:
+        return sum(group.count for group in self.groups)
+
+    def stats(self, metric: str) -> Dict[str, float]:
+        return MetricSummary.combine([group.metrics[metric] for group in self.groups]).stats()
+
+    def distribution(self, dimension: str) -> Dict[Any, int]:
+        """Aircraft per value of dimension, most common first (ties in catalog order, like facet_counts)"""
+        position = self._cube.dimensions.index(dimension)
+        categories = self._cube.categories[dimension]
+        counts: Dict[int, List[int]] = {}
+        for group in self.groups:
+            code = group.codes[position]
+            if code < 0:
+                continue
+            tally = counts.setdefault(code, [0, group.first_row])
+            tally[0] += group.count
+            tally[1] = min(tally[1], group.first_row)
+        ranked = sorted(counts.items(), key=lambda item: (-item[1][0], item[1][1]))
+        return {categories[code]: count for code, (count, _) in ranked}
+
+
+class MarketCube:
+    """
+    Group aggregates of source (or of the given rows of it) by dimensions, built in one grouped pass.
+    Dimensions are read through the source's encoded columns and metrics as numbers.
+    """
+
+    def __init__(self, source: ColumnSource, dimensions: Sequence[str], metrics: Sequence[str] = (),
+                 rows: Optional[np.ndarray] = None):
+        self.dimensions = tuple(dimensions)
+        self.metrics = tuple(metrics)
+        encoded = {dimension: source.encoded(dimension) for dimension in self.dimensions}
+        self.categories = {dimension: column.categories for dimension, column in encoded.items()}
+        self.groups: List[MarketGroup] = []
+
+        rows = np.arange(len(source)) if rows is None else np.asarray(rows, dtype=np.intp)
+        if not len(rows):
+            return
+        keys = np.stack([encoded[dimension].codes[rows] for dimension in self.dimensions] or
+                        [np.zeros(len(rows), dtype=np.int32)], axis=1)
+        values = {metric: as_numbers(source.column(metric))[rows].astype(np.float64) for metric in self.metrics}
+
+        # Rows grouped by key, each group in catalog order
+        group_of_row = np.unique(keys, axis=0, return_inverse=True)[1].ravel()
+        order = np.argsort(group_of_row, kind='stable')
+        boundaries = np.flatnonzero(np.diff(group_of_row[order])) + 1
+        for members in np.split(order, boundaries):
+            self.groups.append(MarketGroup(
+                codes=tuple(keys[members[0]].tolist()[:len(self.dimensions)]),
+                count=len(members),
+                first_row=int(rows[members[0]]),
+                metrics={metric: MetricSummary.of(column[members]) for metric, column in values.items()}
+            ))
+
+    def select(self, selection: Optional[Dict[str, Sequence[Any]]] = None) -> MarketSlice:
+        """Groups whose value of each selected dimension is one of the selected values (all groups for none)"""
+        wanted = {}
+        for dimension, accepted in (selection or {}).items():
+            accepted = set(accepted)
+            wanted[self.dimensions.index(dimension)] = {
+                code for code, category in enumerate(self.categories[dimension]) if category in accepted}
+        return MarketSlice(self, [group for group in self.groups
+                                  if all(group.codes[position] in codes for position, codes in wanted.items())])
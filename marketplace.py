@@ -1,9 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import re
 import json
 from datetime import datetime
 import uuid
+from airport_data import get_airport_table
+from distance_service import DISTANCE_SERVICE
 
 # Create blueprint
 marketplace = Blueprint('marketplace', __name__, url_prefix='/marketplace')
@@ -256,6 +259,20 @@ def recommend_aircraft(listings, criteria=None):
 
     return results
 
+# Airport code in a listing location such as "Dallas, TX (KDAL)"
+LOCATION_AIRPORT_CODE = re.compile(r'\(([A-Za-z0-9]{3,4})\)')
+
+
+def resolve_airport(text, airports):
+    """Airport table row of an IATA/ICAO code, or of the code in a "City (CODE)" location; None if unknown"""
+    text = (text or '').strip()
+    row = airports.search_index.row_for_code(text)
+    if row is None:
+        match = LOCATION_AIRPORT_CODE.search(text)
+        if match:
+            row = airports.search_index.row_for_code(match.group(1))
+    return row
+
 # Routes
 
 
@@ -294,15 +311,23 @@ def listings():
 
     # Filter by trip distance if origin and destination are provided
     if criteria['trip_origin'] and criteria['trip_destination'] and criteria['trip_origin'] != criteria['trip_destination']:
-        # In a real app, we would calculate the actual distance between airports
-        # For now, we'll just use the min_range as a proxy for trip distance filtering
-        pass
+        # Aircraft must fly the great-circle trip nonstop (unknown airports leave the filter off)
+        trip_distance = DISTANCE_SERVICE.distance_nm(criteria['trip_origin'], criteria['trip_destination'])
+        if trip_distance is not None:
+            filtered_listings = [listing for listing in filtered_listings
+                                 if (listing.get('range') or 0) >= trip_distance]
 
     # Filter by home airport range if specified
     if criteria['home_airport'] and criteria['max_distance'] and int(criteria['max_distance']) > 0:
-        # In a real app, we would filter based on aircraft range vs. home airport
-        # For now, we use min_range from the criteria
-        pass
+        # Aircraft based within max_distance NM of the home airport (one radius query, then a set lookup per listing)
+        airports = get_airport_table()
+        home = resolve_airport(criteria['home_airport'], airports)
+        if home is not None:
+            nearby, _ = airports.spatial_index.within(airports.lat[home], airports.lon[home],
+                                                      int(criteria['max_distance']))
+            nearby = set(nearby.tolist())
+            filtered_listings = [listing for listing in filtered_listings
+                                 if resolve_airport(listing.get('location'), airports) in nearby]
 
     # Generate aircraft recommendations by calling recommend_aircraft for the whole list
     recommendations = recommend_aircraft(filtered_listings, criteria)
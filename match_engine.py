@@ -0,0 +1,243 @@
+"""
+Batched Buyer Match Scores for Jet Finder
+Parses a buyer_preferences row once, keeps per-listing match features (airframe hours, engine hours
+remaining, avionics text and families, condition ranks, last annual date) as arrays, and scores every
+listing in one vectorized pass with the same rules as app.calculate_match_score and its components
+"""
+
+import numbers
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+from listing_scoring import engine_tbo
+
+# Match components, in weighting order
+MATCH_COMPONENTS = ('hours', 'engine', 'avionics', 'interior', 'maintenance', 'paint')
+
+# Score of a component (or of the whole match) that cannot be computed
+DEFAULT_MATCH_SCORE = 50
+
+# Text condition ratings compared against min_interior_rating / min_paint_rating
+CONDITION_RATINGS = {
+    'excellent': 5,
+    'very good': 4,
+    'good': 3,
+    'fair': 2,
+    'poor': 1,
+    '': 0
+}
+
+# Avionics families: a preferred variant partially matches any other variant of its family
+AVIONICS_FAMILIES = {
+    'garmin': ['g5000', 'g3000', 'g1000', 'perspective'],
+    'collins': ['pro line fusion', 'pro line 21'],
+    'honeywell': ['symmetry', 'easy iii', 'ace']
+}
+
+# Average days per month used for maintenance recency
+DAYS_PER_MONTH = 30.44
+
+
+def _number(value: Any) -> float:
+    """Numeric listing field (missing/falsy counts as 0); NaN marks a value the scalar rules fail on"""
+    value = value or 0
+    return float(value) if isinstance(value, numbers.Real) else np.nan
+
+
+def _condition_rank(value: Any) -> float:
+    """CONDITION_RATINGS rank of a condition text; NaN when the field is not text"""
+    return CONDITION_RATINGS.get(value.lower(), 0) if isinstance(value, str) else np.nan
+
+
+def _engine_remaining(listing: Dict[str, Any]) -> float:
+    """Engine hours remaining before overhaul; NaN when hours or engine model are unusable"""
+    hours = _number(listing.get('engine_1_time_since_new', 0))
+    model = listing.get('engine_1_model', '')
+    if np.isnan(hours) or not isinstance(model, str):
+        return np.nan
+    return max(0, engine_tbo(model) - hours)
+
+
+def _annual_date(value: Any) -> Optional[datetime]:
+    """Parsed last annual inspection date, or None when missing or unreadable"""
+    if isinstance(value, str) and value:
+        try:
+            return datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            return None
+    # Timezone-aware dates cannot be compared with the naive current time
+    return value if isinstance(value, datetime) and value.tzinfo is None else None
+
+
+class ListingMatchFeatures:
+    """Per-listing match inputs, extracted once per dataset and aligned with its listings"""
+
+    def __init__(self, listings: Iterable[Dict[str, Any]]):
+        self.listings = list(listings)
+        self.total = len(self.listings)
+        self.hours = np.array([_number(l.get('airframe_total_time', 0)) for l in self.listings])
+        self.engine_remaining = np.array([_engine_remaining(l) for l in self.listings], dtype=np.float64)
+        self.interior_rank = np.array([_condition_rank(l.get('interior_condition', '')) for l in self.listings])
+        self.paint_rank = np.array([_condition_rank(l.get('exterior_condition', '')) for l in self.listings])
+
+        # Lowercased avionics text (None where the field is not text) and the families it mentions
+        self.avionics: List[Optional[str]] = []
+        for listing in self.listings:
+            description = listing.get('avionics_description', '') or ''
+            self.avionics.append(description.lower() if isinstance(description, str) else None)
+        self.avionics_families = {
+            family: np.array([text is not None and any(variant in text for variant in variants)
+                              for text in self.avionics], dtype=bool)
+            for family, variants in AVIONICS_FAMILIES.items()
+        }
+
+        annual_dates = [_annual_date(l.get('last_annual_date')) for l in self.listings]
+        self.has_annual = np.array([date is not None for date in annual_dates], dtype=bool)
+        self.annual = np.array([np.datetime64(date, 'us') if date is not None else np.datetime64('NaT')
+                                for date in annual_dates], dtype='datetime64[us]')
+
+    def days_since_annual(self, now: datetime) -> np.ndarray:
+        """Whole days since each listing's last annual (floored like timedelta.days; NaN when unknown)"""
+        days = (np.datetime64(now, 'us') - self.annual) // np.timedelta64(1, 'D')
+        return np.where(self.has_annual, days, np.nan)
+
+
+class BuyerPreferences:
+    """A buyer_preferences row parsed once: targets per component plus normalized weights"""
+
+    def __init__(self, preferences: Optional[Dict[str, Any]]):
+        preferences = preferences or {}
+        self.empty = not preferences
+        self.max_total_hours = self._target(preferences.get('max_total_hours', 0))
+        self.min_engine_hours_remaining = self._target(preferences.get('min_engine_hours_remaining', 0))
+        self.min_interior_rating = self._target(preferences.get('min_interior_rating', 0))
+        self.max_maintenance_age_months = self._target(preferences.get('max_maintenance_age_months', 0))
+        self.min_paint_rating = self._target(preferences.get('min_paint_rating', 0))
+        preferred_avionics = preferences.get('preferred_avionics', '')
+        # Non-text preference fails the avionics component (scored DEFAULT_MATCH_SCORE)
+        self.preferred_avionics = preferred_avionics.lower() if isinstance(preferred_avionics, str) else np.nan
+
+        raw_weights = [
+            preferences.get('engine_hours_weight', 0.2),  # hours
+            preferences.get('engine_hours_weight', 0.2),  # engine
+            preferences.get('avionics_weight', 0.2),
+            preferences.get('interior_weight', 0.2),
+            preferences.get('maintenance_weight', 0.2),
+            preferences.get('paint_weight', 0.2)
+        ]
+        if all(isinstance(weight, numbers.Real) for weight in raw_weights):
+            total_weight = sum(raw_weights)
+            self.weights = [weight / total_weight for weight in raw_weights] if total_weight > 0 else raw_weights
+        else:
+            self.weights = None  # Unusable weights: every listing gets DEFAULT_MATCH_SCORE
+
+    @staticmethod
+    def _target(value: Any):
+        """None for 'no preference', the number itself, or NaN when it cannot be compared"""
+        if not value:
+            return None
+        return value if isinstance(value, numbers.Real) else np.nan
+
+    def fingerprint_parts(self) -> Dict[str, Any]:
+        """Everything the scores depend on, for cache keys"""
+        return {
+            'empty': self.empty,
+            'targets': [self.max_total_hours, self.min_engine_hours_remaining, self.min_interior_rating,
+                        self.max_maintenance_age_months, self.min_paint_rating],
+            'avionics': self.preferred_avionics,
+            'weights': self.weights
+        }
+
+
+def _is_error(target) -> bool:
+    return isinstance(target, float) and np.isnan(target)
+
+
+def _hours_match(features: ListingMatchFeatures, max_hours) -> np.ndarray:
+    hours = features.hours
+    if max_hours > 0:
+        within = np.maximum(80, 100 - (hours / max_hours * 20))
+        over = np.maximum(0, 80 - ((hours - max_hours) / max_hours * 80))
+    else:
+        within = np.maximum(80, 100 - (np.zeros_like(hours) * 20))
+        over = np.maximum(0, 80 - (np.ones_like(hours) * 80))
+    return np.where(np.isnan(hours), DEFAULT_MATCH_SCORE, np.where(hours <= max_hours, within, over))
+
+
+def _engine_match(features: ListingMatchFeatures, min_remaining) -> np.ndarray:
+    remaining = features.engine_remaining
+    ratio = remaining / min_remaining if min_remaining > 0 else np.zeros_like(remaining)
+    scores = np.where(remaining >= min_remaining, 100, np.maximum(0, ratio * 100))
+    return np.where(np.isnan(remaining), DEFAULT_MATCH_SCORE, scores)
+
+
+def _avionics_match(features: ListingMatchFeatures, preferred: str) -> np.ndarray:
+    exact = np.array([text is not None and preferred in text for text in features.avionics], dtype=bool)
+    family = np.zeros(features.total, dtype=bool)
+    for name, variants in AVIONICS_FAMILIES.items():
+        if preferred in variants:
+            family |= features.avionics_families[name]
+    invalid = np.array([text is None for text in features.avionics], dtype=bool)
+    return np.where(invalid, DEFAULT_MATCH_SCORE, np.where(exact, 100, np.where(family, 80, 20)))
+
+
+def _rating_match(ranks: np.ndarray, min_rating) -> np.ndarray:
+    scores = np.where(ranks >= min_rating, 100, np.where(ranks > 0, ranks / min_rating * 100, 0))
+    return np.where(np.isnan(ranks), DEFAULT_MATCH_SCORE, scores)
+
+
+def _maintenance_match(features: ListingMatchFeatures, max_age_months, now: datetime) -> np.ndarray:
+    months_since = features.days_since_annual(now) / DAYS_PER_MONTH
+    scores = np.where(months_since <= max_age_months, 100,
+                      np.maximum(0, 100 - ((months_since - max_age_months) / max_age_months * 100)))
+    # Missing or unreadable annual dates score 0
+    return np.where(features.has_annual, scores, 0)
+
+
+class MatchScores:
+    """Weighted match score and per-component scores for every listing of a ListingMatchFeatures"""
+
+    def __init__(self, features: ListingMatchFeatures, preferences: BuyerPreferences,
+                 now: Optional[datetime] = None):
+        self.features = features
+        self.preferences = preferences
+        now = now or datetime.now()
+        total = features.total
+
+        # components[i, c]: listing i's score for MATCH_COMPONENTS[c]
+        self.components = np.full((total, len(MATCH_COMPONENTS)), 100.0)
+        targets = [
+            (preferences.max_total_hours, lambda t: _hours_match(features, t)),
+            (preferences.min_engine_hours_remaining, lambda t: _engine_match(features, t)),
+            (preferences.preferred_avionics or None, lambda t: _avionics_match(features, t)),
+            (preferences.min_interior_rating, lambda t: _rating_match(features.interior_rank, t)),
+            (preferences.max_maintenance_age_months, lambda t: _maintenance_match(features, t, now)),
+            (preferences.min_paint_rating, lambda t: _rating_match(features.paint_rank, t)),
+        ]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for c, (target, score) in enumerate(targets):
+                if target is None:
+                    continue  # No preference specified
+                self.components[:, c] = DEFAULT_MATCH_SCORE if _is_error(target) else score(target)
+
+        if preferences.empty or preferences.weights is None:
+            self.scores = np.full(total, float(DEFAULT_MATCH_SCORE))
+        else:
+            weighted = self.components[:, 0] * preferences.weights[0]
+            for c in range(1, len(MATCH_COMPONENTS)):
+                weighted = weighted + self.components[:, c] * preferences.weights[c]
+            self.scores = np.clip(weighted, 0, 100)
+
+    def __len__(self) -> int:
+        return self.features.total
+
+    def component_scores(self, index: int) -> Dict[str, float]:
+        """{'hours_match': ..., ...} for one listing"""
+        return {f'{name}_match': float(self.components[index, c]) for c, name in enumerate(MATCH_COMPONENTS)}
+
+
+def score_matches(features: ListingMatchFeatures, preferences: Optional[Dict[str, Any]],
+                  now: Optional[datetime] = None) -> MatchScores:
+    """Match scores of every listing in features against one buyer_preferences row"""
+    return MatchScores(features, BuyerPreferences(preferences), now)
@@ -0,0 +1,177 @@
+"""
+Mission Planner for Jet Finder
+Multi-leg routings for trips longer than an aircraft's range: A* over a pruned airport graph whose
+nodes are the fuel-stop airports near the great circle (found through the spatial index) and whose
+edges are the hops within the aircraft's usable leg range. Routings are cached per range bucket,
+origin, destination and stop penalty, so aircraft of similar range share one search.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from airport_data import AirportTable, get_airport_table, haversine_nm
+from route_feasibility import RANGE_RESERVE
+from score_cache import ScoreCache, query_fingerprint
+
+# Fuel stops are looked for within this multiple of the direct distance (origin -> stop -> destination)
+MAX_DETOUR = 1.5
+# Aircraft ranges are rounded down to this step, so one cached routing serves a whole bucket safely
+RANGE_BUCKET_NM = 100
+# Stop penalties (in NM-equivalents) are rounded to this step in cache keys
+PENALTY_BUCKET_NM = 25
+# Ground time and fees (landing, handling, ramp) of one intermediate fuel stop
+FUEL_STOP_MINUTES = 45
+FUEL_STOP_FEE = 1500.0
+# Airport sizes tried for fuel stops, most suitable first (large airports, then any)
+FUEL_STOP_SIZES = (('L',), None)
+
+OBJECTIVES = ('time', 'cost')
+
+
+def range_bucket(range_nm: float) -> int:
+    return int(max(range_nm, 0.0) // RANGE_BUCKET_NM * RANGE_BUCKET_NM)
+
+
+class MissionPlanner:
+    """Minimum-time or minimum-cost routings with fuel stops over the shared airport table"""
+
+    def __init__(self, table: Callable[[], AirportTable] = get_airport_table, max_entries: int = 2048):
+        self._table = table
+        self.cache = ScoreCache(max_entries=max_entries)
+
+    def _stop_candidates(self, table: AirportTable, origin: int, destination: int, direct: float,
+                         sizes: Optional[Tuple[str, ...]]) -> np.ndarray:
+        """Airports inside the detour ellipse of the trip (origin and destination first)"""
+        limit = direct * MAX_DETOUR
+        rows, from_origin = table.spatial_index.within(table.lat[origin], table.lon[origin], limit)
+        to_destination = haversine_nm(table.lat[rows], table.lon[rows], table.lat[destination], table.lon[destination])
+        keep = (from_origin + to_destination <= limit) & (rows != origin) & (rows != destination)
+        if sizes is not None:
+            size = table.text['size']
+            keep &= np.array([size[row] in sizes for row in rows.tolist()], dtype=bool)
+        return np.concatenate([[origin, destination], rows[keep]]).astype(np.intp)
+
+    def _search(self, table: AirportTable, origin: int, destination: int, leg_nm: float,
+                stop_penalty_nm: float, sizes: Optional[Tuple[str, ...]]) -> Optional[List[int]]:
+        """
+        A* over the candidate airports: a hop costs its distance, plus stop_penalty_nm when it lands
+        short of the destination. The heuristic (remaining distance plus the stops it needs at least)
+        never overestimates, so the first time the destination is popped its routing is optimal.
+        """
+        direct = float(haversine_nm(table.lat[origin], table.lon[origin], table.lat[destination], table.lon[destination]))
+        nodes = self._stop_candidates(table, origin, destination, direct, sizes)
+        lat, lon = table.lat[nodes], table.lon[nodes]
+        remaining = haversine_nm(lat, lon, table.lat[destination], table.lon[destination])
+        min_stops = np.maximum(np.ceil(remaining / leg_nm) - 1, 0)
+        estimate = remaining + min_stops * stop_penalty_nm
+
+        # Node 0 is the origin, node 1 the destination
+        best = np.full(len(nodes), np.inf)
+        previous = np.full(len(nodes), -1, dtype=np.intp)
+        closed = np.zeros(len(nodes), dtype=bool)
+        best[0] = 0.0
+        frontier = [(estimate[0], 0)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            if closed[node]:
+                continue
+            if node == 1:
+                path = [1]
+                while path[-1] != 0:
+                    path.append(int(previous[path[-1]]))
+                return [int(nodes[position]) for position in reversed(path)]
+            closed[node] = True
+
+            hops = haversine_nm(lat[node], lon[node], lat, lon)
+            cost = best[node] + hops + stop_penalty_nm
+            cost[1] -= stop_penalty_nm
+            better = (hops <= leg_nm) & ~closed & (cost < best)
+            for neighbour in np.flatnonzero(better).tolist():
+                best[neighbour] = cost[neighbour]
+                previous[neighbour] = node
+                heapq.heappush(frontier, (cost[neighbour] + estimate[neighbour], neighbour))
+        return None
+
+    def routing(self, origin: int, destination: int, range_nm: float, stop_penalty_nm: float,
+                reserve: float = RANGE_RESERVE) -> Tuple[int, ...]:
+        """Airport rows of the best routing for an aircraft range (empty when there is none), cached"""
+        bucket = range_bucket(range_nm)
+        penalty = round(stop_penalty_nm / PENALTY_BUCKET_NM) * PENALTY_BUCKET_NM
+        key = query_fingerprint(range_bucket=bucket, origin=origin, destination=destination,
+                                stop_penalty=penalty, reserve=reserve)
+
+        def search() -> Tuple[int, ...]:
+            leg_nm = bucket / reserve
+            if origin == destination or leg_nm <= 0:
+                return ()
+            table = self._table()
+            for sizes in FUEL_STOP_SIZES:
+                path = self._search(table, origin, destination, leg_nm, penalty, sizes)
+                if path is not None:
+                    return tuple(path)
+            return ()
+
+        return self.cache.get_or_compute(key, search)
+
+    @staticmethod
+    def _code(table: AirportTable, row: int) -> str:
+        return table.text['iata'][row] or table.text['icao'][row]
+
+    def plan(self, departure: str, arrival: str, range_nm: float, speed_kts: float, hourly_cost: float,
+             objective: str = 'time', reserve: float = RANGE_RESERVE) -> Optional[Dict[str, Any]]:
+        """
+        Minimum-time (flight plus ground time) or minimum-cost (flight hours plus stop fees) routing
+        of one aircraft between two airports. Returns None when either airport is unknown; a plan
+        with feasible=False when the aircraft cannot reach the destination at all.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+        if speed_kts <= 0:
+            raise ValueError('speed_kts must be positive')
+        table = self._table()
+        index = table.search_index
+        origin, destination = index.row_for_code(departure), index.row_for_code(arrival)
+        if origin is None or destination is None:
+            return None
+
+        # A stop is worth the distance the aircraft covers in its ground time (or for its fees)
+        if objective == 'time' or hourly_cost <= 0:
+            stop_penalty_nm = FUEL_STOP_MINUTES / 60.0 * speed_kts
+        else:
+            stop_penalty_nm = FUEL_STOP_FEE / hourly_cost * speed_kts
+        rows = self.routing(origin, destination, range_nm, stop_penalty_nm, reserve)
+
+        plan = {
+            'departure_airport': self._code(table, origin),
+            'arrival_airport': self._code(table, destination),
+            'objective': objective,
+            'range_nm': range_nm,
+            'usable_leg_nm': round(range_bucket(range_nm) / reserve, 1),
+            'feasible': bool(rows)
+        }
+        if not rows:
+            return plan
+
+        path = np.array(rows, dtype=np.intp)
+        distances = haversine_nm(table.lat[path[:-1]], table.lon[path[:-1]], table.lat[path[1:]], table.lon[path[1:]])
+        stops = len(rows) - 2
+        flight_hours = float(distances.sum()) / speed_kts
+        ground_hours = stops * FUEL_STOP_MINUTES / 60.0
+        plan.update({
+            'legs': [{'from': self._code(table, first), 'to': self._code(table, second),
+                      'distance_nm': round(distance, 1), 'flight_hours': round(distance / speed_kts, 2)}
+                     for first, second, distance in zip(rows, rows[1:], distances.tolist())],
+            'fuel_stops': [table.record(row) for row in rows[1:-1]],
+            'stops': stops,
+            'total_distance_nm': round(float(distances.sum()), 1),
+            'flight_hours': round(flight_hours, 2),
+            'ground_hours': round(ground_hours, 2),
+            'total_hours': round(flight_hours + ground_hours, 2),
+            'estimated_cost': round(flight_hours * max(hourly_cost, 0.0) + stops * FUEL_STOP_FEE, 0)
+        })
+        return plan
+
+
+# Process-wide mission planner over the shared airport table
+MISSION_PLANNER = MissionPlanner()
@@ -0,0 +1,117 @@
+"""
+Route Feasibility Matrix for Jet Finder
+For a set of airports (a buyer's usual destinations, a charter operator's network, ...), the distance
+matrix is computed once and every aircraft's nonstop feasibility on every airport pair is packed into
+one bitset row per route. "Which aircraft can fly all of these routes" is then an AND of bitset rows.
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from airport_data import AirportTable, haversine_nm
+from scoring_engine import AircraftFleet
+
+# Range needed per NM of route: 20% reserve for winds, alternates and holding
+RANGE_RESERVE = 1.2
+
+
+class RouteFeasibility:
+    """
+    Nonstop feasibility of every aircraft of a fleet on every pair of a set of airports.
+    bits[route] is the packed (little-endian) bitset over fleet rows of the aircraft able to fly it.
+    runway_lengths (feet per airport, when runway data is available) also require the aircraft's
+    runway_length to fit the shorter runway of the pair.
+    """
+
+    def __init__(self, fleet: AircraftFleet, airports: AirportTable, codes: Sequence[str],
+                 reserve: float = RANGE_RESERVE, runway_lengths: Optional[Dict[str, float]] = None):
+        self.size = len(fleet)
+        self.reserve = reserve
+        index = airports.search_index
+
+        # Known airports in the order given (duplicates and unknown codes dropped)
+        self.codes: List[str] = []
+        self.unknown: List[str] = []
+        rows = []
+        for code in dict.fromkeys(str(code).strip().upper() for code in codes):
+            row = index.row_for_code(code)
+            if row is None:
+                self.unknown.append(code)
+            else:
+                self.codes.append(code)
+                rows.append(row)
+        self._position = {code: position for position, code in enumerate(self.codes)}
+
+        # Distance matrix, then one route per unordered pair
+        lat, lon = airports.lat[rows], airports.lon[rows]
+        self.distances = haversine_nm(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+        first, second = np.triu_indices(len(rows), k=1)
+        self._route = {(int(a), int(b)): route for route, (a, b) in enumerate(zip(first.tolist(), second.tolist()))}
+
+        required = self.distances[first, second] * reserve
+        feasible = fleet.column('range')[None, :] >= required[:, None]
+        if runway_lengths:
+            runways = np.array([runway_lengths.get(code, np.inf) for code in self.codes], dtype=np.float64)
+            shorter = np.minimum(runways[first], runways[second])
+            feasible &= fleet.column('runway_length')[None, :] <= shorter[:, None]
+        self.bits = np.packbits(feasible, axis=1, bitorder='little')
+        self.bits.setflags(write=False)
+
+    def route_id(self, departure: str, arrival: str) -> Optional[int]:
+        """Route row of an airport pair (either direction), or None for an unknown or same-airport pair"""
+        first = self._position.get(str(departure).strip().upper())
+        second = self._position.get(str(arrival).strip().upper())
+        if first is None or second is None or first == second:
+            return None
+        return self._route[(min(first, second), max(first, second))]
+
+    def distance_nm(self, departure: str, arrival: str) -> Optional[float]:
+        if self.route_id(departure, arrival) is None:
+            return None
+        first = self._position[str(departure).strip().upper()]
+        second = self._position[str(arrival).strip().upper()]
+        return float(self.distances[first, second])
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Airport pairs in route order"""
+        return [(self.codes[first], self.codes[second]) for first, second in self._route]
+
+    def _rows(self, bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(bits, count=self.size, bitorder='little'))
+
+    def aircraft_for_route(self, departure: str, arrival: str) -> np.ndarray:
+        """Fleet rows able to fly one route nonstop (none for an unknown route)"""
+        route = self.route_id(departure, arrival)
+        return np.zeros(0, dtype=np.intp) if route is None else self._rows(self.bits[route])
+
+    def aircraft_for_routes(self, pairs: Optional[Sequence[Tuple[str, str]]] = None) -> np.ndarray:
+        """Fleet rows able to fly every route nonstop (every pair of the airports when pairs is None)"""
+        if pairs is None:
+            routes = list(range(len(self.bits)))
+        else:
+            routes = [self.route_id(departure, arrival) for departure, arrival in pairs]
+            if any(route is None for route in routes):
+                return np.zeros(0, dtype=np.intp)
+        if not routes:
+            return np.arange(self.size)
+        return self._rows(np.bitwise_and.reduce(self.bits[routes], axis=0))
+
+    def routes_served(self, fleet_row: int) -> List[Tuple[str, str]]:
+        """Airport pairs one aircraft can fly nonstop"""
+        byte, bit = divmod(fleet_row, 8)
+        served = np.flatnonzero(self.bits[:, byte] & (1 << bit))
+        pairs = self.pairs()
+        return [pairs[route] for route in served.tolist()]
+
+    def coverage(self) -> np.ndarray:
+        """Number of the routes each aircraft can fly nonstop (per fleet row)"""
+        return np.unpackbits(self.bits, axis=1, count=self.size, bitorder='little').sum(axis=0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'airports': self.codes,
+            'unknown_airports': self.unknown,
+            'routes': len(self.bits),
+            'reserve': self.reserve,
+            'aircraft': self.size
+        }
@@ -0,0 +1,94 @@
+"""
+Score Result Cache for Jet Finder
+Thread-safe in-process LRU cache (with optional TTL) for ranked results, keyed by a canonical
+fingerprint of the query that produced them
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable
+
+
+def query_fingerprint(**parts: Any) -> str:
+    """
+    Canonical hash of query parts (filters, priorities, sort, ...).
+    Dicts are serialized with sorted keys so equivalent queries share a fingerprint.
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class ScoreCache:
+    """LRU cache of computed rankings with hit/miss counters"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used one is evicted
+            ttl_seconds: Optional entry lifetime; None keeps entries until evicted or invalidated
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computing and storing it on a miss (computed outside the lock)"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self):
+        """Drop every entry (e.g. after the aircraft dataset is reloaded)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
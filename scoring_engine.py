@@ -0,0 +1,345 @@
+"""
+Vectorized Scoring Engine for Jet Finder
+Holds the aircraft fleet as typed column arrays and scores every aircraft in one batched pass
+using the same strict 50/50 spreadsheet/priority methodology as app.calculate_final_recommendation_score
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Iterable, Mapping, Tuple, Callable
+
+
+# The 5 per-dollar spreadsheet metrics averaged into the spreadsheet score
+SPREADSHEET_METRICS = [
+    'normalized_speed_dollar',
+    'normalized_range_dollar',
+    'normalized_performance_dollar',
+    'normalized_efficiency_dollar',
+    'best_all_around_dollar'
+]
+
+# Metrics where a lower raw value is the better aircraft
+LOWER_IS_BETTER_METRICS = frozenset([
+    'price', 'total_hourly_cost', 'hourly_variable_cost',
+    'cost_per_mile', 'cost_per_seat_mile', 'runway_length',
+    'depreciation_rate', 'variable_cost_per_seat',
+    'variable_cost_per_mile', 'variable_cost_per_seat_mile'
+])
+
+
+def _numeric_or_nan(value: Any) -> float:
+    """Column cell conversion: None becomes NaN (metric skipped), non-numeric becomes 0"""
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    return 0.0
+
+
+class AircraftFleet:
+    """
+    Column-oriented view over a list of aircraft records.
+    Columns are materialized lazily as float64 arrays and cached for the lifetime of the fleet.
+    column_source (e.g. AircraftStore.column) supplies columns directly instead of reading every record.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]],
+                 column_source: Optional[Callable[[str], np.ndarray]] = None):
+        self.records: List[Dict[str, Any]] = list(records)
+        self._column_source = column_source
+        self._columns: Dict[str, np.ndarray] = {}
+        self._indexes: Dict[str, tuple] = {}
+        self._row_by_id = {record.get('id'): row for row, record in enumerate(self.records)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, key: str) -> np.ndarray:
+        """Get a metric as a float64 array (NaN where the record holds None)"""
+        values = self._columns.get(key)
+        if values is None:
+            if self._column_source is not None:
+                values = np.asarray(self._column_source(key), dtype=np.float64)
+            else:
+                values = np.fromiter(
+                    (_numeric_or_nan(record.get(key, 0)) for record in self.records),
+                    dtype=np.float64,
+                    count=len(self.records)
+                )
+            values.setflags(write=False)
+            self._columns[key] = values
+        return values
+
+    def sorted_index(self, key: str) -> tuple:
+        """
+        Get (order, sorted_values, rank, valid_count) for a metric, built once and cached.
+        order lists rows by ascending value (NaN last), rank[row] is the row's position in order.
+        """
+        index = self._indexes.get(key)
+        if index is None:
+            values = self.column(key)
+            order = np.argsort(values, kind='stable')
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            sorted_values = values[order]
+            for array in (order, rank, sorted_values):
+                array.setflags(write=False)
+            index = (order, sorted_values, rank, int(np.count_nonzero(~np.isnan(values))))
+            self._indexes[key] = index
+        return index
+
+    def rows_for(self, records: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """Map a (filtered) list of fleet records back to their row indices"""
+        return np.fromiter(
+            (self._row_by_id[record.get('id')] for record in records),
+            dtype=np.intp
+        )
+
+    def row_for_id(self, aircraft_id: Any) -> Optional[int]:
+        """Row index of the aircraft with this id, or None"""
+        return self._row_by_id.get(aircraft_id)
+
+    def all_rows(self) -> np.ndarray:
+        return np.arange(len(self.records), dtype=np.intp)
+
+
+def metric_bounds(values: np.ndarray) -> tuple:
+    """
+    Get (min, max) over the positive values of a metric column.
+    Mirrors app.get_metric_bounds: (0, 1) when nothing is valid, widened by 1 when flat.
+    """
+    valid = values[values > 0]
+    if valid.size == 0:
+        return (0, 1)
+    min_val = valid.min().item()
+    max_val = valid.max().item()
+    if min_val == max_val:
+        return (min_val, max_val + 1)
+    return (min_val, max_val)
+
+
+@dataclass(frozen=True)
+class ScoringContext:
+    """
+    Immutable normalization context for one scoring request.
+    Carries the population aircraft are compared against, its per-metric (min, max) bounds and the
+    metrics where lower is better, so scoring never depends on module-level state and is safe to
+    share across threads.
+    """
+    population: Tuple[Dict[str, Any], ...]
+    bounds: Mapping[str, tuple] = field(default_factory=lambda: MappingProxyType({}))
+    inverted_metrics: frozenset = LOWER_IS_BETTER_METRICS
+
+    @classmethod
+    def from_fleet(cls, fleet: AircraftFleet, rows: Optional[np.ndarray] = None,
+                   metrics: Iterable[str] = ()) -> 'ScoringContext':
+        """Build a context over fleet rows (default: whole fleet), precomputing bounds for metrics"""
+        if rows is None:
+            rows = fleet.all_rows()
+        bounds = {}
+        for metric_key in metrics:
+            bounds[metric_key] = metric_bounds(fleet.column(metric_key)[rows])
+        return cls(
+            population=tuple(fleet.records[row] for row in rows),
+            bounds=MappingProxyType(bounds)
+        )
+
+    def bounds_for(self, metric_key: str) -> tuple:
+        """Precomputed bounds for a metric, falling back to a scan of the population"""
+        bounds = self.bounds.get(metric_key)
+        if bounds is not None:
+            return bounds
+        values = [
+            value for value in (aircraft.get(metric_key, 0) for aircraft in self.population)
+            if value is not None and value > 0
+        ]
+        if not values:
+            return (0, 1)
+        min_val = min(values)
+        max_val = max(values)
+        if min_val == max_val:
+            return (min_val, max_val + 1)
+        return (min_val, max_val)
+
+    def is_lower_better(self, metric_key: str) -> bool:
+        return metric_key in self.inverted_metrics
+
+
+def normalize_column(metric_key: str, values: np.ndarray, bounds: tuple,
+                     inverted_metrics: frozenset = LOWER_IS_BETTER_METRICS) -> np.ndarray:
+    """Vectorized normalize_metric_to_percentage: 0-100, higher is always better, 0 for missing values"""
+    min_val, max_val = bounds
+    span = max_val - min_val
+    with np.errstate(invalid='ignore'):
+        if metric_key in inverted_metrics:
+            normalized = ((max_val - values) / span) * 100
+        else:
+            normalized = ((values - min_val) / span) * 100
+        normalized = np.clip(normalized, 0, 100)
+        return np.where(values > 0, normalized, 0.0)
+
+
+def spreadsheet_scores(fleet: AircraftFleet, rows: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_spreadsheet_score: average of the valid per-dollar metrics scaled by 10"""
+    total = np.zeros(len(rows), dtype=np.float64)
+    count = np.zeros(len(rows), dtype=np.int64)
+    for metric in SPREADSHEET_METRICS:
+        values = fleet.column(metric)[rows]
+        with np.errstate(invalid='ignore'):
+            valid = values > 0
+        total += np.where(valid, np.clip(values * 10, 0, 100), 0.0)
+        count += valid
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+    return np.clip(scores, 0, 100)
+
+
+class ScoreBatch:
+    """Scores for a batch of fleet rows, with per-row result dicts built on demand"""
+
+    def __init__(self, fleet: AircraftFleet, rows: np.ndarray, priorities: Dict[str, Any],
+                 final_score, spreadsheet_score, priority_score, all_around_score, normalized):
+        self.fleet = fleet
+        self.rows = rows
+        self.priorities = priorities
+        self.final_score = final_score
+        self.spreadsheet_score = spreadsheet_score
+        self.priority_score = priority_score
+        self.all_around_score = all_around_score
+        self.normalized = normalized
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def aircraft(self, i: int) -> Dict[str, Any]:
+        return self.fleet.records[self.rows[i]]
+
+    def breakdown(self, i: int) -> Dict[str, Any]:
+        """Same breakdown dict as calculate_final_recommendation_score, without rescanning the dataset"""
+        aircraft = self.aircraft(i)
+        spreadsheet_score = float(self.spreadsheet_score[i])
+        priority_score = float(self.priority_score[i])
+        final_score = float(self.final_score[i])
+        priority_components = {}
+        for metric_key, weight in self.priorities.items():
+            normalized_score = float(self.normalized[metric_key][i])
+            priority_components[metric_key] = {
+                'raw_value': aircraft.get(metric_key, 0),
+                'normalized_score': normalized_score,
+                'weight': weight,
+                'weighted_score': normalized_score * weight
+            }
+        return {
+            'calculation': f"({spreadsheet_score:.1f} × 0.5) + ({priority_score:.1f} × 0.5) = {final_score:.1f}",
+            'spreadsheet_components': {
+                'speed_per_dollar': aircraft.get('normalized_speed_dollar', 0),
+                'range_per_dollar': aircraft.get('normalized_range_dollar', 0),
+                'performance_per_dollar': aircraft.get('normalized_performance_dollar', 0),
+                'efficiency_per_dollar': aircraft.get('normalized_efficiency_dollar', 0),
+                'all_around_per_dollar': aircraft.get('best_all_around_dollar', 0)
+            },
+            'priority_components': priority_components,
+            'all_around_value': aircraft.get('best_all_around_dollar', 0),
+            'scoring_method': 'Strict 50/50 weighting between spreadsheet and priority scores'
+        }
+
+    def result(self, i: int, include_breakdown: bool = True) -> Dict[str, Any]:
+        """Per-aircraft result in the calculate_final_recommendation_score shape (breakdown built on request)"""
+        final_score = float(self.final_score[i])
+        result = {
+            'final_score': final_score,
+            'spreadsheet_score': float(self.spreadsheet_score[i]),
+            'priority_score': float(self.priority_score[i]),
+            'combined_score': final_score,
+            'spreadsheet_weight': 50.0,
+            'priority_weight': 50.0,
+            'all_around_score': float(self.all_around_score[i])
+        }
+        if include_breakdown:
+            result['breakdown'] = self.breakdown(i)
+        return result
+
+
+def score_batch(fleet: AircraftFleet,
+                rows: Optional[np.ndarray] = None,
+                priorities: Optional[Dict[str, Any]] = None,
+                context: Optional[ScoringContext] = None) -> ScoreBatch:
+    """
+    Score fleet rows in one pass with strict 50/50 weighting.
+
+    Args:
+        fleet: Column store holding the aircraft records
+        rows: Row indices to score (default: whole fleet)
+        priorities: {metric_key: weight} user priorities
+        context: Population the priority metrics are normalized against (default: whole fleet)
+
+    Returns:
+        ScoreBatch with final/spreadsheet/priority/all-around arrays aligned with rows
+    """
+    if rows is None:
+        rows = fleet.all_rows()
+    priorities = priorities or {}
+    if context is None:
+        context = ScoringContext.from_fleet(fleet, metrics=priorities)
+    n = len(rows)
+
+    spreadsheet = spreadsheet_scores(fleet, rows)
+
+    normalized = {}
+    weighted_total = np.zeros(n, dtype=np.float64)
+    total_weight = np.zeros(n, dtype=np.float64)
+    for metric_key, weight in priorities.items():
+        values = fleet.column(metric_key)[rows]
+        normalized[metric_key] = normalize_column(
+            metric_key, values, context.bounds_for(metric_key), context.inverted_metrics
+        )
+        if weight <= 0:
+            continue
+        present = ~np.isnan(values)
+        weighted_total += np.where(present, normalized[metric_key] * weight, 0.0)
+        total_weight += np.where(present, weight, 0.0)
+
+    if priorities:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            priority = np.where(total_weight > 0, weighted_total / np.where(total_weight > 0, total_weight, 1), 50.0)
+        priority = np.clip(priority, 0, 100)
+    else:
+        priority = np.full(n, 50.0)
+
+    final = np.clip((spreadsheet * 0.5) + (priority * 0.5), 0, 100)
+
+    all_around = fleet.column('best_all_around_dollar')[rows]
+    with np.errstate(invalid='ignore'):
+        all_around_score = np.where(all_around > 0, np.clip(all_around * 10, 0, 100), 0.0)
+
+    return ScoreBatch(fleet, rows, priorities, final, spreadsheet, priority, all_around_score, normalized)
+
+
+def top_k(scores, limit: Optional[int] = None, offset: int = 0, descending: bool = True) -> np.ndarray:
+    """
+    Positions of the offset..offset+limit best scores, in the same order a stable full sort would give
+    (ties keep their original order). Uses argpartition so only the selected rows are sorted.
+
+    Args:
+        scores: Score per row (array or list)
+        limit: Number of rows to return (None = all remaining rows)
+        offset: Number of best rows to skip
+        descending: Highest score first (default) or lowest first
+    """
+    keys = np.asarray(scores, dtype=np.float64)
+    if descending:
+        keys = -keys
+    n = len(keys)
+    offset = max(0, offset)
+    end = n if limit is None else min(n, offset + max(0, limit))
+    if offset >= end:
+        return np.empty(0, dtype=np.intp)
+    if end < n:
+        # Every row tied with the end-th best is a candidate so ties resolve by original position
+        kth = np.partition(keys, end - 1)[end - 1]
+        candidates = np.flatnonzero(keys <= kth)
+    else:
+        candidates = np.arange(n)
+    ordered = candidates[np.lexsort((candidates, keys[candidates]))]
+    return ordered[offset:end]